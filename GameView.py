@@ -2,23 +2,38 @@ import mss
 import mss.tools
 import numpy as np
 import cv2
+from frame_cache import DeltaFrameCache
+from frame_sources import LiveSource
 class GameView():
-    def __init__(self):
+    def __init__(self, tile_cache=True, detect_scale=1, source=None):
+        # Where getScreen reads from: the live game by default, or a recording
+        # (see frame_sources.py)
+        self.source = source if source is not None else LiveSource()
+
         #Spring
         self.spring_template = cv2.imread('images/Spring.png', 0)
         self.spring_w, self.spring_h = self.spring_template.shape[::-1]
         self.last_springs = []
 
+        # Frame-delta cache: detectors given the HSV frame returned by getHSV
+        # only redo the work for screen tiles that changed since the last frame
+        self.cache = DeltaFrameCache() if tile_cache else None
+        self.spring_cache = {}
+
+        # Downscaled detection: with detect_scale 2 or 4 the colour masks and
+        # contours are computed on every 2nd/4th pixel of the capture, and the
+        # boxes that need to be exact (player, platforms, spring ROIs) are
+        # refined against the full-resolution frame. Everything returned is
+        # in full-resolution coordinates.
+        self.scale = detect_scale
+        self.full_frame = None
+
 
 
     def getScreen(self):
-        with mss.mss() as sct:
-            monitor = {"top": 247, "left": 727, "width": 448, "height": 682}
-            output = "sct-{top}x{left}_{width}x{height}.png".format(**monitor)
+        # None once a recorded source is exhausted (self.source.done)
+        return self.source.read()
 
-            sct_img = sct.grab(monitor)
-            frame = np.array(sct_img)
-            return frame
     def getFullScreen(self):
         with mss.mss() as sct:
             monitor = {"top": 0, "left": 600, "width": 718, "height": 1078}
@@ -28,9 +43,102 @@ class GameView():
             frame = np.array(sct_img)
             return frame
 
-    def preProcessImage(self, frame, target_size=None):
+    def getHSV(self, frame):
+        # With detect_scale > 1 this is the HSV of the subsampled frame; pass
+        # it to the detect* methods as usual
+        if self.scale > 1:
+            self.full_frame = frame
+            # Nearest-neighbour resize == taking every scale-th pixel, but much
+            # faster than copying a strided slice
+            s = self.scale
+            h, w = frame.shape[0] // s, frame.shape[1] // s
+            frame = cv2.resize(frame[:h * s, :w * s], (w, h), interpolation=cv2.INTER_NEAREST)
+        if self.cache is None:
+            return cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+        return self.cache.update(frame)
+
+    def _cached(self, frame):
+        return self.cache is not None and frame is self.cache.hsv
+
+    def _segment(self, frame, key, mask_fn, post=None):
+        if self._cached(frame):
+            return self.cache.contours(key, mask_fn, post)
+        mask = mask_fn(frame)
+        if post is not None:
+            mask = post(mask)
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        return contours
+
+    def _contours(self, frame, key, mask_fn, post=None):
+        contours = self._segment(frame, key, mask_fn, post)
+        if self.scale > 1:
+            contours = [c * self.scale for c in contours]
+        return contours
+
+    def _contourStats(self, contours):
+        # (N, 5) array of (x, y, w, h, area) per contour, matching
+        # cv2.boundingRect and cv2.contourArea, computed with one pass of
+        # array reductions over all contour points instead of a call per contour
+        if len(contours) == 0:
+            return np.zeros((0, 5), dtype=np.int64)
+        lengths = np.fromiter(map(len, contours), np.intp, len(contours))
+        points = np.concatenate(contours).reshape(-1, 2).astype(np.int64)
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        xs, ys = points[:, 0], points[:, 1]
+        x0, x1 = np.minimum.reduceat(xs, starts), np.maximum.reduceat(xs, starts)
+        y0, y1 = np.minimum.reduceat(ys, starts), np.maximum.reduceat(ys, starts)
+        # Shoelace formula, each polygon closed back onto its first point
+        nxt = np.arange(1, len(points) + 1)
+        nxt[starts + lengths - 1] = starts
+        area = np.abs(np.add.reduceat(xs * ys[nxt] - xs[nxt] * ys, starts)) / 2
+        return np.stack([x0, y0, x1 - x0 + 1, y1 - y0 + 1, area], axis=1)
+
+    def _filterBoxes(self, stats, min_area, max_h, min_aspect):
+        # Bounding-box area / height / aspect filters for a whole stats array
+        w, h = stats[:, 2], stats[:, 3]
+        keep = (w * h >= min_area) & (h <= max_h) & (w >= min_aspect * h)
+        return [tuple(int(v) for v in box) for box in stats[keep, :4]]
+
+    def _platformBoxes(self, frame, key, mask_fn, post=None, min_area=150, max_h=20, min_aspect=3.0):
+        stats = self._contourStats(self._contours(frame, key, mask_fn, post))
+        boxes = self._filterBoxes(stats, min_area, max_h, min_aspect)
+        return [self._refine(box, mask_fn) for box in boxes] if self.scale > 1 else boxes
+
+    def _kernel(self, size):
+        # Morphology kernel covering the same screen area at the detection scale
+        size = max(1, size // self.scale)
+        return np.ones((size | 1, size | 1), np.uint8)
+
+    def _fullResHSV(self, x0, y0, x1, y1):
+        # The full-resolution frame is the one the last getHSV() call subsampled
+        if self.full_frame is None:
+            raise ValueError("detect_scale > 1 needs the frame's HSV from getHSV(), which keeps the full-resolution frame")
+        return cv2.cvtColor(self.full_frame[max(0, y0):y1, max(0, x0):x1], cv2.COLOR_BGR2HSV)
+
+    def _refine(self, box, mask_fn):
+        # Re-measures a box found at reduced scale on the full-resolution
+        # pixels around it; a no-op at full scale
+        if self.scale == 1:
+            return box
+        x, y, w, h = box
+        pad = self.scale
+        x0, y0 = max(0, x - pad), max(0, y - pad)
+        mask = mask_fn(self._fullResHSV(x0, y0, x + w + pad, y + h + pad))
+        if not mask.any():
+            return box
+        bx, by, bw, bh = cv2.boundingRect(mask)
+        return (x0 + bx, y0 + by, bw, bh)
+
+    def _gray(self, frame):
         gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        gray = cv2.GaussianBlur(gray, (3,3), 0)
+        return cv2.GaussianBlur(gray, (3,3), 0)
+
+    def preProcessImage(self, frame, target_size=None):
+        if self._cached(frame):
+            # 3x3 blur: each block needs a 1px halo
+            gray = self.cache.layer("gray", self._gray, halo=1)[0]
+        else:
+            gray = self._gray(frame)
         if target_size is not None:
             gray = cv2.resize(gray, target_size, interpolation=cv2.INTER_AREA)
         return gray
@@ -52,13 +160,14 @@ class GameView():
     def detectPlayer(self, frame):
         lower_yellow = np.array([20, 100, 100])
         upper_yellow = np.array([35, 255, 255])
-        mask = cv2.inRange(frame, lower_yellow, upper_yellow)
+
+        mask_fn = lambda hsv: cv2.inRange(hsv, lower_yellow, upper_yellow)
 
         # Find contours
-        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        contours = self._contours(frame, "yellow", mask_fn)
         if contours:
             largest = max(contours, key=cv2.contourArea)
-            x, y, w, h = cv2.boundingRect(largest)
+            x, y, w, h = self._refine(cv2.boundingRect(largest), mask_fn)
             center = (x + w//2, y + h//2)
             return (x, y, w, h), center
         else:
@@ -66,40 +175,30 @@ class GameView():
     def detectPlatforms(self, frame):
         lower_green = np.array([34, 160, 150])
         upper_green = np.array([47, 234, 229])
-        mask = cv2.inRange(frame, lower_green, upper_green)
+        mask_fn = lambda hsv: cv2.inRange(hsv, lower_green, upper_green)
 
-        # Find contours
-        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        if contours:
-            platforms = []
-            for contour in contours:
-                x, y, w, h = cv2.boundingRect(contour)
-                area = w * h
-                aspect_ratio = w / float(h)
-                if area < 150:
-                    continue
-                if h > 20:
-                    continue
-                if aspect_ratio < 3.0:
-                    continue
-
-                platform = (x, y, w, h)
-                platforms.append(platform)
-            return platforms
-        else:
-            return []
+        # Outer contours (boxes and areas from _contourStats), filtered on box
+        # area, height and aspect ratio
+        return self._platformBoxes(frame, "green", mask_fn)
 
     def detectSprings(self, frame, platforms):
         springs = []
         if not platforms:
             return springs
 
-        gray = self.preProcessImage(frame)
+        # At reduced detection scale only the ROIs are converted at full resolution
+        scaled = self.scale > 1
+        gray = None if scaled else self.preProcessImage(frame)
         threshold = 0.6
 
         # Expansion variables
         p_top, p_bot, p_side = 40, 20, 15
 
+        # Matches are kept per platform and reused while nothing under its ROI
+        # (plus the blur's 1px halo) has changed
+        cached = self._cached(frame) and not scaled
+        spring_cache, self.spring_cache = self.spring_cache, {}
+
         for (px, py, pw, ph) in platforms:
             # 1. Define ROI
             s_top = max(0, py - p_top)
@@ -107,11 +206,23 @@ class GameView():
             s_left = max(0, px - p_side)
             s_right = px + pw + p_side
 
-            roi = gray[s_top:s_bottom, s_left:s_right]
+            if scaled:
+                roi = self._gray(self._fullResHSV(s_left, s_top, s_right, s_bottom))
+            else:
+                roi = gray[s_top:s_bottom, s_left:s_right]
 
             if roi.shape[0] < self.spring_h or roi.shape[1] < self.spring_w:
                 continue
 
+            key = (px, py, pw, ph)
+            if cached:
+                hit = spring_cache.get(key)
+                if hit is not None and self.cache.unchanged_since(hit[0], s_left - 1, s_top - 1,
+                                                                  s_right + 1, s_bottom + 1):
+                    self.spring_cache[key] = hit
+                    springs.extend(hit[1])
+                    continue
+
             # 2. Match Template
             res = cv2.matchTemplate(roi, self.spring_template, cv2.TM_CCOEFF_NORMED)
 
@@ -127,22 +238,26 @@ class GameView():
 
             # 4. Filter duplicates (Non-Maximum Suppression) within this ROI
             candidates = sorted(candidates, key=lambda b: b[4], reverse=True)
+            found = []
             while candidates:
                 box = candidates.pop(0)
                 # Convert back to (x, y, w, h) for final output
-                springs.append((box[0], box[1], self.spring_w, self.spring_h))
+                found.append((box[0], box[1], self.spring_w, self.spring_h))
 
                 # Remove any other candidate that overlaps too much with the one we just saved
                 candidates = [c for c in candidates if self._iou(box, c) < 0.3]
 
+            springs.extend(found)
+            if cached:
+                self.spring_cache[key] = (self.cache.frame_index, found)
+
         return springs
 
     def detectPropellors(self, frame):
         lower_orange = np.array([5, 210, 200])
         upper_orange = np.array([15, 255, 255])
-        mask = cv2.inRange(frame, lower_orange, upper_orange)
 
-        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        contours = self._contours(frame, "orange", lambda hsv: cv2.inRange(hsv, lower_orange, upper_orange))
         if contours:
             largest = max(contours, key=cv2.contourArea)
             x, y, w, h = cv2.boundingRect(largest)
@@ -154,9 +269,8 @@ class GameView():
     def detectRockets(self, frame):
         lower_blue = np.array([88, 34, 195])
         upper_blue = np.array([92, 54, 215])
-        mask = cv2.inRange(frame, lower_blue, upper_blue)
 
-        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        contours = self._contours(frame, "pale_blue", lambda hsv: cv2.inRange(hsv, lower_blue, upper_blue))
         if contours:
             largest = max(contours, key=cv2.contourArea)
             x, y, w, h = cv2.boundingRect(largest)
@@ -173,70 +287,30 @@ class GameView():
     def detectMovingPlatforms(self, frame):
         lower_blue = np.array([90, 200, 180])
         upper_blue = np.array([100, 255, 255])
-        mask = cv2.inRange(frame, lower_blue, upper_blue)
-
-        # Find contours
-        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        moving_platforms = []
-        for contour in contours:
-            x, y, w, h = cv2.boundingRect(contour)
-            area = w * h
-            aspect_ratio = w / float(h)
-
-            if area < 150:
-                continue
-            if h > 20:
-                continue
-            if aspect_ratio < 3.0:
-                continue
+        mask_fn = lambda hsv: cv2.inRange(hsv, lower_blue, upper_blue)
 
-            moving_platforms.append((x, y, w, h))
-
-        return moving_platforms
+        return self._platformBoxes(frame, "blue", mask_fn)
 
     def detectWhitePlatforms(self, frame):
         lower_white = np.array([0, 0, 254])
         upper_white = np.array([179, 1, 255])
-        mask = cv2.inRange(frame, lower_white, upper_white)
+        mask_fn = lambda hsv: cv2.inRange(hsv, lower_white, upper_white)
 
-        # Find contours
-        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        if contours:
-            platforms = []
-            for contour in contours:
-                x, y, w, h = cv2.boundingRect(contour)
-                area = w * h
-                aspect_ratio = w / float(h)
-
-                # Filter out noise / non-platforms
-                if area < 150:
-                    continue
-                if h > 20:
-                    continue
-                if aspect_ratio < 3.0:
-                    continue
-
-                platform = (x, y, w, h)
-                platforms.append(platform)
-            return platforms
-        else:
-            return []
+        return self._platformBoxes(frame, "white", mask_fn)
 
     def detectBlackHoles(self, frame, min_area=500):
         # Define black color range (low value, any hue/saturation)
         lower_black = np.array([0, 0, 0])
         upper_black = np.array([180, 255, 50])  # V <= 50
 
-        # Create mask
-        mask = cv2.inRange(frame, lower_black, upper_black)
-
         # Clean up noise
-        kernel = np.ones((5,5), np.uint8)
-        mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
-        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
+        kernel = self._kernel(5)
+        def clean(mask):
+            mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
+            return cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
 
-        # Find contours
-        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        # Create mask and find contours
+        contours = self._contours(frame, "black", lambda hsv: cv2.inRange(hsv, lower_black, upper_black), clean)
 
         black_holes = []
         for contour in contours:
@@ -257,88 +331,83 @@ class GameView():
         lower_brown = np.array([8, 50, 40])
         upper_brown = np.array([22, 210, 200])
 
-        mask = cv2.inRange(hsv_frame, lower_brown, upper_brown)
-
-        # Clean up the cracks inside the platform so it stays one solid box
-        kernel = np.ones((3,3), np.uint8)
-        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
+        # Close the crack down the middle of the pad (up to 3px wide, so still
+        # a pixel at detect_scale 4) so both halves come out as one solid box
+        kernel = self._kernel(max(5, 3 * self.scale))
+        mask_fn = lambda hsv: cv2.inRange(hsv, lower_brown, upper_brown)
 
-        # Find contours
-        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-
-        platforms = []
-        if contours:
-            for contour in contours:
-                x, y, w, h = cv2.boundingRect(contour)
-                area = w * h
-                aspect_ratio = w / float(h)
-
-                if area < 300:
-                    continue
-
-                if aspect_ratio < 2.0:
-                    continue
-
-                if h > 35:
-                    continue
-
-                platforms.append((x, y, w, h))
-
-        return platforms
+        return self._platformBoxes(hsv_frame, "brown", mask_fn,
+                                   lambda mask: cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel),
+                                   min_area=300, max_h=35, min_aspect=2.0)
 
     def detectMonsters(self, hsv_frame, excluded_bboxes, player_center):
         # 1. Detect everything that isn't the background paper
         lower_paper = np.array([0, 0, 180])
         upper_paper = np.array([180, 60, 255])
-        bg_mask = cv2.inRange(hsv_frame, lower_paper, upper_paper)
-        not_paper_mask = cv2.bitwise_not(bg_mask)
 
         # 2. Specifically detect the Brown Platform color
         # Brown is Hue 8-22, Saturation 50-210, Value 40-200
         lower_brown = np.array([8, 50, 40])
         upper_brown = np.array([22, 210, 200])
-        brown_mask = cv2.inRange(hsv_frame, lower_brown, upper_brown)
 
         # 3. SUBTRACT Brown from the Monster Mask
         # This removes brown pixels before findContours ever sees them
-        mask = cv2.subtract(not_paper_mask, brown_mask)
+        def monster_mask(hsv):
+            not_paper_mask = cv2.bitwise_not(cv2.inRange(hsv, lower_paper, upper_paper))
+            brown_mask = cv2.inRange(hsv, lower_brown, upper_brown)
+            return cv2.subtract(not_paper_mask, brown_mask)
 
         # Clean up noise
-        kernel = np.ones((3,3), np.uint8)
-        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
-
-        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-
-        monster_boxes = []
-        for cnt in contours:
-            x, y, w, h = cv2.boundingRect(cnt)
-            area = cv2.contourArea(cnt)
-
-            # Standard Filters
-            if area < 500 or area > 15000: continue
-            aspect_ratio = float(w) / h
-            if aspect_ratio > 2.2 or aspect_ratio < 0.4: continue
+        kernel = self._kernel(3)
+        contours = self._contours(hsv_frame, "not_paper", monster_mask,
+                                  lambda mask: cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel))
+        stats = self._contourStats(contours)
+        x, y, w, h, area = stats.T
 
-            # Overlap Exclusion (Player & Items)
-            is_excluded = False
-            if player_center:
-                px, py = player_center
-                if (x - 25 <= px <= x + w + 25) and (y - 25 <= py <= y + h + 25):
-                    is_excluded = True
+        # Standard Filters
+        keep = (area >= 500) & (area <= 15000) & (w <= 2.2 * h) & (w >= 0.4 * h)
 
-            for ex_box in excluded_bboxes:
-                if ex_box is None: continue
-                ex_x, ex_y, ex_w, ex_h = ex_box
-                if (abs(x - ex_x) < 30 and abs(y - ex_y) < 30):
-                    is_excluded = True
-                    break
+        # Overlap Exclusion (Player & Items)
+        keep &= ~self._excludedMask(x, y, w, h, excluded_bboxes, player_center)
 
-            if is_excluded: continue
-
-            # Final check: Monsters are usually very saturated
-            roi = hsv_frame[y:y+h, x:x+w]
-            if np.mean(roi[:, :, 1]) < 60: continue
-
-            monster_boxes.append((x, y, w, h))
+        candidates = stats[keep, :4].astype(np.int64)
+        if not len(candidates):
+            return []
 
-        return monster_boxes
+        # Final check: Monsters are usually very saturated
+        saturated = candidates[self._meanSaturation(hsv_frame, candidates) >= 60]
+        return [tuple(int(v) for v in box) for box in saturated]
+
+    def _excludedMask(self, x, y, w, h, excluded_bboxes, player_center):
+        # True for boxes around the player centre or starting near an excluded box
+        excluded = np.zeros(len(x), dtype=bool)
+        if player_center:
+            px, py = player_center
+            excluded |= (x - 25 <= px) & (px <= x + w + 25) & (y - 25 <= py) & (py <= y + h + 25)
+
+        others = np.array([box[:2] for box in excluded_bboxes if box is not None]).reshape(-1, 2)
+        if len(others):
+            near = (np.abs(x[:, None] - others[:, 0]) < 30) & (np.abs(y[:, None] - others[:, 1]) < 30)
+            excluded |= near.any(axis=1)
+        return excluded
+
+    def excludeMonsters(self, monster_boxes, excluded_bboxes, player_center):
+        # The exclusion step of detectMonsters on its own: every filter there is
+        # per box, so detectMonsters(hsv, [], None) followed by this gives the
+        # same boxes as detectMonsters(hsv, excluded_bboxes, player_center)
+        if not monster_boxes:
+            return []
+        x, y, w, h = np.array(monster_boxes).T
+        keep = ~self._excludedMask(x, y, w, h, excluded_bboxes, player_center)
+        return [box for box, k in zip(monster_boxes, keep) if k]
+
+    def _meanSaturation(self, hsv_frame, boxes):
+        # Mean S over each full-resolution box via one integral image
+        s = self.scale
+        x0, y0 = boxes[:, 0] // s, boxes[:, 1] // s
+        x1, y1 = -(-(boxes[:, 0] + boxes[:, 2]) // s), -(-(boxes[:, 1] + boxes[:, 3]) // s)
+        frame_h, frame_w = hsv_frame.shape[:2]
+        x1, y1 = np.minimum(x1, frame_w), np.minimum(y1, frame_h)
+        integral = cv2.integral(hsv_frame[:, :, 1])
+        total = integral[y1, x1] - integral[y0, x1] - integral[y1, x0] + integral[y0, x0]
+        return total / np.maximum(1, (x1 - x0) * (y1 - y0))
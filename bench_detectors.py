@@ -0,0 +1,208 @@
+import argparse
+import random
+import time
+import cv2
+import numpy as np
+from GameView import GameView
+from planner import LookaheadPlanner
+from gymnasium_env_doodle.envs.doodle_env import DoodleJumpEnv
+from synthetic_frames import SyntheticFrameRenderer
+
+# Offline benchmark for the GameView detectors. Plays DoodleJumpEnv with the
+# lookahead planner, renders every `stride`-th tick with SyntheticFrameRenderer
+# and runs the same detector calls as main.py on it, timing each one and
+# matching its boxes against the renderer's ground truth. --tile-cache runs
+# GameView with its frame-delta cache (the results are identical, only the
+# timings change); --scales compares detection at reduced resolution.
+#
+#   python bench_detectors.py --frames 2000 --seed 0 [--tile-cache] [--scales 1,2,4]
+#   python bench_detectors.py --frames 500 --workers 4
+
+# Detector name -> ground-truth key (rockets have no sprite, so no truth)
+DETECTORS = {
+    "player": "player",
+    "platforms": "platforms",
+    "moving": "moving_platforms",
+    "white": "white_platforms",
+    "brown": "brown_platforms",
+    "springs": "springs",
+    "propellors": "propellors",
+    "rockets": None,
+    "black_holes": "black_holes",
+    "monsters": "monsters",
+}
+# The propellor box is padded on purpose (see detectPropellors)
+IOU_THRESHOLDS = {"propellors": 0.3}
+
+
+def iou(a, b):
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    iw = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+    ih = max(0, min(ay + ah, by + bh) - max(ay, by))
+    inter = iw * ih
+    return inter / float(aw * ah + bw * bh - inter + 1e-5)
+
+
+def match(predicted, truth, threshold):
+    # Greedy one-to-one matching by descending IoU. Returns the true positive
+    # count and the best IoU reached by each truth box, which shows detectors
+    # that find the object but box it too tightly to count as a match
+    pairs = sorted(((iou(p, t), i, j) for i, p in enumerate(predicted) for j, t in enumerate(truth)), reverse=True)
+    used_p, used_t = set(), set()
+    best = [0.0] * len(truth)
+    for score, i, j in pairs:
+        best[j] = max(best[j], score)
+        if score < threshold or i in used_p or j in used_t: continue
+        used_p.add(i)
+        used_t.add(j)
+    return len(used_p), best
+
+
+def run_detectors(game, hsv, timings):
+    # Mirrors the detection order in main.py; returns name -> list of boxes
+    out = {}
+
+    def timed(name, fn, *args):
+        t0 = time.perf_counter()
+        result = fn(*args)
+        timings[name].append((time.perf_counter() - t0) * 1000)
+        return result
+
+    player_bbox, player_center = timed("player", game.detectPlayer, hsv)
+    out["player"] = [player_bbox] if player_bbox else []
+    out["moving"] = timed("moving", game.detectMovingPlatforms, hsv)
+    out["white"] = timed("white", game.detectWhitePlatforms, hsv)
+    out["platforms"] = timed("platforms", game.detectPlatforms, hsv)
+    out["brown"] = timed("brown", game.detectBrownPlatforms, hsv)
+    out["springs"] = timed("springs", game.detectSprings, hsv, out["platforms"] + out["moving"])
+    propellor, _ = timed("propellors", game.detectPropellors, hsv)
+    out["propellors"] = [propellor] if propellor else []
+    rocket, _ = timed("rockets", game.detectRockets, hsv)
+    out["rockets"] = [rocket] if rocket else []
+    out["black_holes"] = [cv2.boundingRect(c) for c in timed("black_holes", game.detectBlackHoles, hsv)]
+
+    to_exclude = [player_bbox, propellor, rocket] + out["platforms"] + out["moving"] + out["springs"]
+    out["monsters"] = timed("monsters", game.detectMonsters, hsv, to_exclude, player_center)
+    return out
+
+
+def frames(n_frames, stride, seed):
+    # Yields env states from planner rollouts, one every `stride` ticks
+    random.seed(seed)
+    env = DoodleJumpEnv()
+    planner = LookaheadPlanner(height=env.height)
+    env.reset(seed=seed)
+    produced, tick = 0, 0
+    while produced < n_frames:
+        _, _, terminated, truncated, _ = env.step(planner.act(env))
+        if terminated or truncated:
+            env.reset()
+        tick += 1
+        if tick % stride == 0:
+            produced += 1
+            yield env
+
+
+class Result:
+    # Timings and match counts for one GameView configuration
+    def __init__(self, label, game):
+        self.label, self.game = label, game
+        self.timings = {name: [] for name in ("hsv",) + tuple(DETECTORS)}
+        self.counts = {name: [0, 0, 0] for name in DETECTORS}  # true positives, predicted, truth
+        self.best_ious = {name: [] for name in DETECTORS}
+
+    def add(self, frame, truth):
+        t0 = time.perf_counter()
+        hsv = self.game.getHSV(frame)
+        self.timings["hsv"].append((time.perf_counter() - t0) * 1000)
+        detections = run_detectors(self.game, hsv, self.timings)
+        for name, key in DETECTORS.items():
+            expected = truth[key] if key else []
+            c = self.counts[name]
+            tp, best = match(detections[name], expected, IOU_THRESHOLDS.get(name, 0.5))
+            c[0] += tp
+            c[1] += len(detections[name])
+            c[2] += len(expected)
+            self.best_ious[name].extend(best)
+
+    def report(self):
+        print(self.label)
+        print(f"{'detector':<12} {'mean ms':>8} {'p95 ms':>8} {'precision':>10} {'recall':>8} {'mean iou':>9} "
+              f"{'truth':>7}")
+        total = 0
+        for name, t in self.timings.items():
+            t = np.array(t)
+            total = total + t
+            if name not in DETECTORS:
+                print(f"{name:<12} {t.mean():8.3f} {np.percentile(t, 95):8.3f}")
+                continue
+            tp, predicted, expected = self.counts[name]
+            precision = f"{tp / predicted:.3f}" if predicted else "-"
+            recall = f"{tp / expected:.3f}" if expected else "-"
+            mean_iou = f"{np.mean(self.best_ious[name]):.3f}" if expected else "-"
+            print(f"{name:<12} {t.mean():8.3f} {np.percentile(t, 95):8.3f} {precision:>10} {recall:>8} "
+                  f"{mean_iou:>9} {expected:7d}")
+        print(f"{'total':<12} {total.mean():8.3f} {np.percentile(total, 95):8.3f}")
+        print()
+
+
+def benchmark(n_frames=2000, stride=4, seed=0, tile_cache=False, scales=(1,)):
+    # Every configuration sees exactly the same frames
+    renderer = SyntheticFrameRenderer(seed=seed)
+    results = [Result(f"detect_scale {scale}, tile cache {'on' if tile_cache else 'off'}",
+                      GameView(tile_cache=tile_cache, detect_scale=scale)) for scale in scales]
+
+    for env in frames(n_frames, stride, seed):
+        frame, truth = renderer.render(env)
+        for result in results:
+            result.add(frame, truth)
+
+    print(f"{n_frames} frames, {renderer.width}x{renderer.height}\n")
+    for result in results:
+        result.report()
+    return results
+
+
+def benchmark_pool(n_frames=500, stride=4, seed=0, n_workers=4, detect_scale=1):
+    # End-to-end latency of DetectorPool.detect against the same detectors run
+    # one after another in this process, checking both give the same boxes
+    from detector_pool import DetectorPool
+    renderer = SyntheticFrameRenderer(seed=seed)
+    game = GameView(tile_cache=False, detect_scale=detect_scale)
+    pool = DetectorPool(n_workers, detect_scale=detect_scale)
+    serial, parallel, mismatches = [], [], 0
+    try:
+        for env in frames(n_frames, stride, seed):
+            frame, _ = renderer.render(env)
+            t0 = time.perf_counter()
+            expected = run_detectors(game, game.getHSV(frame), {name: [] for name in DETECTORS})
+            t1 = time.perf_counter()
+            results = pool.detect(frame)
+            t2 = time.perf_counter()
+            serial.append((t1 - t0) * 1000)
+            parallel.append((t2 - t1) * 1000)
+            mismatches += results["monsters"] != expected["monsters"] or results["springs"] != expected["springs"]
+    finally:
+        pool.close()
+    print(f"{n_frames} frames, {len(pool.task_groups)} workers: {pool.task_groups}")
+    print(f"{'serial':<10} mean {np.mean(serial):7.3f} ms  p95 {np.percentile(serial, 95):7.3f} ms")
+    print(f"{'pool':<10} mean {np.mean(parallel):7.3f} ms  p95 {np.percentile(parallel, 95):7.3f} ms")
+    print(f"frames with differing results: {mismatches}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=2000)
+    parser.add_argument("--stride", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tile-cache", action="store_true")
+    parser.add_argument("--scales", type=lambda v: [int(s) for s in v.split(",")], default=[1],
+                        help="comma-separated detect_scale values to compare, e.g. 1,2,4")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="benchmark DetectorPool with this many workers instead")
+    args = parser.parse_args()
+    if args.workers:
+        benchmark_pool(args.frames, args.stride, args.seed, args.workers, args.scales[0])
+    else:
+        benchmark(args.frames, args.stride, args.seed, args.tile_cache, args.scales)
@@ -0,0 +1,121 @@
+import argparse
+import random
+import time
+import numpy as np
+import physics
+from game import Player, Platform, Monster, Projectile, WIDTH
+
+# Per-tick kinematics throughput as the entity count grows: the original
+# per-entity update() calls, the fused physics.advance() loop over the same
+# objects, and the physics.step_* array kernels on equivalent arrays. Before
+# timing, every form is run side by side for a while to check they agree.
+#
+#   python bench_physics.py --counts 15,100,1000,10000 --ticks 500
+
+
+def make_entities(n, seed=0):
+    # n platforms (a quarter of them blue), n // 5 monsters, n // 10 bullets
+    random.seed(seed)
+    platforms = [Platform(random.randint(0, 600), 2000 if i % 4 == 0 else 0) for i in range(n)]
+    for p in platforms:
+        if p.type == 'blue': p.vel_x = random.choice([-2, 2])
+    monsters = [Monster(random.randint(0, 600)) for _ in range(n // 5)]
+    bullets = [Projectile(random.randint(0, WIDTH), random.randint(0, 600)) for _ in range(n // 10)]
+    return platforms, monsters, bullets
+
+
+def to_arrays(platforms, monsters, bullets):
+    movers = platforms + monsters
+    return {
+        "x": np.array([e.rect.x for e in movers], dtype=np.int64),
+        "vx": np.array([e.vel_x for e in movers], dtype=np.int64),
+        "w": np.array([e.rect.width for e in movers], dtype=np.int64),
+        "by": np.array([b.rect.y for b in bullets], dtype=np.int64),
+        "speed": np.array([b.speed for b in bullets], dtype=np.int64),
+    }
+
+
+def per_method(platforms, monsters, bullets):
+    for p in platforms: p.update()
+    for m in monsters: m.update()
+    for b in bullets: b.update()
+
+
+def fused(platforms, monsters, bullets):
+    physics.advance(platforms, monsters, bullets, WIDTH)
+
+
+def kernels(a):
+    physics.step_movers(a["x"], a["vx"], a["w"], WIDTH)
+    physics.step_bullets(a["by"], a["speed"])
+
+
+def check_entities(n=200, ticks=300):
+    reference = make_entities(n)
+    objects = make_entities(n)
+    arrays = to_arrays(*objects)
+    for _ in range(ticks):
+        per_method(*reference)
+        fused(*objects)
+        kernels(arrays)
+    expected = to_arrays(*reference)
+    assert all(np.array_equal(expected[k], to_arrays(*objects)[k]) for k in expected), "advance() differs"
+    assert all(np.array_equal(expected[k], arrays[k]) for k in expected), "step_movers/step_bullets differ"
+
+
+def check_players(n=64, ticks=600, seed=0):
+    # Random steering, with boosts and shot cooldowns mixed in
+    rng = random.Random(seed)
+    players = [Player() for _ in range(n)]
+    for pl in players:
+        pl.rect.x = rng.randint(-40, WIDTH + 40)
+        pl.vel_y = rng.uniform(-15, 15)
+    x = np.array([pl.rect.x for pl in players], dtype=np.int64)
+    y = np.array([pl.rect.y for pl in players], dtype=np.int64)
+    vx = np.zeros(n)
+    vy = np.array([pl.vel_y for pl in players])
+    timer = np.zeros(n, dtype=np.int64)
+    cooldown = np.zeros(n, dtype=np.int64)
+    for _ in range(ticks):
+        steer = [rng.choice([-1, 0, 1]) for _ in range(n)]
+        for i, pl in enumerate(players):
+            if rng.random() < 0.01: pl.powerup_timer = timer[i] = 30
+            if rng.random() < 0.05: pl.shoot_cooldown = cooldown[i] = 12
+            if steer[i]: pl.vel_x += steer[i] * pl.accel_x
+            else: pl.vel_x *= physics.DAMPING
+            physics.move_player(pl, WIDTH)
+        s = np.array(steer)
+        vx += s * physics.ACCEL_X
+        physics.step_players(x, y, vx, vy, timer, cooldown, s == 0, WIDTH)
+    assert np.array_equal(x, [pl.rect.x for pl in players]), "step_players x differs"
+    assert np.array_equal(y, [pl.rect.y for pl in players]), "step_players y differs"
+    assert np.array_equal(vx, [pl.vel_x for pl in players]), "step_players vel_x differs"
+
+
+def timeit(fn, args, ticks):
+    t0 = time.perf_counter()
+    for _ in range(ticks):
+        fn(*args)
+    return (time.perf_counter() - t0) / ticks * 1e6
+
+
+def benchmark(counts=(15, 100, 1000, 10000), ticks=500):
+    check_entities()
+    check_players()
+    print("kernels match the per-entity updates\n")
+    print(f"{'entities':>9} {'update() us':>12} {'advance us':>11} {'kernels us':>11}")
+    for n in counts:
+        objects = make_entities(n)
+        total = n + n // 5 + n // 10
+        t_method = timeit(per_method, objects, ticks)
+        t_fused = timeit(fused, objects, ticks)
+        t_kernels = timeit(kernels, (to_arrays(*objects),), ticks)
+        print(f"{total:>9} {t_method:12.2f} {t_fused:11.2f} {t_kernels:11.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--counts", type=lambda v: [int(c) for c in v.split(",")], default=[15, 100, 1000, 10000])
+    parser.add_argument("--ticks", type=int, default=500)
+    args = parser.parse_args()
+    benchmark(args.counts, args.ticks)
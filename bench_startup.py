@@ -0,0 +1,78 @@
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+import worker_launcher
+
+# Cold-start time of a worker process: from Process.start() until the worker
+# has built DoodleJumpEnv (through train.make_env, as the training workers
+# do) and reset it. "eval" jobs also import stable-baselines3, as the
+# evaluation workers do to load a policy. Each start method runs in its own
+# interpreter, since a fork server can only be started (and preloaded) once.
+#
+#   python bench_startup.py --workers 8
+#
+# The first forkserver worker also pays for starting the fork server (and its
+# preload: worker_launcher.SIM_PRELOAD or POLICY_PRELOAD), so it is reported
+# separately from the rest.
+
+CONFIGS = [
+    ("spawn", "spawn", None),
+    ("forkserver", "forkserver", None),
+    ("forkserver+sim", "forkserver", "sim"),
+    ("forkserver+policy", "forkserver", "policy"),
+]
+PRELOADS = {None: [], "sim": worker_launcher.SIM_PRELOAD, "policy": worker_launcher.POLICY_PRELOAD}
+
+
+def _job(remote, kind):
+    from train import make_env
+    env = make_env()
+    env.reset(seed=0)
+    if kind == "eval":
+        import stable_baselines3  # noqa: F401
+    remote.send(time.perf_counter())
+    remote.close()
+
+
+def run_config(method, preload, kind, workers):
+    # Per-worker cold start in ms, one worker at a time
+    ctx = worker_launcher.get_context(method, PRELOADS[preload])
+    times = []
+    for _ in range(workers):
+        parent, child = ctx.Pipe(duplex=False)
+        t0 = time.perf_counter()
+        process = worker_launcher.start_process(_job, (child, kind), ctx)
+        child.close()
+        ready = parent.recv()
+        times.append((ready - t0) * 1000)
+        process.join()
+    return times
+
+
+def benchmark(workers=8, kinds=("env", "eval")):
+    print(f"{'start method':>20} {'job':>5} {'first ms':>9} {'median ms':>10}")
+    for name, method, preload in CONFIGS:
+        if method not in worker_launcher.mp.get_all_start_methods():
+            continue
+        for kind in kinds:
+            cmd = [sys.executable, __file__, "--child", method, "--kind", kind, "--workers", str(workers)]
+            if preload: cmd += ["--preload", preload]
+            times = json.loads(subprocess.run(cmd, capture_output=True, text=True, check=True).stdout.splitlines()[-1])
+            rest = statistics.median(times[1:]) if len(times) > 1 else times[0]
+            print(f"{name:>20} {kind:>5} {times[0]:9.0f} {rest:10.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--kind", choices=["env", "eval"], default=None)
+    parser.add_argument("--child", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--preload", choices=["sim", "policy"], default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        print(json.dumps(run_config(args.child, args.preload, args.kind, args.workers)))
+    else:
+        benchmark(args.workers, (args.kind,) if args.kind else ("env", "eval"))
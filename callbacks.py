@@ -0,0 +1,224 @@
+import json
+import os
+import queue
+import shutil
+import time
+from stable_baselines3 import PPO
+from stable_baselines3.common.callbacks import BaseCallback
+import worker_launcher
+from gymnasium_env_doodle.envs.telemetry import summarize
+from train import CHECKPOINT_DIR, CHECKPOINT_PREFIX, TENSORBOARD_LOG, list_checkpoints, make_env, save_run_dir
+
+# Training callbacks. They live apart from train.py so that importing train
+# (as every env worker does, to unpickle make_env) doesn't import
+# stable-baselines3 and torch.
+
+class RotatingCheckpointCallback(BaseCallback):
+    # Saves the model every `save_freq` timesteps and keeps only the newest `keep` files
+    def __init__(self, save_freq, checkpoint_dir=CHECKPOINT_DIR, keep=3, verbose=0):
+        super().__init__(verbose)
+        self.save_freq = save_freq
+        self.checkpoint_dir = checkpoint_dir
+        self.keep = keep
+        self.next_save = 0
+
+    def _init_callback(self):
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        if self.logger.get_dir():
+            save_run_dir(self.logger.get_dir(), self.checkpoint_dir)
+        self.next_save = (self.model.num_timesteps // self.save_freq + 1) * self.save_freq
+
+    def _on_step(self):
+        if self.num_timesteps >= self.next_save:
+            self.next_save += self.save_freq
+            path = os.path.join(self.checkpoint_dir, f"{CHECKPOINT_PREFIX}_{self.num_timesteps}_steps")
+            self.model.save(path)
+            for _, old in list_checkpoints(self.checkpoint_dir)[:-self.keep]:
+                os.remove(old)
+            if self.verbose: print(f"Checkpoint saved: {path}.zip")
+        return True
+
+# --- ASYNC EVALUATION ---
+
+def evaluate_model(model, n_episodes=5, max_steps=10000, env=None):
+    # Mean score and mean return of deterministic episodes (seeds 0..n-1)
+    env = env or make_env()
+    scores, returns = [], []
+    for ep in range(n_episodes):
+        obs, info = env.reset(seed=ep)
+        total = 0.0
+        for _ in range(max_steps):
+            action, _ = model.predict(obs, deterministic=True)
+            obs, reward, terminated, truncated, info = env.step(int(action))
+            total += reward
+            if terminated or truncated: break
+        scores.append(info["score"])
+        returns.append(total)
+    return sum(scores) / n_episodes, sum(returns) / n_episodes
+
+def evaluate_policy_file(model_path, n_episodes=5, max_steps=10000):
+    # Runs in a separate process: its own env, its own copy of the policy
+    return evaluate_model(PPO.load(model_path, device="cpu"), n_episodes, max_steps)
+
+def _eval_worker(model_path, timesteps, n_episodes, results):
+    mean_score, mean_return = evaluate_policy_file(model_path, n_episodes)
+    results.put((timesteps, model_path, mean_score, mean_return))
+
+class AsyncEvalCallback(BaseCallback):
+    # Every `eval_freq` timesteps, snapshots the policy and evaluates it in a
+    # separate process. Rollout collection never waits on it: results are
+    # picked up on a later step, and a new evaluation is skipped while the
+    # previous one is still running. An evaluation whose process dies without
+    # a result is dropped. The best snapshot is kept as best_model.zip (with
+    # best_model.json) next to the tensorboard run. At the end of training the
+    # last evaluation gets up to `final_timeout` s to finish.
+    def __init__(self, eval_freq, n_episodes=5, final_timeout=600, verbose=0):
+        super().__init__(verbose)
+        self.eval_freq = eval_freq
+        self.n_episodes = n_episodes
+        self.final_timeout = final_timeout
+        self.next_eval = 0
+        self.ctx = worker_launcher.get_context()
+        self.results = None
+        self.process = None
+        self.candidate = None
+        self.best_score = -float("inf")
+
+    def _init_callback(self):
+        self.log_dir = self.logger.get_dir() or TENSORBOARD_LOG
+        self.eval_dir = os.path.join(self.log_dir, "eval")
+        os.makedirs(self.eval_dir, exist_ok=True)
+        self.results = self.ctx.Queue()
+        self.next_eval = (self.model.num_timesteps // self.eval_freq + 1) * self.eval_freq
+
+        best_json = os.path.join(self.log_dir, "best_model.json")
+        if os.path.exists(best_json):
+            with open(best_json) as f:
+                self.best_score = json.load(f)["mean_score"]
+
+    def _launch(self):
+        path = os.path.join(self.eval_dir, f"candidate_{self.num_timesteps}")
+        self.model.save(path)
+        self.candidate = path + ".zip"
+        self.process = worker_launcher.start_process(
+            _eval_worker, (self.candidate, self.num_timesteps, self.n_episodes, self.results), self.ctx)
+
+    def _finish(self, terminate=False):
+        if terminate: self.process.terminate()
+        self.process.join()
+        self.process = None
+        if os.path.exists(self.candidate): os.remove(self.candidate)
+
+    def _collect(self, timeout=None):
+        # Picks up the running evaluation's result, waiting up to `timeout` s.
+        # None while it is still running, False if its process died without
+        # a result (exception, killed, unreadable snapshot), True once recorded
+        try:
+            result = self.results.get(timeout=timeout) if timeout else self.results.get_nowait()
+        except queue.Empty:
+            if self.process.is_alive(): return None
+            try:
+                # A result put just before exiting may still be in the pipe
+                result = self.results.get(timeout=1.0)
+            except queue.Empty:
+                print(f"Evaluation of {self.candidate} died without a result (exit code {self.process.exitcode})")
+                self._finish()
+                return False
+        timesteps, path, mean_score, mean_return = result
+        self.logger.record("eval/mean_score", mean_score)
+        self.logger.record("eval/mean_reward", mean_return)
+        self.logger.record("eval/timesteps", timesteps)
+        if mean_score > self.best_score:
+            self.best_score = mean_score
+            shutil.copyfile(path, os.path.join(self.log_dir, "best_model.zip"))
+            with open(os.path.join(self.log_dir, "best_model.json"), "w") as f:
+                json.dump({"timesteps": timesteps, "mean_score": mean_score, "mean_reward": mean_return}, f)
+            if self.verbose: print(f"New best model at {timesteps} steps: score {mean_score:.0f}")
+        self._finish()
+        return True
+
+    def _on_step(self):
+        if self.process is not None:
+            self._collect()
+        if self.num_timesteps >= self.next_eval:
+            self.next_eval += self.eval_freq
+            if self.process is None:
+                self._launch()
+        return True
+
+    def _on_training_end(self):
+        # Let the last evaluation finish so its result isn't lost. It lands
+        # after SB3's last dump, so dump once more to get it to tensorboard
+        deadline = time.monotonic() + self.final_timeout
+        while self.process is not None:
+            done = self._collect(timeout=1.0)
+            if done:
+                self.logger.dump(self.num_timesteps)
+            elif done is None and time.monotonic() > deadline:
+                print(f"Evaluation of {self.candidate} still running after {self.final_timeout}s, stopping it")
+                self._finish(terminate=True)
+
+# --- TELEMETRY ---
+
+class TelemetryCallback(BaseCallback):
+    # Every `flush_freq` timesteps (checked at the end of a rollout, just
+    # before SB3 writes its logs), drains the counters of every env, wherever
+    # it runs, and records them under telemetry/: the steps/s of a single env
+    # and the physics/reward/observation split of a step, next to the
+    # end-to-end training steps/s of all of them, and the episodes that ended
+    # since the last flush (length, max height, novelty landings, fall vs.
+    # stagnation deaths).
+    def __init__(self, flush_freq=10000, verbose=0):
+        super().__init__(verbose)
+        self.flush_freq = flush_freq
+        self.next_flush = 0
+        self.last_time = None
+        self.last_timesteps = 0
+
+    def _init_callback(self):
+        self.next_flush = self.model.num_timesteps + self.flush_freq
+        self.last_time = time.perf_counter()
+        self.last_timesteps = self.model.num_timesteps
+        self.training_env.env_method("drain_telemetry")
+
+    def _on_step(self):
+        return True
+
+    def _on_rollout_end(self):
+        if self.num_timesteps < self.next_flush:
+            return
+        self.next_flush = self.num_timesteps + self.flush_freq
+        now = time.perf_counter()
+        for key, value in summarize(self.training_env.env_method("drain_telemetry")).items():
+            self.logger.record(f"telemetry/{key}", value)
+        self.logger.record("telemetry/train_steps_per_sec", (self.num_timesteps - self.last_timesteps) / (now - self.last_time))
+        self.last_time, self.last_timesteps = now, self.num_timesteps
+
+# --- SWEEPS ---
+
+class SweepReportCallback(BaseCallback):
+    # Used by sweep.py trials: every `eval_freq` timesteps, evaluates the
+    # policy in-process (a trial already has its own CPU budget) and sends
+    # ("eval", trial, timesteps, score) to the sweep. Training stops at the
+    # next step once the sweep sets `stop`.
+    def __init__(self, trial, eval_freq, reports, stop, n_episodes=5, verbose=0):
+        super().__init__(verbose)
+        self.trial = trial
+        self.eval_freq = eval_freq
+        self.reports = reports
+        self.stop = stop
+        self.n_episodes = n_episodes
+        self.next_eval = eval_freq
+        self.env = None
+
+    def _init_callback(self):
+        self.env = make_env()
+
+    def _on_step(self):
+        if self.num_timesteps >= self.next_eval:
+            self.next_eval += self.eval_freq
+            mean_score, mean_return = evaluate_model(self.model, self.n_episodes, env=self.env)
+            self.logger.record("eval/mean_score", mean_score)
+            self.logger.record("eval/mean_reward", mean_return)
+            self.reports.put(("eval", self.trial, self.num_timesteps, mean_score))
+        return not self.stop.is_set()
@@ -0,0 +1,218 @@
+import argparse
+import json
+import os
+import numpy as np
+import pygame
+from gymnasium_env_doodle.envs.doodle_env import DoodleJumpEnv
+
+# Demonstrations for behaviour cloning, recorded from a person at the keyboard
+# or from the lookahead planner, in DoodleJumpEnv's observation/action terms:
+#
+#   python demos.py demos/ --episodes 5             # play (arrows/AD, space/W/up)
+#   python demos.py demos/ --planner --episodes 50  # planner demos, headless
+#   python train.py --bc demos/                     # BC pre-training, then PPO
+#
+# A dataset is a directory of fixed-size chunks, one .npy file per field
+# (every observation key, plus action, reward and done):
+#
+#   demos/index.json          fields (dtype, shape) and the rows in each chunk
+#   demos/00000/player.npy    (chunk_size, 5) float32
+#   demos/00000/action.npy    (chunk_size,) int64 ...
+#
+# The writer keeps at most `buffer_size` steps in RAM and copies them into the
+# current chunk's memory-mapped files (flushed to disk) when the buffer fills;
+# the reader memory-maps one chunk at a time, so neither ever holds the whole
+# dataset. Recording into an existing dataset appends new chunks.
+
+INDEX = "index.json"
+
+
+def keys_to_action(keys):
+    # run_game's controls as DoodleJumpEnv actions; an action can't steer and
+    # shoot at once, so steering wins (left over right, as in Player.move)
+    if keys[pygame.K_LEFT] or keys[pygame.K_a]: return 1
+    if keys[pygame.K_RIGHT] or keys[pygame.K_d]: return 0
+    if keys[pygame.K_SPACE] or keys[pygame.K_w] or keys[pygame.K_UP]: return 2
+    return 3
+
+
+def _write_index(path, index):
+    tmp = os.path.join(path, INDEX + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(index, f)
+    os.replace(tmp, os.path.join(path, INDEX))
+
+
+class DemoWriter:
+    def __init__(self, path, observation_space, chunk_size=65536, buffer_size=1024):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.buffer_size = buffer_size
+        fields = {key: (space.dtype.str, list(space.shape)) for key, space in observation_space.spaces.items()}
+        fields.update(action=(np.dtype(np.int64).str, []), reward=(np.dtype(np.float32).str, []),
+                      done=(np.dtype(bool).str, []))
+        self.obs_keys = list(observation_space.spaces)
+
+        os.makedirs(path, exist_ok=True)
+        index_path = os.path.join(path, INDEX)
+        if os.path.exists(index_path):
+            with open(index_path) as f:
+                self.index = json.load(f)
+            if {k: tuple(v) for k, v in self.index["fields"].items()} != {k: tuple(v) for k, v in fields.items()}:
+                raise ValueError(f"{path} was recorded with a different observation space")
+            self.chunk_size = self.index["chunk_size"]
+        else:
+            self.index = {"chunk_size": chunk_size, "fields": fields, "chunks": []}
+
+        self.fields = {name: (np.dtype(dtype), tuple(shape)) for name, (dtype, shape) in fields.items()}
+        self.buffer = {name: np.empty((buffer_size,) + shape, dtype) for name, (dtype, shape) in self.fields.items()}
+        self.buffered = 0
+        self.chunk = None
+        self.rows = 0
+
+    def __len__(self):
+        return sum(self.index["chunks"]) + self.buffered
+
+    def add(self, obs, action, reward, done):
+        i = self.buffered
+        for key in self.obs_keys:
+            self.buffer[key][i] = obs[key]
+        self.buffer["action"][i] = action
+        self.buffer["reward"][i] = reward
+        self.buffer["done"][i] = done
+        self.buffered += 1
+        if self.buffered == self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        start = 0
+        while start < self.buffered:
+            if self.chunk is None:
+                self._open_chunk()
+            n = min(self.buffered - start, self.chunk_size - self.rows)
+            for name, mm in self.chunk.items():
+                mm[self.rows:self.rows + n] = self.buffer[name][start:start + n]
+            self.rows += n
+            start += n
+            self.index["chunks"][-1] = self.rows
+            if self.rows == self.chunk_size:
+                self._close_chunk()
+        if self.chunk is not None:
+            for mm in self.chunk.values(): mm.flush()
+        self.buffered = 0
+        _write_index(self.path, self.index)
+
+    def _open_chunk(self):
+        chunk_dir = os.path.join(self.path, f"{len(self.index['chunks']):05d}")
+        os.makedirs(chunk_dir, exist_ok=True)
+        self.chunk = {name: np.lib.format.open_memmap(os.path.join(chunk_dir, f"{name}.npy"), mode="w+",
+                                                      dtype=dtype, shape=(self.chunk_size,) + shape)
+                      for name, (dtype, shape) in self.fields.items()}
+        self.index["chunks"].append(0)
+        self.rows = 0
+
+    def _close_chunk(self):
+        for mm in self.chunk.values(): mm.flush()
+        self.chunk = None
+
+    def close(self):
+        self.flush()
+        if self.chunk is not None:
+            self._close_chunk()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class DemoDataset:
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, INDEX)) as f:
+            index = json.load(f)
+        self.chunks = index["chunks"]
+        self.fields = {name: (np.dtype(dtype), tuple(shape)) for name, (dtype, shape) in index["fields"].items()}
+        self.obs_keys = [name for name in self.fields if name not in ("action", "reward", "done")]
+
+    def __len__(self):
+        return sum(self.chunks)
+
+    def chunk(self, i):
+        # Memory-mapped views of chunk i, cut to the rows actually written
+        chunk_dir = os.path.join(self.path, f"{i:05d}")
+        return {name: np.load(os.path.join(chunk_dir, f"{name}.npy"), mmap_mode="r")[:self.chunks[i]]
+                for name in self.fields}
+
+    def batches(self, batch_size=256, shuffle=True, seed=None):
+        # (obs dict, actions) batches. Shuffling is over chunk order and
+        # within each chunk, so only one chunk is mapped at a time
+        rng = np.random.default_rng(seed)
+        order = rng.permutation(len(self.chunks)) if shuffle else range(len(self.chunks))
+        for i in order:
+            data = self.chunk(i)
+            rows = self.chunks[i]
+            idx = rng.permutation(rows) if shuffle else np.arange(rows)
+            for start in range(0, rows, batch_size):
+                # Sorted so each batch reads the mapped pages front to back
+                take = np.sort(idx[start:start + batch_size])
+                yield {key: data[key][take] for key in self.obs_keys}, data["action"][take]
+
+
+# --- RECORDING ---
+
+def record(path, episodes=1, planner=False, seed=None, max_steps=20000, chunk_size=65536, buffer_size=1024):
+    human = not planner
+    env = DoodleJumpEnv(render_mode="rgb_array" if human else None)
+    if human:
+        pygame.init()
+        screen = pygame.display.set_mode((env.width, env.height))
+        pygame.display.set_caption("Doodle Jump - recording")
+        clock = pygame.time.Clock()
+        font = pygame.font.SysFont("Arial", 18, bold=True)
+    else:
+        from planner import LookaheadPlanner
+        agent = LookaheadPlanner()
+
+    quit_requested = False
+    with DemoWriter(path, env.observation_space, chunk_size, buffer_size) as writer:
+        for ep in range(episodes):
+            obs, info = env.reset(seed=None if seed is None else seed + ep)
+            for _ in range(max_steps):
+                if human:
+                    for event in pygame.event.get():
+                        if event.type == pygame.QUIT: quit_requested = True
+                    if quit_requested: break
+                    action = keys_to_action(pygame.key.get_pressed())
+                else:
+                    action = agent.act(env)
+
+                next_obs, reward, terminated, truncated, info = env.step(action)
+                done = terminated or truncated
+                writer.add(obs, action, reward, done)
+                obs = next_obs
+
+                if human:
+                    pygame.surfarray.blit_array(screen, env.render().swapaxes(0, 1))
+                    txt = font.render(f"SCORE: {int(info['score'])}  REC {len(writer)}", True, (50, 50, 50))
+                    screen.blit(txt, (10, 10))
+                    pygame.display.flip()
+                    clock.tick(60)
+                if done: break
+            print(f"Episode {ep + 1}: score {int(info['score'])}, {len(writer)} steps in {path}")
+            if quit_requested: break
+    if human: pygame.quit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("path", help="dataset directory (appended to if it exists)")
+    parser.add_argument("--episodes", type=int, default=1)
+    parser.add_argument("--planner", action="store_true", help="record the lookahead planner instead of the keyboard")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--max-steps", type=int, default=20000)
+    parser.add_argument("--chunk-size", type=int, default=65536)
+    parser.add_argument("--buffer-size", type=int, default=1024)
+    args = parser.parse_args()
+    record(args.path, args.episodes, args.planner, args.seed, args.max_steps, args.chunk_size, args.buffer_size)
@@ -0,0 +1,170 @@
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+from GameView import GameView
+
+# Runs the GameView detectors in parallel worker processes. The capture is
+# converted to HSV once, written into a shared-memory buffer, and every
+# worker runs its share of the detect* calls on that buffer; only the small
+# result lists travel back over the pipes.
+#
+# The detectors only depend on each other in two places, both handled so no
+# second round trip is needed:
+#   - springs need the platform boxes, so platforms, moving platforms and
+#     springs form one task that runs in a single worker;
+#   - monsters need the player/item/platform boxes for exclusion, so workers
+#     return the unfiltered monster boxes and detect() applies the exclusion
+#     (GameView.excludeMonsters) once everything is back.
+# Capture-to-result latency is then roughly the slowest task rather than the
+# sum of all of them, given enough cores.
+
+
+def _platforms_and_springs(game, hsv):
+    platforms = game.detectPlatforms(hsv)
+    moving = game.detectMovingPlatforms(hsv)
+    return {"platforms": platforms, "moving_platforms": moving,
+            "springs": game.detectSprings(hsv, platforms + moving)}
+
+
+def _items(game, hsv):
+    return {"propellor": game.detectPropellors(hsv), "rocket": game.detectRockets(hsv)}
+
+
+# name -> (function, rough cost in ms at full resolution, used to balance workers)
+TASKS = {
+    "platforms": (_platforms_and_springs, 3.0),
+    "monsters": (lambda game, hsv: {"monsters": game.detectMonsters(hsv, [], None)}, 1.3),
+    "items": (_items, 1.0),
+    "black_holes": (lambda game, hsv: {"black_holes": game.detectBlackHoles(hsv)}, 0.8),
+    "brown": (lambda game, hsv: {"brown_platforms": game.detectBrownPlatforms(hsv)}, 0.6),
+    "player": (lambda game, hsv: {"player": game.detectPlayer(hsv)}, 0.5),
+    "white": (lambda game, hsv: {"white_platforms": game.detectWhitePlatforms(hsv)}, 0.5),
+}
+
+
+def assign_tasks(n_workers):
+    # Longest task first onto the least loaded worker
+    loads = [0.0] * n_workers
+    groups = [[] for _ in range(n_workers)]
+    for name, (_, cost) in sorted(TASKS.items(), key=lambda item: -item[1][1]):
+        w = loads.index(min(loads))
+        groups[w].append(name)
+        loads[w] += cost
+    return groups
+
+
+def _attach(names, shapes):
+    blocks = {key: shared_memory.SharedMemory(name=name) for key, name in names.items()}
+    arrays = {key: np.ndarray(shapes[key], dtype=np.uint8, buffer=blocks[key].buf) for key in names}
+    return blocks, arrays
+
+
+def _worker(remote, parent_remote, tasks, detect_scale):
+    parent_remote.close()
+    game = GameView(tile_cache=False, detect_scale=detect_scale)
+    blocks, arrays = {}, {}
+    while True:
+        try:
+            cmd, data = remote.recv()
+            if cmd == "detect":
+                game.full_frame = arrays.get("frame")
+                results = {}
+                for name in tasks:
+                    results.update(TASKS[name][0](game, arrays["hsv"]))
+                remote.send(results)
+            elif cmd == "attach":
+                arrays = {}
+                for shm in blocks.values(): shm.close()
+                blocks, arrays = _attach(*data)
+                remote.send(None)
+            elif cmd == "close":
+                break
+            else:
+                raise NotImplementedError(f"`{cmd}` is not implemented in the worker")
+        except (EOFError, KeyboardInterrupt):
+            break
+    arrays = {}
+    for shm in blocks.values(): shm.close()
+    remote.close()
+
+
+class DetectorPool:
+    def __init__(self, n_workers=None, detect_scale=1, start_method=None):
+        n_workers = max(1, min(len(TASKS), n_workers or mp.cpu_count()))
+        if start_method is None:
+            start_method = "forkserver" if "forkserver" in mp.get_all_start_methods() else "spawn"
+        ctx = mp.get_context(start_method)
+
+        # Local view used for the HSV conversion (and downscaling) only
+        self.game = GameView(tile_cache=False, detect_scale=detect_scale)
+        self.scale = detect_scale
+        self.task_groups = assign_tasks(n_workers)
+
+        self.remotes, self.processes = [], []
+        for tasks in self.task_groups:
+            remote, work_remote = ctx.Pipe()
+            # daemon=True: if the main process crashes, we should not cause things to hang
+            process = ctx.Process(target=_worker, args=(work_remote, remote, tasks, detect_scale), daemon=True)
+            process.start()
+            work_remote.close()
+            self.remotes.append(remote)
+            self.processes.append(process)
+
+        self.blocks, self.arrays = {}, {}
+        self.closed = False
+
+    def _allocate(self, hsv, frame):
+        # (Re)creates the shared buffers for a new capture size
+        self._free()
+        shapes = {"hsv": hsv.shape}
+        if self.scale > 1:
+            shapes["frame"] = frame.shape
+        for key, shape in shapes.items():
+            shm = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)))
+            self.blocks[key] = shm
+            self.arrays[key] = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+        names = {key: shm.name for key, shm in self.blocks.items()}
+        for remote in self.remotes:
+            remote.send(("attach", (names, shapes)))
+        for remote in self.remotes:
+            remote.recv()
+
+    def _free(self):
+        self.arrays = {}
+        for shm in self.blocks.values():
+            shm.close()
+            shm.unlink()
+        self.blocks = {}
+
+    def detect(self, frame):
+        # BGRA capture -> dict with every detector's result, in the same
+        # formats as the GameView methods (player/propellor/rocket are
+        # (bbox, center) pairs, black_holes are contours, the rest box lists)
+        hsv = self.game.getHSV(frame)
+        if "hsv" not in self.arrays or self.arrays["hsv"].shape != hsv.shape:
+            self._allocate(hsv, frame)
+        np.copyto(self.arrays["hsv"], hsv)
+        if self.scale > 1:
+            np.copyto(self.arrays["frame"], frame)
+
+        for remote in self.remotes:
+            remote.send(("detect", None))
+        results = {}
+        for remote in self.remotes:
+            results.update(remote.recv())
+
+        player_bbox, player_center = results["player"]
+        to_exclude = [player_bbox, results["propellor"][0], results["rocket"][0]]
+        to_exclude += results["platforms"] + results["moving_platforms"] + results["springs"]
+        results["monsters"] = self.game.excludeMonsters(results["monsters"], to_exclude, player_center)
+        return results
+
+    def close(self):
+        if self.closed:
+            return
+        for remote in self.remotes:
+            remote.send(("close", None))
+        for process in self.processes:
+            process.join()
+        self._free()
+        self.closed = True
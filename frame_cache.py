@@ -0,0 +1,138 @@
+import cv2
+import numpy as np
+
+# Incremental per-frame state for GameView. Each captured frame is compared
+# with the previous one in `tile` x `tile` blocks, and only the blocks that
+# changed are pushed through the HSV conversion and the per-pixel stages
+# (colour masks, the blurred gray image for template matching). Contours are
+# only searched again when a mask actually changed, so on a mostly static
+# screen the detectors cost about as much as the motion on it.
+#
+# Every result is bit-identical to running the same OpenCV calls on the full
+# frame: per-pixel stages are exact on any sub-rectangle, and stages with a
+# neighbourhood (the 3x3 blur) are computed with a halo around each block.
+
+
+class DeltaFrameCache:
+    def __init__(self, tile=32, full_ratio=0.6):
+        assert tile % 8 == 0
+        self.tile = tile
+        # Above this fraction of changed tiles one full-frame call is cheaper
+        # than many per-block ones
+        self.full_ratio = full_ratio
+        self.shape = None
+        self.frame_index = -1
+        self.hsv = None
+
+    def _allocate(self, frame):
+        h, w = frame.shape[:2]
+        t = self.tile
+        self.shape = frame.shape
+        self.tiles_y, self.tiles_x = -(-h // t), -(-w // t)
+        self.prev = np.empty((h, w), dtype=np.uint32)
+        self.diff = np.zeros((self.tiles_y * t, self.tiles_x * t), dtype=bool)
+        self.hsv = np.empty((h, w, 3), dtype=np.uint8)
+        # Frame index at which each tile last changed
+        self.tile_stamp = np.zeros((self.tiles_y, self.tiles_x), dtype=np.int64)
+        self.layers = {}
+        self.contour_cache = {}
+
+    def update(self, frame):
+        # Takes a BGRA capture, returns the (cached) HSV frame
+        assert frame.ndim == 3 and frame.shape[2] == 4
+        self.frame_index += 1
+        pixels = np.ascontiguousarray(frame).view(np.uint32)[:, :, 0]
+        if frame.shape != self.shape:
+            self._allocate(frame)
+            changed = np.ones_like(self.tile_stamp, dtype=bool)
+        else:
+            # Per-pixel inequality, then OR-reduced 8 bools at a time
+            h, w = pixels.shape
+            np.not_equal(pixels, self.prev, out=self.diff[:h, :w])
+            t = self.tile
+            packed = self.diff.view(np.uint64).reshape(self.tiles_y, t, self.tiles_x * t // 8)
+            changed = np.bitwise_or.reduce(packed, axis=1).reshape(self.tiles_y, self.tiles_x, t // 8).any(axis=2)
+        np.copyto(self.prev, pixels)
+        self.changed = changed
+        self.tile_stamp[changed] = self.frame_index
+
+        for y0, y1, x0, x1 in self._regions(changed):
+            self.hsv[y0:y1, x0:x1] = cv2.cvtColor(frame[y0:y1, x0:x1], cv2.COLOR_BGR2HSV)
+        return self.hsv
+
+    def changed_fraction(self):
+        return float(self.changed.mean()) if self.shape is not None else 1.0
+
+    def _regions(self, grid):
+        # Pixel rectangles covering the True tiles: one per horizontal run
+        # within a tile row, or the whole frame when most tiles are set
+        h, w = self.shape[:2]
+        t = self.tile
+        if grid.mean() > self.full_ratio:
+            return [(0, h, 0, w)]
+        regions = []
+        for ty in np.flatnonzero(grid.any(axis=1)):
+            row = np.concatenate(([False], grid[ty], [False]))
+            edges = np.flatnonzero(row[1:] != row[:-1])
+            for start, end in zip(edges[::2], edges[1::2]):
+                regions.append((ty * t, min(h, (ty + 1) * t), start * t, min(w, end * t)))
+        return regions
+
+    def unchanged_since(self, stamp, x0, y0, x1, y1):
+        # True if no tile under the pixel rectangle changed after frame `stamp`
+        t = self.tile
+        ty0, tx0 = max(0, y0 // t), max(0, x0 // t)
+        ty1, tx1 = max(ty0 + 1, -(-y1 // t)), max(tx0 + 1, -(-x1 // t))
+        return self.tile_stamp[ty0:ty1, tx0:tx1].max() <= stamp
+
+    # --- DERIVED LAYERS ---
+
+    def layer(self, key, fn, halo=0):
+        # Image computed from the HSV frame by `fn`, kept up to date block by
+        # block. `halo` is the radius of fn's neighbourhood (0 for per-pixel
+        # operations). Returns (image, changed since the previous call).
+        entry = self.layers.get(key)
+        if entry is None:
+            entry = self.layers[key] = [fn(self.hsv), self.frame_index]
+            return entry[0], True
+
+        image, stamp = entry
+        dirty = self.tile_stamp > stamp
+        if not dirty.any():
+            return image, False
+        if halo:
+            # A change near a tile edge reaches into the neighbouring tiles
+            grown = dirty.copy()
+            grown[1:] |= dirty[:-1]
+            grown[:-1] |= dirty[1:]
+            grown[:, 1:] |= grown[:, :-1].copy()
+            grown[:, :-1] |= grown[:, 1:].copy()
+            dirty = grown
+
+        h, w = self.shape[:2]
+        regions = self._regions(dirty)
+        if regions == [(0, h, 0, w)]:
+            fresh = fn(self.hsv)
+            entry[:] = fresh, self.frame_index
+            return fresh, not np.array_equal(fresh, image)
+
+        changed = False
+        for y0, y1, x0, x1 in regions:
+            hy0, hx0 = max(0, y0 - halo), max(0, x0 - halo)
+            hy1, hx1 = min(h, y1 + halo), min(w, x1 + halo)
+            block = fn(self.hsv[hy0:hy1, hx0:hx1])[y0 - hy0:y1 - hy0, x0 - hx0:x1 - hx0]
+            if not changed and not np.array_equal(block, image[y0:y1, x0:x1]):
+                changed = True
+            image[y0:y1, x0:x1] = block
+        entry[1] = self.frame_index
+        return image, changed
+
+    def contours(self, key, fn, post=None):
+        # External contours of the mask layer `key`, optionally cleaned up by
+        # `post` (e.g. a morphology pass) first. Reused while the mask is unchanged.
+        mask, changed = self.layer(key, fn)
+        cached = self.contour_cache.get(key)
+        if changed or cached is None:
+            cached = cv2.findContours(post(mask) if post else mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)[0]
+            self.contour_cache[key] = cached
+        return cached
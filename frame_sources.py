@@ -0,0 +1,223 @@
+import glob
+import json
+import os
+import time
+import cv2
+import numpy as np
+
+# Where GameView gets its frames from. Every source returns BGRA uint8 frames
+# (the format of an mss grab) from read(), and None once it is exhausted (with
+# `done` set). Besides the live screen grab there are file sources, so a
+# recorded session can be replayed through main.py without the game running:
+#
+#   python main.py --record session.raw       # play, and dump every frame
+#   python main.py --source session.raw       # replay the dump at full speed
+#   python main.py --source clip.mp4 | frames/ | "frames/*.png"
+#
+# File sources play as fast as they are read unless realtime=True, and report
+# the recording's fps so consumers can use a fixed dt when replaying.
+
+# Game area of the browser window (see GameView.getScreen)
+GAME_MONITOR = {"top": 247, "left": 727, "width": 448, "height": 682}
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+
+def to_bgra(frame):
+    if frame.ndim == 2:
+        return cv2.cvtColor(frame, cv2.COLOR_GRAY2BGRA)
+    if frame.shape[2] == 3:
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2BGRA)
+    return frame
+
+
+class FrameSource:
+    live = False
+    fps = 60.0
+
+    def __init__(self, realtime=False):
+        self.realtime = realtime
+        self.done = False
+        self.index = 0
+        self.next_time = None
+
+    def _read(self):
+        raise NotImplementedError
+
+    def read(self):
+        if self.done:
+            return None
+        frame = self._read()
+        if frame is None:
+            self.done = True
+            return None
+        if self.realtime:
+            # Pace playback at the recording's frame rate
+            now = time.perf_counter()
+            if self.next_time is not None and now < self.next_time:
+                time.sleep(self.next_time - now)
+            self.next_time = max(now, self.next_time or now) + 1.0 / self.fps
+        self.index += 1
+        return frame
+
+    def close(self):
+        pass
+
+    def __iter__(self):
+        while True:
+            frame = self.read()
+            if frame is None:
+                return
+            yield frame
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class LiveSource(FrameSource):
+    live = True
+
+    def __init__(self, monitor=None):
+        super().__init__()
+        self.monitor = dict(monitor or GAME_MONITOR)
+        self.sct = None
+
+    def _read(self):
+        # One mss instance for the whole session instead of one per grab
+        if self.sct is None:
+            import mss
+            self.sct = mss.mss()
+        return np.array(self.sct.grab(self.monitor))
+
+    def close(self):
+        if self.sct is not None:
+            self.sct.close()
+            self.sct = None
+
+
+class VideoSource(FrameSource):
+    def __init__(self, path, realtime=False):
+        super().__init__(realtime)
+        self.capture = cv2.VideoCapture(path)
+        if not self.capture.isOpened():
+            raise FileNotFoundError(path)
+        self.fps = self.capture.get(cv2.CAP_PROP_FPS) or 60.0
+
+    def _read(self):
+        ok, frame = self.capture.read()
+        return to_bgra(frame) if ok else None
+
+    def close(self):
+        self.capture.release()
+
+
+class ImageSequenceSource(FrameSource):
+    # A directory of images or a glob pattern, played in sorted name order
+    def __init__(self, pattern, fps=60.0, realtime=False):
+        super().__init__(realtime)
+        if os.path.isdir(pattern):
+            paths = [os.path.join(pattern, name) for name in os.listdir(pattern)]
+            paths = [p for p in paths if p.lower().endswith(IMAGE_EXTENSIONS)]
+        else:
+            paths = glob.glob(pattern)
+        if not paths:
+            raise FileNotFoundError(pattern)
+        self.paths = sorted(paths)
+        self.fps = fps
+
+    def __len__(self):
+        return len(self.paths)
+
+    def _read(self):
+        if self.index >= len(self.paths):
+            return None
+        return to_bgra(cv2.imread(self.paths[self.index], cv2.IMREAD_UNCHANGED))
+
+
+class RawDumpSource(FrameSource):
+    # Frames written by FrameRecorder: a memory-mapped (n, h, w, 4) array, so
+    # reading a frame is a view into the page cache instead of a decode
+    def __init__(self, path, realtime=False):
+        super().__init__(realtime)
+        with open(path + ".json") as f:
+            meta = json.load(f)
+        shape = (meta["height"], meta["width"], meta["channels"])
+        n = os.path.getsize(path) // int(np.prod(shape))
+        self.frames = np.memmap(path, dtype=np.uint8, mode="r", shape=(n,) + shape)
+        self.fps = meta.get("fps", 60.0)
+
+    def __len__(self):
+        return len(self.frames)
+
+    def _read(self):
+        if self.index >= len(self.frames):
+            return None
+        # Copy so the frame stays valid (and writable) after the next read
+        return np.array(self.frames[self.index])
+
+    def close(self):
+        self.frames = None
+
+
+class FrameRecorder:
+    # Appends raw BGRA frames to `path`, with the frame shape and fps in
+    # path.json. With fps=None (a live capture) the fps is the rate write()
+    # was actually called at, measured over the whole recording: path.json is
+    # written with a provisional 60 on the first frame and rewritten by close()
+    def __init__(self, path, fps=None):
+        self.path = path
+        self.fps = fps
+        self.measure = fps is None
+        self.file = open(path, "wb")
+        self.shape = None
+        self.count = 0
+        self.first_time = self.last_time = None
+
+    def write(self, frame):
+        frame = np.ascontiguousarray(frame)
+        if self.shape is None:
+            self.shape = frame.shape
+            self._write_meta()
+        elif frame.shape != self.shape:
+            raise ValueError(f"frame shape changed from {self.shape} to {frame.shape}")
+        self.file.write(frame.data)
+        self.count += 1
+        self.last_time = time.perf_counter()
+        if self.first_time is None: self.first_time = self.last_time
+
+    def measured_fps(self):
+        if self.count < 2 or self.last_time == self.first_time:
+            return None
+        return (self.count - 1) / (self.last_time - self.first_time)
+
+    def _write_meta(self):
+        h, w, c = self.shape
+        fps = (self.measured_fps() if self.measure else self.fps) or 60.0
+        with open(self.path + ".json", "w") as f:
+            json.dump({"height": h, "width": w, "channels": c, "fps": fps}, f)
+
+    def close(self):
+        self.file.close()
+        if self.measure and self.shape is not None:
+            self._write_meta()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_source(spec=None, realtime=False):
+    # None/"live" -> screen grab; *.raw -> dump; directory or glob -> images;
+    # anything else is opened as a video
+    if spec is None or spec == "live":
+        return LiveSource()
+    if spec.endswith(".raw"):
+        return RawDumpSource(spec, realtime)
+    if os.path.isdir(spec) or any(ch in spec for ch in "*?["):
+        return ImageSequenceSource(spec, realtime=realtime)
+    return VideoSource(spec, realtime)
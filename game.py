@@ -1,13 +1,27 @@
 import pygame
 import sys
+import time
 import random
 import math
+import itertools
+import physics
+import level_gen
 
 # --- CONFIGURATION ---
 RENDER = True
 RESOLUTION = WIDTH, HEIGHT = 448, 682
 TITLE = "Doodle Jump"
+# The simulation always advances in fixed ticks of 1 / TICK_RATE s; FPS only
+# caps how often a frame is drawn (it can be lower or higher than TICK_RATE)
+TICK_RATE = 60
 FPS = 60
+# After a long stall, run at most this many ticks before drawing again and
+# drop the rest of the backlog rather than spiralling further behind
+MAX_TICKS_PER_FRAME = 5
+# No entity moves further than this in one tick (rocket or spring plus the
+# camera scroll stays under ~40 px); a longer jump between two tick states
+# isn't motion and is drawn where it is, not interpolated
+MAX_TICK_MOVE = 64
 
 # FEATURE FLAGS
 ENABLE_MONSTERS = False
@@ -37,14 +51,14 @@ class Projectile:
 
 class Player:
     def __init__(self):
-        self.width, self.height = 30, 30
+        self.width, self.height = physics.PLAYER_W, physics.PLAYER_H
         self.rect = pygame.Rect(WIDTH//2, HEIGHT-100, self.width, self.height)
         self.vel_y = 0
         self.vel_x = 0
-        self.max_vel_x = 7
-        self.accel_x = 0.8
-        self.gravity = 0.35
-        self.jump_power = -11
+        self.max_vel_x = physics.MAX_VEL_X
+        self.accel_x = physics.ACCEL_X
+        self.gravity = physics.GRAVITY
+        self.jump_power = physics.JUMP_POWER
         self.score = 0
         self.powerup_timer = 0
         self.shoot_cooldown = 0
@@ -53,23 +67,10 @@ class Player:
         if keys is not None:
             if keys[pygame.K_LEFT] or keys[pygame.K_a]: self.vel_x -= self.accel_x
             elif keys[pygame.K_RIGHT] or keys[pygame.K_d]: self.vel_x += self.accel_x
-            else: self.vel_x *= 0.85
+            else: self.vel_x *= physics.DAMPING
         else:
-            self.vel_x *= 0.85
-
-        self.vel_x = max(-self.max_vel_x, min(self.max_vel_x, self.vel_x))
-        self.rect.x += self.vel_x
-        if self.rect.right < 0: self.rect.left = WIDTH
-        elif self.rect.left > WIDTH: self.rect.right = 0
-
-        if self.powerup_timer > 0:
-            self.vel_y = -18
-            self.powerup_timer -= 1
-        else:
-            self.vel_y += self.gravity
-
-        self.rect.y += self.vel_y
-        if self.shoot_cooldown > 0: self.shoot_cooldown -= 1
+            self.vel_x *= physics.DAMPING
+        physics.move_player(self, WIDTH)
 
     def draw(self, surface):
         color = (255, 215, 0) if self.powerup_timer > 0 else (255, 255, 0)
@@ -79,8 +80,12 @@ class Player:
         pygame.draw.rect(surface, (0,0,0), self.rect, 2)
         pygame.draw.rect(surface, (0,0,0), (self.rect.centerx-2, self.rect.top-8, 4, 8))
 
+# Monotonic platform ids; unlike id() they are never reused within a process
+_platform_ids = itertools.count()
+
 class Platform:
     def __init__(self, y, score):
+        self.uid = next(_platform_ids)
         self.width, self.height = 60, 12
         self.rect = pygame.Rect(random.randint(0, WIDTH-self.width), y, self.width, self.height)
 
@@ -99,6 +104,18 @@ class Platform:
             elif item_roll < 0.025: self.has_item = 'propeller'
             elif item_roll < 0.05: self.has_item = 'spring'
 
+    @classmethod
+    def from_spec(cls, spec, y):
+        # A level_gen.PlatformSpec placed at screen y
+        p = cls.__new__(cls)
+        p.uid = next(_platform_ids)
+        p.width, p.height = spec.width, 12
+        p.rect = pygame.Rect(spec.x, y, spec.width, p.height)
+        p.type = spec.type
+        p.vel_x = spec.vel_x
+        p.has_item = spec.item
+        return p
+
     def update(self):
         if self.type == 'blue':
             self.rect.x += self.vel_x
@@ -116,10 +133,11 @@ class Platform:
             pygame.draw.circle(surface, (0, 100, 255), (self.rect.centerx, self.rect.top-8), 8)
 
 class Monster:
-    def __init__(self, y):
+    def __init__(self, y, x=None, vel_x=None):
         self.width, self.height = 45, 45
-        self.rect = pygame.Rect(random.randint(0, WIDTH-self.width), y, self.width, self.height)
-        self.vel_x = random.choice([-3, 3])
+        if x is None: x = random.randint(0, WIDTH-self.width)
+        self.rect = pygame.Rect(x, y, self.width, self.height)
+        self.vel_x = random.choice([-3, 3]) if vel_x is None else vel_x
 
     def update(self):
         self.rect.x += self.vel_x
@@ -131,8 +149,8 @@ class Monster:
         pygame.draw.circle(surface, (255,255,255), (self.rect.x+33, self.rect.y+15), 6)
 
 class BlackHole:
-    def __init__(self, y):
-        self.center = [random.randint(50, WIDTH-50), y]
+    def __init__(self, y, x=None):
+        self.center = [random.randint(50, WIDTH-50) if x is None else x, y]
         self.radius = 35
 
     def draw(self, surface):
@@ -141,30 +159,33 @@ class BlackHole:
 
 # --- ENGINE ---
 
-def run_game(screen, clock):
-    player = Player()
-    platforms = [Platform(HEIGHT - 50, 0)]
-    platforms[0].rect.x, platforms[0].rect.width = 0, WIDTH
-    platforms[0].type = 'green'
-
-    monsters, black_holes, bullets = [], [], []
-
-    # Initial generation
-    for i in range(1, 15):
-        platforms.append(Platform(HEIGHT - i*70, 0))
-
-    running = True
-    while running:
-        if RENDER:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    return None # Signal to exit program entirely
-
-        keys = pygame.key.get_pressed()
+def stream_level(level, score, platforms, monsters, black_holes, floor_y=HEIGHT - 50, lookahead=HEIGHT):
+    # Materializes the level up to `lookahead` px above the top of the screen
+    for spec in level.take(level_gen.spawn_altitude(score, floor_y, lookahead)):
+        y = floor_y - spec.altitude + score
+        platforms.append(Platform.from_spec(spec, y))
+        if spec.monster is not None:
+            monsters.append(Monster(y - level_gen.MONSTER_RISE, *spec.monster))
+        if spec.black_hole is not None:
+            black_holes.append(BlackHole(y - level_gen.BLACK_HOLE_RISE, spec.black_hole))
+
+class World:
+    # Everything run_game simulates, advanced one fixed tick at a time
+    def __init__(self, seed=None):
+        self.player = Player()
+        # Same seed, same level
+        self.level = level_gen.LevelGenerator(seed, WIDTH, monsters=ENABLE_MONSTERS,
+                                              black_holes=ENABLE_BLACK_HOLES, powerups=ENABLE_POWERUPS)
+        self.platforms, self.monsters, self.black_holes, self.bullets = [], [], [], []
+        stream_level(self.level, self.player.score, self.platforms, self.monsters, self.black_holes)
+
+    def tick(self, keys):
+        # One simulation step; False once the player has died
+        player = self.player
         player.move(keys)
 
         if (keys[pygame.K_SPACE] or keys[pygame.K_w] or keys[pygame.K_UP]) and player.shoot_cooldown == 0:
-            bullets.append(Projectile(player.rect.centerx - 3, player.rect.top))
+            self.bullets.append(Projectile(player.rect.centerx - 3, player.rect.top))
             player.shoot_cooldown = 12
 
         # Camera scroll & Height-based Score
@@ -172,36 +193,23 @@ def run_game(screen, clock):
             diff = HEIGHT // 2 - player.rect.y
             player.rect.y = HEIGHT // 2
             player.score += diff # Score tied directly to height climbed
-            for p in platforms: p.rect.y += diff
-            for m in monsters: m.rect.y += diff
-            for b in bullets: b.rect.y += diff
-            for bh in black_holes: bh.center[1] += diff
+            for p in self.platforms: p.rect.y += diff
+            for m in self.monsters: m.rect.y += diff
+            for b in self.bullets: b.rect.y += diff
+            for bh in self.black_holes: bh.center[1] += diff
 
         # Update & Cleanup
-        for b in bullets[:]:
-            b.update()
-            if b.rect.bottom < 0: bullets.remove(b)
-
-        for p in platforms: p.update()
-        for m in monsters: m.update()
-
-        platforms = [p for p in platforms if p.rect.top < HEIGHT]
-        monsters = [m for m in monsters if m.rect.top < HEIGHT]
-        black_holes = [bh for bh in black_holes if bh.center[1] - bh.radius < HEIGHT]
+        physics.advance(self.platforms, self.monsters, self.bullets, WIDTH)
+        self.bullets = bullets = [b for b in self.bullets if b.rect.bottom >= 0]
+        self.platforms = platforms = [p for p in self.platforms if p.rect.top < HEIGHT]
+        self.monsters = monsters = [m for m in self.monsters if m.rect.top < HEIGHT]
+        self.black_holes = [bh for bh in self.black_holes if bh.center[1] - bh.radius < HEIGHT]
 
-        # SPAWN logic
-        while len(platforms) < 15:
-            highest_y = min([p.rect.y for p in platforms])
-            new_y = highest_y - random.randint(80, 110)
-            new_plat = Platform(new_y, player.score)
-            platforms.append(new_plat)
-
-            if ENABLE_MONSTERS and random.random() < 0.07:
-                monsters.append(Monster(new_y - 50))
-            if ENABLE_BLACK_HOLES and random.random() < 0.03:
-                black_holes.append(BlackHole(new_y - 90))
+        # SPAWN logic: stream in the level as the camera rises
+        stream_level(self.level, player.score, platforms, monsters, self.black_holes)
 
         # Collisions
+        alive = True
         for p in platforms:
             if player.rect.colliderect(p.rect) and player.vel_y > 0:
                 if player.rect.bottom <= p.rect.centery + 10:
@@ -225,29 +233,105 @@ def run_game(screen, clock):
                 elif player.vel_y > 0 and player.rect.bottom < m.rect.centery:
                     monsters.remove(m)
                     player.vel_y = player.jump_power
-                else: running = False
+                else: alive = False
 
-        for bh in black_holes:
+        for bh in self.black_holes:
             dist = math.hypot(player.rect.centerx - bh.center[0], player.rect.centery - bh.center[1])
             if dist < bh.radius + 5 and player.powerup_timer <= 0:
-                running = False
-
-        if player.rect.top > HEIGHT: running = False
-
-        if RENDER:
-            screen.fill(BACKGROUND)
-            for b in bullets: b.draw(screen)
-            for p in platforms: p.draw(screen)
-            for m in monsters: m.draw(screen)
-            for bh in black_holes: bh.draw(screen)
-            player.draw(screen)
-            font = pygame.font.SysFont("Arial", 18, bold=True)
-            txt = font.render(f"SCORE: {int(player.score)}", True, (50, 50, 50))
-            screen.blit(txt, (10, 10))
-            pygame.display.flip()
-            clock.tick(FPS)
-
-    return player.score
+                alive = False
+
+        if player.rect.top > HEIGHT: alive = False
+        return alive
+
+    # --- INTERPOLATION ---
+
+    def positions(self):
+        # Where everything is now, for draw() after the next tick. Keyed by the
+        # objects themselves, not id(): holding them keeps entities removed by
+        # the tick alive, so a new one can't reuse an id and inherit a position
+        pos = {e: (e.rect.x, e.rect.y) for group in (self.platforms, self.monsters, self.bullets) for e in group}
+        pos.update({bh: tuple(bh.center) for bh in self.black_holes})
+        pos[self.player] = (self.player.rect.x, self.player.rect.y)
+        return pos
+
+    def draw(self, surface, previous=None, alpha=1.0):
+        # Draws every entity `alpha` of the way from its `previous` position
+        # (World.positions() before the last tick) to its current one.
+        # Entities are moved for the draw call and put back, so the
+        # simulation state is never touched; new entities, horizontal wraps
+        # and anything else that jumped are drawn where they are
+        def lerp(e, x, y):
+            if previous is None or e not in previous: return None
+            px, py = previous[e]
+            if abs(x - px) > WIDTH // 2 or abs(y - py) > MAX_TICK_MOVE: return None
+            return round(px + (x - px) * alpha), round(py + (y - py) * alpha)
+
+        surface.fill(BACKGROUND)
+        for group in (self.bullets, self.platforms, self.monsters):
+            for e in group:
+                x, y = e.rect.x, e.rect.y
+                at = lerp(e, x, y)
+                if at: e.rect.topleft = at
+                e.draw(surface)
+                e.rect.topleft = (x, y)
+        for bh in self.black_holes:
+            center = tuple(bh.center)
+            at = lerp(bh, *center)
+            if at: bh.center[:] = at
+            bh.draw(surface)
+            bh.center[:] = center
+        pl = self.player
+        x, y = pl.rect.x, pl.rect.y
+        at = lerp(pl, x, y)
+        if at: pl.rect.topleft = at
+        pl.draw(surface)
+        pl.rect.topleft = (x, y)
+
+def run_game(screen, clock, seed=None):
+    world = World(seed)
+    if not RENDER:
+        # Headless: ticks back to back, no clock
+        while world.tick(pygame.key.get_pressed()): pass
+        return world.player.score
+
+    # Fixed-timestep loop: real time accumulates and is spent in whole ticks,
+    # so a slow frame means several ticks before the next draw (the game
+    # doesn't slow down), and the draw blends the last two tick states by the
+    # unspent remainder (motion stays smooth at any FPS)
+    tick = 1.0 / TICK_RATE
+    font = pygame.font.SysFont("Arial", 18, bold=True)
+    accumulator = 0.0
+    last = time.perf_counter()
+    previous = world.positions()
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                return None # Signal to exit program entirely
+
+        now = time.perf_counter()
+        accumulator += now - last
+        last = now
+
+        # Input is sampled once per frame and held for the frame's ticks
+        keys = pygame.key.get_pressed()
+        ticks = 0
+        while accumulator >= tick and running:
+            if ticks == MAX_TICKS_PER_FRAME:
+                accumulator = 0.0
+                break
+            previous = world.positions()
+            running = world.tick(keys)
+            accumulator -= tick
+            ticks += 1
+
+        world.draw(screen, previous, accumulator / tick)
+        txt = font.render(f"SCORE: {int(world.player.score)}", True, (50, 50, 50))
+        screen.blit(txt, (10, 10))
+        pygame.display.flip()
+        clock.tick(FPS)
+
+    return world.player.score
 
 if __name__ == "__main__":
     pygame.init()
@@ -4,3 +4,17 @@ register(
     id="gymnasium_env_doodle/GridWorld-v0",
     entry_point="gymnasium_env_doodle.envs:GridWorldEnv",
 )
+
+# gym.make gives the single env; gym.make_vec gives the natively batched one
+# (vectorization_mode="sync" still builds num_envs single envs instead)
+register(
+    id="DoodleJump-v0",
+    entry_point="gymnasium_env_doodle.envs.doodle_env:DoodleJumpEnv",
+    vector_entry_point="gymnasium_env_doodle.envs.doodle_vector_env:DoodleJumpVectorEnv",
+    kwargs={
+        "width": 448,
+        "height": 682,
+        "enable_hazards": False,
+        "enable_powerups": False,
+    },
+)
@@ -1 +1,20 @@
-from gymnasium_env_doodle.envs.grid_world import GridWorldEnv
+import importlib
+
+# Envs are imported on first use: gym.make() goes straight to the entry point
+# module, and a worker that only needs one env shouldn't import the others
+# (grid_world pulls in pygame for its window).
+_LAZY = {
+    "GridWorldEnv": "gymnasium_env_doodle.envs.grid_world",
+    "DoodleJumpEnv": "gymnasium_env_doodle.envs.doodle_env",
+    "DoodleJumpVectorEnv": "gymnasium_env_doodle.envs.doodle_vector_env",
+}
+
+__all__ = list(_LAZY)
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        value = getattr(importlib.import_module(_LAZY[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,11 +1,18 @@
 from enum import Enum
 import math
-import random
+import time
 import gymnasium as gym
 from gymnasium import spaces
-import pygame
 import numpy as np
-from game import Player, Projectile, Platform, Monster, BlackHole
+from game import Player, WIDTH, stream_level
+from level_gen import LevelGenerator
+import physics
+from gymnasium_env_doodle.envs.reachability import get_reachability_table
+from gymnasium_env_doodle.envs.rasterizer import Rasterizer
+from gymnasium_env_doodle.envs.telemetry import EnvTelemetry, FALL, STAGNATION
+
+# Frames without a new height record before the episode ends
+STAGNATION_LIMIT = 500
 
 class Action(Enum):
     right = 0
@@ -14,12 +21,28 @@ class Action(Enum):
     stay = 3
 
 class DoodleJumpEnv(gym.Env):
-    def __init__(self, width=448, height=682, enable_hazards=False, enable_powerups=False):
+    metadata = {"render_modes": ["rgb_array"], "render_fps": 60}
+
+    def __init__(self, width=448, height=682, enable_hazards=False, enable_powerups=False,
+                 reachability_obs=False, ensure_reachable=True, render_mode=None,
+                 pixel_obs=False, pixel_shape=(84, 84)):
         super().__init__()
         self.width = width
         self.height = height
         self.enable_hazards = enable_hazards
         self.enable_powerups = enable_powerups
+        self.reachability_obs = reachability_obs
+        self.ensure_reachable = ensure_reachable
+        self.reachability = get_reachability_table() if (reachability_obs or ensure_reachable) else None
+
+        # Both render() and pixel observations use the headless NumPy
+        # rasterizer, so neither needs a pygame display
+        assert render_mode is None or render_mode in self.metadata["render_modes"]
+        self.render_mode = render_mode
+        self.pixel_obs = pixel_obs
+        self._frame_rasterizer = None
+        self._pixel_rasterizer = Rasterizer(width, height, pixel_shape[1], pixel_shape[0], grayscale=True) \
+            if pixel_obs else None
 
         self.max_patience = 240
         self.patience_timer = self.max_patience
@@ -31,15 +54,28 @@ class DoodleJumpEnv(gym.Env):
         self.stagnation_timer = 0
         self.visited_platforms = set()
 
+        # Step timings and episode stats, drained by callbacks.TelemetryCallback
+        self.telemetry = EnvTelemetry()
+        self.episode_steps = 0
+        self.novel_landings = 0
+
         self.action_space = spaces.Discrete(4)
 
         # Updated to 10 closest platforms (x, y, type) = 30 values
-        self.observation_space = spaces.Dict({
+        obs_spaces = {
             "player": spaces.Box(low=-1, high=1, shape=(5,), dtype=np.float32),
             "platforms": spaces.Box(low=-1, high=1, shape=(30,), dtype=np.float32),
             "hazard": spaces.Box(low=-1, high=1, shape=(2,), dtype=np.float32),
             "timer": spaces.Box(low=0, high=1, shape=(1,), dtype=np.float32)
-        })
+        }
+        # Optional: frames to land on each of the 10 platforms from a fresh
+        # take-off, scaled to [0, 1], or -1 if out of reach
+        if reachability_obs:
+            obs_spaces["reachable"] = spaces.Box(low=-1, high=1, shape=(10,), dtype=np.float32)
+        # Optional: downsampled grayscale frame, channel-last for image policies
+        if pixel_obs:
+            obs_spaces["pixels"] = spaces.Box(low=0, high=255, shape=(pixel_shape[0], pixel_shape[1], 1), dtype=np.uint8)
+        self.observation_space = spaces.Dict(obs_spaces)
 
     def _get_obs(self, active_plats=None):
         obs = {
@@ -75,6 +111,15 @@ class DoodleJumpEnv(gym.Env):
 
         obs["platforms"] = np.array(plat_data, dtype=np.float32)
 
+        if self.reachability_obs:
+            reach = np.full(10, -1.0, dtype=np.float32)
+            if active_plats:
+                dx = [p.rect.centerx - self.player.rect.centerx for p in active_plats]
+                dy = [p.rect.top - self.player.rect.bottom for p in active_plats]
+                frames = self.reachability.frames(dx, dy)
+                reach[:len(frames)] = np.where(frames >= 0, frames / self.reachability.max_frames, -1.0)
+            obs["reachable"] = reach
+
         hazards = self.monsters + self.black_holes
         if hazards:
             closest_h = min(hazards, key=lambda h: math.dist(self.player.rect.center,
@@ -87,44 +132,77 @@ class DoodleJumpEnv(gym.Env):
         else:
             obs["hazard"] = np.array([0.0, -1.0], dtype=np.float32)
 
+        if self.pixel_obs:
+            obs["pixels"] = self._pixel_rasterizer.draw(self).copy()
+
         return obs
 
+    def render(self):
+        if self.render_mode == "rgb_array":
+            if self._frame_rasterizer is None:
+                self._frame_rasterizer = Rasterizer(self.width, self.height)
+            return self._frame_rasterizer.draw(self).copy()
+
     def _get_info(self):
         return {"score": self.player.score}
 
+    def clone_state(self):
+        # Plain-tuple snapshot of everything the physics depends on, cheap enough
+        # to take every frame for search-based agents (see planner.py)
+        pl = self.player
+        return {
+            "player": (pl.rect.x, pl.rect.y, pl.vel_x, pl.vel_y),
+            "platforms": [(p.rect.x, p.rect.y, p.rect.width, p.rect.height, p.type, p.vel_x)
+                          for p in self.platforms],
+            "score": pl.score,
+            "last_action": self.last_action,
+        }
+
     def _update_game_logic(self):
         self.player.move(keys=None)
 
-        if self.player.rect.y < self.height // 2:
+        # Monsters and bullets only move on ticks where the camera scrolls
+        scrolled = self.player.rect.y < self.height // 2
+        if scrolled:
             diff = self.height // 2 - self.player.rect.y
             self.player.rect.y = self.height // 2
             self.player.score += diff
             for p in self.platforms: p.rect.y += diff
-            for m in self.monsters: m.update(); m.rect.y += diff
-            for b in self.bullets: b.update(); b.rect.y += diff
+            for m in self.monsters: m.rect.y += diff
+            for b in self.bullets: b.rect.y += diff
             for bh in self.black_holes: bh.center[1] += diff
 
-        for p in self.platforms: p.update()
+        # Entities bounce off game.WIDTH, as their update() methods did
+        physics.advance(self.platforms, self.monsters if scrolled else (), self.bullets if scrolled else (), WIDTH)
 
-        self.platforms = [p for p in self.platforms if p.rect.top < self.height]
+        # Platforms scrolling off the bottom also leave the visited window
+        kept = []
+        for p in self.platforms:
+            if p.rect.top < self.height: kept.append(p)
+            else: self.visited_platforms.discard(p.uid)
+        self.platforms = kept
         self.monsters = [m for m in self.monsters if m.rect.top < self.height]
         self.black_holes = [bh for bh in self.black_holes if bh.center[1] - bh.radius < self.height]
 
-        while len(self.platforms) < 15:
-            highest_y = min([p.rect.y for p in self.platforms])
-            new_y = highest_y - random.randint(80, 110)
-            new_plat = Platform(new_y, self.player.score)
-            self.platforms.append(new_plat)
+        # New platforms stream in from the level as the camera rises
+        stream_level(self.level, self.player.score, self.platforms, self.monsters, self.black_holes,
+                     self.height - 50, self.height)
 
+        # Returns the platform landed on this tick (if any) for the novelty reward
         for p in self.platforms:
             if self.player.rect.colliderect(p.rect) and self.player.vel_y > 0:
                 if self.player.rect.bottom <= p.rect.centery + 10:
                     self.player.rect.bottom = p.rect.top
                     self.player.vel_y = self.player.jump_power
                     if p.type == 'white': self.platforms.remove(p)
-                    break
+                    return p
+        return None
+
+    def drain_telemetry(self):
+        return self.telemetry.drain()
 
     def step(self, action):
+        t0 = time.perf_counter_ns()
         # 1. Action execution
         if action == 0: self.player.vel_x += self.player.accel_x
         elif action == 1: self.player.vel_x -= self.player.accel_x
@@ -134,8 +212,8 @@ class DoodleJumpEnv(gym.Env):
                                 (action == 1 and self.last_action == 0) else 0.0
         self.last_action = action
 
-        old_vel_y = self.player.vel_y
-        self._update_game_logic()
+        landed = self._update_game_logic()
+        t1 = time.perf_counter_ns()
 
         reward = jitter_penalty
         terminated = False
@@ -151,38 +229,43 @@ class DoodleJumpEnv(gym.Env):
             self.stagnation_timer += 1
             reward -= 0.1
 
-        # --- 3. CLOSEST PLATFORMS & NOVELTY JUMP REWARD ---
-        platform_distances = []
-        for p in self.platforms:
-            dist = math.sqrt((self.player.rect.centerx - p.rect.centerx)**2 +
-                             (self.player.rect.centery - p.rect.centery)**2)
-            platform_distances.append((dist, p))
-
-        sorted_by_dist = sorted(platform_distances, key=lambda x: x[0])
-        closest_10_platforms = [p for dist, p in sorted_by_dist[:10]]
-
-        for p in closest_10_platforms:
-            if self.player.rect.colliderect(p.rect) and old_vel_y > 0:
-                p_id = id(p)
-                if p_id not in self.visited_platforms:
-                    self.visited_platforms.add(p_id)
-                    reward += 50.0
-                else:
-                    reward -= 5.0
-                break
+        # --- 3. NOVELTY JUMP REWARD ---
+        # visited_platforms only holds uids of platforms still on screen, so it
+        # stays bounded; white platforms vanish on landing and are never added
+        if landed is not None:
+            if landed.uid not in self.visited_platforms:
+                if landed.type != 'white': self.visited_platforms.add(landed.uid)
+                reward += 50.0
+                self.novel_landings += 1
+            else:
+                reward -= 5.0
 
         # --- 4. STAGNATION DEATH ---
-        STAGNATION_LIMIT = 500
+        cause = None
         if self.stagnation_timer > STAGNATION_LIMIT:
             reward -= 100.0
             terminated = True
+            cause = STAGNATION
 
         # --- 5. TERMINATION ---
         if self.player.rect.top > self.height:
             reward -= 200.0
             terminated = True
-
-        return self._get_obs(closest_10_platforms), reward, terminated, truncated, self._get_info()
+            cause = FALL
+        t2 = time.perf_counter_ns()
+
+        obs = self._get_obs()
+        t3 = time.perf_counter_ns()
+        tm = self.telemetry
+        tm.steps += 1
+        tm.step_ns += t3 - t0
+        tm.physics_ns += t1 - t0
+        tm.reward_ns += t2 - t1
+        tm.obs_ns += t3 - t2
+        self.episode_steps += 1
+        if terminated:
+            tm.end_episode(self.episode_steps, self.player.score, self.novel_landings, cause)
+        return obs, reward, terminated, truncated, self._get_info()
 
     def reset(self, seed=None, options=None):
         super().reset(seed=seed)
@@ -194,14 +277,18 @@ class DoodleJumpEnv(gym.Env):
         self.max_height = self.player.rect.centery
         self.stagnation_timer = 0
         self.visited_platforms = set()
-
-        self.platforms = [Platform(self.height - 50, 0)]
-        self.platforms[0].rect.x, self.platforms[0].rect.width = 0, self.width
-        self.platforms[0].type = 'green'
-
-        self.monsters, self.black_holes, self.bullets = [], [], []
-        for i in range(1, 15):
-            self.platforms.append(Platform(self.height - i*70, 0))
+        self.episode_steps = 0
+        self.novel_landings = 0
+
+        # Seeded level (reproducible from reset(seed=...)); ensure_reachable
+        # keeps every gap inside the jump envelope as it is generated. Only
+        # levels of an explicitly seeded reset (the ones evaluations replay)
+        # go through the shared chunk store cache
+        self.level = LevelGenerator(int(self.np_random.integers(2**31)), WIDTH,
+                                    ensure_reachable=self.ensure_reachable, shared=seed is not None)
+        self.platforms, self.monsters, self.black_holes, self.bullets = [], [], [], []
+        stream_level(self.level, 0, self.platforms, self.monsters, self.black_holes,
+                     self.height - 50, self.height)
 
         self.patience_timer = self.max_patience
         return self._get_obs(), self._get_info()
@@ -0,0 +1,328 @@
+import numpy as np
+from gymnasium.vector import AutoresetMode, VectorEnv
+from gymnasium.vector.utils import batch_space
+from game import WIDTH, HEIGHT
+import level_gen
+import physics
+from gymnasium_env_doodle.envs.doodle_env import DoodleJumpEnv, STAGNATION_LIMIT
+from gymnasium_env_doodle.envs.reachability import get_reachability_table
+
+# DoodleJumpEnv for a whole batch at once: the state of every env lives in
+# (num_envs,) and (num_envs, SLOTS) arrays and step() is a fixed number of
+# array operations, however many envs there are. This is what
+# gym.make_vec("DoodleJump-v0", num_envs=...) returns.
+#
+# It follows DoodleJumpEnv.step tick for tick (the same physics, level
+# streaming, landing order, rewards and observations), the only difference
+# being where the level comes from: every env has a buffer of upcoming
+# platform specs, refilled a chunk at a time for many envs at once by
+# _generate_chunk with the same rules as level_gen.ChunkStore, but drawing
+# from the batch's np_random. Platforms live in SLOTS fixed slots per env
+# (enough for the screen plus the streaming lookahead), and a slot's spawn
+# counter (uid) stands in for its list position wherever the scalar env
+# depends on list order.
+#
+# Autoreset follows SyncVectorEnv's default (NEXT_STEP): the step after an
+# env terminates resets it, ignoring its action and returning reward 0.
+
+# Platforms between the streaming horizon (a screen above the top edge) and
+# the bottom edge, at least START_SPACING apart
+SLOTS = 24
+CHUNK = 32
+GREEN, BLUE, WHITE = 0, 1, 2
+# Platform type draw above EASY_ALTITUDE: random.choice(['green', 'green', 'blue', 'white'])
+TYPE_CHOICES = np.array([GREEN, GREEN, BLUE, WHITE])
+
+
+class DoodleJumpVectorEnv(VectorEnv):
+    metadata = {"autoreset_mode": AutoresetMode.NEXT_STEP}
+
+    def __init__(self, num_envs=1, width=448, height=682, enable_hazards=False, enable_powerups=False,
+                 reachability_obs=False, ensure_reachable=True, render_mode=None, pixel_obs=False,
+                 pixel_shape=(84, 84), max_episode_steps=None):
+        if pixel_obs or render_mode is not None:
+            raise ValueError("pixel observations and rendering need the per-env DoodleJumpEnv: "
+                             "use gym.make_vec(..., vectorization_mode='sync')")
+        self.num_envs = num_envs
+        self.width = width
+        self.height = height
+        self.enable_hazards = enable_hazards
+        self.enable_powerups = enable_powerups
+        self.reachability_obs = reachability_obs
+        self.ensure_reachable = ensure_reachable
+        self.reachability = get_reachability_table() if (reachability_obs or ensure_reachable) else None
+        self.max_episode_steps = max_episode_steps
+        self.render_mode = None
+
+        # Same spaces as the single env
+        single = DoodleJumpEnv(width, height, reachability_obs=reachability_obs, ensure_reachable=False)
+        self.single_observation_space = single.observation_space
+        self.single_action_space = single.action_space
+        self.observation_space = batch_space(self.single_observation_space, num_envs)
+        self.action_space = batch_space(self.single_action_space, num_envs)
+        self.max_patience = single.max_patience
+
+        n = num_envs
+        # Player
+        self.x = np.zeros(n, dtype=np.int64)
+        self.y = np.zeros(n, dtype=np.int64)
+        self.vx = np.zeros(n)
+        self.vy = np.zeros(n)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.max_height = np.zeros(n, dtype=np.int64)
+        self.stagnation = np.zeros(n, dtype=np.int64)
+        self.last_action = np.full(n, 3, dtype=np.int64)
+        self.steps = np.zeros(n, dtype=np.int64)
+        # Platforms
+        self.px = np.zeros((n, SLOTS), dtype=np.int64)
+        self.py = np.zeros((n, SLOTS), dtype=np.int64)
+        self.pw = np.zeros((n, SLOTS), dtype=np.int64)
+        self.ph = np.zeros((n, SLOTS), dtype=np.int64)
+        self.pvx = np.zeros((n, SLOTS), dtype=np.int64)
+        self.ptype = np.zeros((n, SLOTS), dtype=np.int64)
+        self.alive = np.zeros((n, SLOTS), dtype=bool)
+        self.visited = np.zeros((n, SLOTS), dtype=bool)
+        self.uid = np.zeros((n, SLOTS), dtype=np.int64)
+        self.next_uid = 0
+        # Upcoming level: CHUNK specs per env, the next one at `cursor`, and the
+        # stream's top (the last spec generated) to continue from
+        self.spec_alt = np.zeros((n, CHUNK), dtype=np.int64)
+        self.spec_x = np.zeros((n, CHUNK), dtype=np.int64)
+        self.spec_w = np.zeros((n, CHUNK), dtype=np.int64)
+        self.spec_type = np.zeros((n, CHUNK), dtype=np.int64)
+        self.spec_vel = np.zeros((n, CHUNK), dtype=np.int64)
+        self.cursor = np.zeros(n, dtype=np.int64)
+        self.chunk_index = np.zeros(n, dtype=np.int64)
+        self.top_alt = np.zeros(n, dtype=np.int64)
+        self.top_x = np.zeros(n, dtype=np.int64)
+        self.top_w = np.zeros(n, dtype=np.int64)
+
+        self._autoreset = np.zeros(n, dtype=bool)
+        self._rows = np.arange(n)
+
+    # --- LEVEL ---
+
+    def _generate_chunk(self, rows):
+        # Next CHUNK specs for each env in `rows` (k, CHUNK) per field;
+        # envs at chunk 0 start with the floor and the evenly spaced platforms
+        k = len(rows)
+        rng = self.np_random
+        alt, x, w = np.zeros((3, k, CHUNK), dtype=np.int64)
+        kind, vel = np.zeros((2, k, CHUNK), dtype=np.int64)
+        first = self.chunk_index[rows] == 0
+        top_alt, top_x, top_w = self.top_alt[rows], self.top_x[rows], self.top_w[rows]
+        start = level_gen.START_PLATFORMS
+
+        if first.any():
+            i = np.arange(start)
+            alt[first, :start] = i * level_gen.START_SPACING - 50
+            alt[first, 0] = 0
+            x[first, 1:start] = rng.integers(0, WIDTH - 60, size=(first.sum(), start - 1), endpoint=True)
+            w[first, :start] = 60
+            w[first, 0] = WIDTH
+            top_alt = np.where(first, alt[:, start - 1], top_alt)
+            top_x = np.where(first, x[:, start - 1], top_x)
+            top_w = np.where(first, 60, top_w)
+
+        for j in range(CHUNK):
+            new = ~first if j < start else np.ones(k, dtype=bool)
+            a = top_alt + rng.integers(level_gen.GAP_MIN, level_gen.GAP_MAX, size=k, endpoint=True)
+            px = rng.integers(0, WIDTH - 60, size=k, endpoint=True)
+            t = np.where(a < level_gen.EASY_ALTITUDE, GREEN, TYPE_CHOICES[rng.integers(0, 4, size=k)])
+            v = np.where(t == BLUE, rng.choice([-2, 2], size=k), 0)
+            if self.ensure_reachable:
+                a, px = self._make_reachable(top_alt, top_x, top_w, a, px)
+            alt[new, j], x[new, j], w[new, j], kind[new, j], vel[new, j] = a[new], px[new], 60, t[new], v[new]
+            top_alt = np.where(new, a, top_alt)
+            top_x = np.where(new, px, top_x)
+            top_w = np.where(new, 60, top_w)
+
+        self.top_alt[rows], self.top_x[rows], self.top_w[rows] = top_alt, top_x, top_w
+        return alt, x, w, kind, vel
+
+    def _make_reachable(self, below_alt, below_x, below_w, alt, x):
+        # level_gen.ChunkStore._make_reachable for one new platform per env
+        table = self.reachability
+        too_high = table.horizontal_limits(below_alt - alt) < 0
+        alt = np.where(too_high, below_alt + table.max_rise - 1, alt)
+        limit = table.horizontal_limits(below_alt - alt)
+        below_cx = below_x + below_w // 2
+        dx = x + 30 - below_cx
+        moved = np.clip(below_cx + np.where(dx > 0, limit, -limit) - 30, 0, WIDTH - 60)
+        return alt, np.where(np.abs(dx) > limit, moved, x)
+
+    def _refill(self, rows):
+        alt, x, w, kind, vel = self._generate_chunk(rows)
+        self.spec_alt[rows], self.spec_x[rows], self.spec_w[rows] = alt, x, w
+        self.spec_type[rows], self.spec_vel[rows] = kind, vel
+        self.cursor[rows] = 0
+        self.chunk_index[rows] += 1
+
+    def _stream(self):
+        # Materializes every spec up to a screen above the top edge (see
+        # game.stream_level); one cursor step per platform
+        limit = level_gen.spawn_altitude(self.score, self.height - 50, self.height)
+        while True:
+            due = (self.spec_alt[self._rows, self.cursor] <= limit) & ~self.alive.all(axis=1)
+            rows = np.flatnonzero(due)
+            if len(rows) == 0:
+                return
+            c = self.cursor[rows]
+            slot = np.argmin(self.alive[rows], axis=1)
+            self.px[rows, slot] = self.spec_x[rows, c]
+            self.py[rows, slot] = self.height - 50 - self.spec_alt[rows, c] + self.score[rows]
+            self.pw[rows, slot] = self.spec_w[rows, c]
+            self.ph[rows, slot] = 12
+            self.ptype[rows, slot] = self.spec_type[rows, c]
+            self.pvx[rows, slot] = self.spec_vel[rows, c]
+            self.alive[rows, slot] = True
+            self.visited[rows, slot] = False
+            self.uid[rows, slot] = self.next_uid + np.arange(len(rows))
+            self.next_uid += len(rows)
+            self.cursor[rows] += 1
+            spent = rows[self.cursor[rows] == CHUNK]
+            if len(spent): self._refill(spent)
+
+    # --- EPISODES ---
+
+    def _reset_rows(self, rows):
+        if len(rows) == 0:
+            return
+        self.x[rows] = WIDTH // 2
+        self.y[rows] = HEIGHT - 100
+        self.vx[rows] = 0.0
+        self.vy[rows] = 0.0
+        self.score[rows] = 0
+        self.max_height[rows] = HEIGHT - 100 + physics.PLAYER_H // 2
+        self.stagnation[rows] = 0
+        self.last_action[rows] = 3
+        self.steps[rows] = 0
+
+        # A new level, streamed in up to the horizon
+        self.alive[rows] = False
+        self.chunk_index[rows] = 0
+        self._refill(rows)
+        self._stream()
+
+    def reset(self, *, seed=None, options=None):
+        super().reset(seed=seed, options=options)
+        mask = options.get("reset_mask") if options else None
+        rows = self._rows if mask is None else self._rows[np.asarray(mask)]
+        self._reset_rows(rows)
+        self._autoreset[rows] = False
+        return self._get_obs(), self._get_info()
+
+    # --- SIMULATION ---
+
+    def step(self, actions):
+        a = np.asarray(actions, dtype=np.int64)
+        resetting = np.flatnonzero(self._autoreset)
+
+        # 1. Action execution
+        self.vx = np.where(a == 0, self.vx + physics.ACCEL_X,
+                  np.where(a == 1, self.vx - physics.ACCEL_X,
+                  np.where(a == 3, self.vx * physics.DAMPING, self.vx)))
+        reward = np.where(((a == 0) & (self.last_action == 1)) | ((a == 1) & (self.last_action == 0)), -1.0, 0.0)
+        self.last_action = a.copy()
+
+        # Player.move(keys=None); powerups never trigger in this env
+        no_boost = np.zeros(self.num_envs, dtype=np.int64)
+        physics.step_players(self.x, self.y, self.vx, self.vy, no_boost, no_boost.copy(),
+                             np.ones(self.num_envs, dtype=bool), WIDTH)
+
+        # Camera scroll
+        half = self.height // 2
+        diff = np.maximum(half - self.y, 0)
+        self.y += diff
+        self.score += diff
+        self.py += diff[:, None]
+
+        physics.step_movers(self.px, self.pvx, self.pw, WIDTH)
+        gone = self.alive & (self.py >= self.height)
+        self.alive &= ~gone
+        self.visited &= ~gone
+        self._stream()
+
+        # Landing: the first platform (in spawn order) satisfying the rule
+        x, y = self.x[:, None], self.y[:, None]
+        hit = (self.alive & (self.vy > 0)[:, None]
+               & (x < self.px + self.pw) & (self.px < x + physics.PLAYER_W)
+               & (y < self.py + self.ph) & (self.py < y + physics.PLAYER_H)
+               & (y + physics.PLAYER_H <= self.py + self.ph // 2 + 10))
+        landed = hit.any(axis=1)
+        slot = np.argmin(np.where(hit, self.uid, np.iinfo(np.int64).max), axis=1)
+        rows = self._rows
+        self.y = np.where(landed, self.py[rows, slot] - physics.PLAYER_H, self.y)
+        self.vy = np.where(landed, float(physics.JUMP_POWER), self.vy)
+        white = landed & (self.ptype[rows, slot] == WHITE)
+        self.alive[rows[white], slot[white]] = False
+
+        # 2. Altitude progress
+        cy = self.y + physics.PLAYER_H // 2
+        up = cy < self.max_height
+        reward = np.where(up, reward + (self.max_height - cy) * 15.0, reward - 0.1)
+        self.max_height = np.where(up, cy, self.max_height)
+        self.stagnation = np.where(up, 0, self.stagnation + 1)
+
+        # 3. Novelty jump reward
+        seen = self.visited[rows, slot]
+        reward = np.where(landed, np.where(seen, reward - 5.0, reward + 50.0), reward)
+        novel = landed & ~seen & ~white
+        self.visited[rows[novel], slot[novel]] = True
+
+        # 4./5. Stagnation death and falling off the screen
+        stagnated = self.stagnation > STAGNATION_LIMIT
+        reward = np.where(stagnated, reward - 100.0, reward)
+        fell = self.y > self.height
+        reward = np.where(fell, reward - 200.0, reward)
+        terminated = stagnated | fell
+
+        self.steps += 1
+        truncated = (self.steps >= self.max_episode_steps) if self.max_episode_steps else np.zeros_like(terminated)
+
+        # Envs that finished on the previous step start over instead
+        self._reset_rows(resetting)
+        reward[resetting] = 0.0
+        terminated[resetting] = False
+        truncated[resetting] = False
+        self._autoreset = terminated | truncated
+        return self._get_obs(), reward, terminated, truncated, self._get_info()
+
+    # --- OBSERVATIONS ---
+
+    def _get_obs(self):
+        n = self.num_envs
+        cx = self.x + physics.PLAYER_W // 2
+        cy = self.y + physics.PLAYER_H // 2
+        player = np.stack([cx / self.width, cy / self.height, self.vx / physics.MAX_VEL_X, self.vy / 20.0,
+                           np.zeros(n)], axis=1)
+
+        # 10 closest platforms, ties in spawn order as with the stable sort
+        pcx = self.px + self.pw // 2
+        pcy = self.py + self.ph // 2
+        dist = np.where(self.alive, np.sqrt((cx[:, None] - pcx) ** 2 + (cy[:, None] - pcy) ** 2), np.inf)
+        near = np.lexsort((self.uid, dist), axis=-1)[:, :10]
+        rows = self._rows[:, None]
+        valid = self.alive[rows, near]
+        plats = np.stack([
+            np.where(valid, (pcx[rows, near] - cx[:, None]) / self.width, 0.0),
+            np.where(valid, (pcy[rows, near] - cy[:, None]) / self.height, -1.0),
+            np.where(valid, self.ptype[rows, near] / 3.0, 0.0),
+        ], axis=2).reshape(n, 30)
+
+        obs = {
+            "player": player.astype(np.float32),
+            "platforms": plats.astype(np.float32),
+            "hazard": np.tile(np.array([0.0, -1.0], dtype=np.float32), (n, 1)),
+            "timer": np.ones((n, 1), dtype=np.float32),
+        }
+        if self.reachability_obs:
+            dx = pcx[rows, near] - cx[:, None]
+            dy = self.py[rows, near] - (self.y + physics.PLAYER_H)[:, None]
+            frames = self.reachability.frames(dx, dy)
+            reach = np.where(frames >= 0, frames / self.reachability.max_frames, -1.0)
+            obs["reachable"] = np.where(valid, reach, -1.0).astype(np.float32)
+        return obs
+
+    def _get_info(self):
+        return {"score": self.score.copy(), "_score": np.ones(self.num_envs, dtype=bool)}
@@ -0,0 +1,96 @@
+import numpy as np
+from game import BACKGROUND, PLAT_GREEN, PLAT_BLUE, PLAT_WHITE, MONSTER_COLOR, BLACK_HOLE_COLOR, BULLET_COLOR
+
+PLATFORM_COLORS = {'green': PLAT_GREEN, 'blue': PLAT_BLUE, 'white': PLAT_WHITE}
+PLAYER_COLOR, PLAYER_POWERUP_COLOR = (255, 255, 0), (255, 215, 0)
+OUTLINE = (0, 0, 0)
+
+
+class Rasterizer:
+    # Headless NumPy renderer for DoodleJumpEnv state. Draws the same shapes as
+    # the pygame draw() methods in game.py straight into one preallocated
+    # (out_height, out_width, channels) uint8 buffer, optionally scaled down and
+    # in grayscale. Outlines and other 1-2px details are only drawn at full
+    # resolution, where they are still visible.
+    def __init__(self, width, height, out_width=None, out_height=None, grayscale=False):
+        self.out_width = out_width or width
+        self.out_height = out_height or height
+        self.sx = self.out_width / width
+        self.sy = self.out_height / height
+        self.details = self.sx >= 1 and self.sy >= 1
+        self.grayscale = grayscale
+        self.frame = np.empty((self.out_height, self.out_width, 1 if grayscale else 3), dtype=np.uint8)
+        self._colors = {}
+        self._masks = {}
+        # Plain memcpy per frame is much cheaper than broadcasting a colour
+        self._background = np.empty_like(self.frame)
+        self._background[:] = self._color(BACKGROUND)
+
+    def _color(self, rgb):
+        color = self._colors.get(rgb)
+        if color is None:
+            if self.grayscale:
+                color = np.array([round(0.299 * rgb[0] + 0.587 * rgb[1] + 0.114 * rgb[2])], dtype=np.uint8)
+            else:
+                color = np.array(rgb, dtype=np.uint8)
+            self._colors[rgb] = color
+        return color
+
+    def _span(self, x, y, w, h):
+        # Scaled pixel bounds, always at least one pixel wide/high
+        x0, y0 = int(x * self.sx), int(y * self.sy)
+        return x0, y0, max(x0 + 1, int((x + w) * self.sx)), max(y0 + 1, int((y + h) * self.sy))
+
+    def fill_rect(self, x, y, w, h, rgb):
+        x0, y0, x1, y1 = self._span(x, y, w, h)
+        x0, y0, x1, y1 = max(0, x0), max(0, y0), min(self.out_width, x1), min(self.out_height, y1)
+        if x0 < x1 and y0 < y1:
+            self.frame[y0:y1, x0:x1] = self._color(rgb)
+
+    def outline_rect(self, x, y, w, h, rgb, thickness=1):
+        if not self.details:
+            return
+        self.fill_rect(x, y, w, thickness, rgb)
+        self.fill_rect(x, y + h - thickness, w, thickness, rgb)
+        self.fill_rect(x, y, thickness, h, rgb)
+        self.fill_rect(x + w - thickness, y, thickness, h, rgb)
+
+    def fill_ellipse(self, x, y, w, h, rgb):
+        ux0, uy0, ux1, uy1 = self._span(x, y, w, h)
+        x0, y0, x1, y1 = max(0, ux0), max(0, uy0), min(self.out_width, ux1), min(self.out_height, uy1)
+        if x0 >= x1 or y0 >= y1:
+            return
+        mw, mh = ux1 - ux0, uy1 - uy0
+        mask = self._masks.get((mw, mh))
+        if mask is None:
+            yy, xx = np.ogrid[:mh, :mw]
+            mask = ((xx + 0.5 - mw / 2) / (mw / 2)) ** 2 + ((yy + 0.5 - mh / 2) / (mh / 2)) ** 2 <= 1.0
+            self._masks[(mw, mh)] = mask
+        self.frame[y0:y1, x0:x1][mask[y0 - uy0:y1 - uy0, x0 - ux0:x1 - ux0]] = self._color(rgb)
+
+    def draw(self, env):
+        np.copyto(self.frame, self._background)
+
+        for b in env.bullets:
+            self.fill_rect(b.rect.x, b.rect.y, b.rect.width, b.rect.height, BULLET_COLOR)
+
+        for p in env.platforms:
+            r = p.rect
+            self.fill_rect(r.x, r.y, r.width, r.height, PLATFORM_COLORS[p.type])
+            self.outline_rect(r.x, r.y, r.width, r.height, OUTLINE)
+
+        for m in env.monsters:
+            r = m.rect
+            self.fill_ellipse(r.x, r.y, r.width, r.height, MONSTER_COLOR)
+
+        for bh in env.black_holes:
+            cx, cy = bh.center
+            self.fill_ellipse(cx - bh.radius, cy - bh.radius, 2 * bh.radius, 2 * bh.radius, BLACK_HOLE_COLOR)
+
+        pl = env.player
+        r = pl.rect
+        self.fill_rect(r.x, r.y, r.width, r.height, PLAYER_POWERUP_COLOR if pl.powerup_timer > 0 else PLAYER_COLOR)
+        self.outline_rect(r.x, r.y, r.width, r.height, OUTLINE, 2)
+        if self.details:
+            self.fill_rect(r.centerx - 2, r.top - 8, 4, 8, OUTLINE)
+        return self.frame
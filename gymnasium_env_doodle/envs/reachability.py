@@ -0,0 +1,78 @@
+from functools import lru_cache
+import numpy as np
+from game import Player, WIDTH
+from physics import rect_round as _rect_round
+
+
+class ReachabilityTable:
+    # Jump reachability from a fresh take-off (vel_y = jump_power, vel_x = 0),
+    # steering at full acceleration towards the target the way DoodleJumpEnv.step
+    # applies actions. Offsets are platform-top minus player-feet (dy, negative
+    # is above) and platform-centre minus player-centre (dx). Screen wrap-around
+    # is ignored, so "reachable" is conservative.
+    def __init__(self, plat_width=60, plat_height=12, max_drop=682, max_frames=240):
+        player = Player()
+        self.plat_width = plat_width
+        self.max_frames = max_frames
+
+        # Feet height and horizontal reach after each tick
+        feet, vy = [0], player.jump_power
+        shift, x, vx = [0], 0, 0.0
+        falling = [False]
+        for _ in range(max_frames):
+            vx = min(player.max_vel_x, (vx + player.accel_x) * 0.85)
+            x = _rect_round(x + vx)
+            shift.append(x)
+            vy += player.gravity
+            feet.append(_rect_round(feet[-1] + vy))
+            falling.append(vy > 0)
+        self.max_shift = np.array(shift, dtype=np.int32)
+        self.max_rise = -min(feet)
+
+        # Landing rule from _update_game_logic: falling, feet below the platform
+        # top and no deeper than centery + 10, i.e. top + height // 2 + 10.
+        tolerance = plat_height // 2 + 10
+        self.dy_min = -self.max_rise
+        dys = np.arange(self.dy_min, max_drop + 1)
+        land = np.full(len(dys), -1, dtype=np.int16)
+        for t in range(1, max_frames + 1):
+            if not falling[t]:
+                continue
+            hit = (land < 0) & (dys < feet[t]) & (feet[t] <= dys + tolerance)
+            land[hit] = t
+        self.land_frames = land
+
+        # Centres overlap once |dx| is below half the combined widths
+        overlap = (plat_width + player.width) // 2 - 1
+        self.max_dx = np.where(land >= 0, self.max_shift[np.maximum(land, 0)] + overlap, -1).astype(np.int32)
+
+        dxs = np.arange(WIDTH + 1)
+        self.table = np.where(dxs[None, :] <= self.max_dx[:, None], land[:, None], -1).astype(np.int16)
+
+    def frames(self, dx, dy):
+        # Frames to land for arrays of offsets, -1 where the platform can't be reached
+        dx = np.minimum(np.abs(np.atleast_1d(dx).astype(np.int64)), WIDTH)
+        row = np.atleast_1d(dy).astype(np.int64) - self.dy_min
+        dx, row = np.broadcast_arrays(dx, row)
+        inside = (row >= 0) & (row < len(self.land_frames))
+        out = np.full(row.shape, -1, dtype=np.int16)
+        out[inside] = self.table[row[inside], dx[inside]]
+        return out
+
+    def horizontal_limit(self, dy):
+        # Largest |dx| that can still be landed on at vertical offset dy
+        row = int(dy) - self.dy_min
+        if row < 0 or row >= len(self.max_dx):
+            return -1
+        return int(self.max_dx[row])
+
+    def horizontal_limits(self, dy):
+        # horizontal_limit for an array of offsets
+        row = np.asarray(dy, dtype=np.int64) - self.dy_min
+        inside = (row >= 0) & (row < len(self.max_dx))
+        return np.where(inside, self.max_dx[np.clip(row, 0, len(self.max_dx) - 1)], -1)
+
+
+@lru_cache(maxsize=None)
+def get_reachability_table(plat_width=60, plat_height=12):
+    return ReachabilityTable(plat_width, plat_height)
@@ -0,0 +1,88 @@
+import numpy as np
+
+# Counters DoodleJumpEnv keeps about itself, for training dashboards
+# (callbacks.TelemetryCallback drains every env and logs the totals).
+# Per-step costs are running sums of perf_counter_ns deltas; per-episode
+# records go into fixed-size ring buffers, so an env's memory stays bounded
+# however long it runs between drains, and recording is a handful of stores.
+
+# How an episode ended
+FALL, STAGNATION = 0, 1
+CAUSES = {FALL: "fall", STAGNATION: "stagnation"}
+
+
+class RingBuffer:
+    def __init__(self, size, dtype=np.float64):
+        self.data = np.zeros(size, dtype=dtype)
+        self.count = 0
+
+    def push(self, value):
+        self.data[self.count % len(self.data)] = value
+        self.count += 1
+
+    def drain(self):
+        # Everything pushed since the last drain, oldest first (only the
+        # newest `size` entries if more were pushed)
+        size = len(self.data)
+        n = min(self.count, size)
+        out = self.data[np.arange(self.count - n, self.count) % size]
+        self.count = 0
+        return out
+
+
+class EnvTelemetry:
+    def __init__(self, episodes=256):
+        self.episode_length = RingBuffer(episodes, np.int64)
+        self.max_height = RingBuffer(episodes)
+        self.novel_landings = RingBuffer(episodes, np.int64)
+        self.cause = RingBuffer(episodes, np.int8)
+        self._clear()
+
+    def _clear(self):
+        self.steps = 0
+        self.step_ns = 0
+        self.physics_ns = 0
+        self.reward_ns = 0
+        self.obs_ns = 0
+
+    def end_episode(self, length, max_height, novel_landings, cause):
+        self.episode_length.push(length)
+        self.max_height.push(max_height)
+        self.novel_landings.push(novel_landings)
+        self.cause.push(cause)
+
+    def drain(self):
+        out = {
+            "steps": self.steps, "step_ns": self.step_ns, "physics_ns": self.physics_ns,
+            "reward_ns": self.reward_ns, "obs_ns": self.obs_ns,
+            "episode_length": self.episode_length.drain(), "max_height": self.max_height.drain(),
+            "novel_landings": self.novel_landings.drain(), "cause": self.cause.drain(),
+        }
+        self._clear()
+        return out
+
+
+def summarize(drains):
+    # One set of scalars from the drains of many envs
+    steps = sum(d["steps"] for d in drains)
+    step_ns = sum(d["step_ns"] for d in drains)
+    stats = {"env_steps": steps}
+    if steps:
+        # Steps per second of step() time: one env's speed, not the throughput
+        # of all of them together (that's the callback's train_steps_per_sec)
+        stats["env_steps_per_sec_per_env"] = steps / max(step_ns, 1) * 1e9
+        for part in ("physics", "reward", "obs"):
+            stats[f"{part}_us"] = sum(d[f"{part}_ns"] for d in drains) / steps / 1000
+
+    lengths = np.concatenate([d["episode_length"] for d in drains])
+    stats["episodes"] = len(lengths)
+    if len(lengths):
+        heights = np.concatenate([d["max_height"] for d in drains])
+        causes = np.concatenate([d["cause"] for d in drains])
+        stats["ep_len_mean"] = float(lengths.mean())
+        stats["max_height_mean"] = float(heights.mean())
+        stats["max_height_max"] = float(heights.max())
+        stats["novel_landings_mean"] = float(np.concatenate([d["novel_landings"] for d in drains]).mean())
+        for code, name in CAUSES.items():
+            stats[f"death_{name}"] = float((causes == code).mean())
+    return stats
@@ -2,3 +2,7 @@ from gymnasium_env_doodle.wrappers.clip_reward import ClipReward
 from gymnasium_env_doodle.wrappers.discrete_actions import DiscreteActions
 from gymnasium_env_doodle.wrappers.reacher_weighted_reward import ReacherRewardWrapper
 from gymnasium_env_doodle.wrappers.relative_position import RelativePosition
+from gymnasium_env_doodle.wrappers.vector_clip_reward import VectorClipReward
+from gymnasium_env_doodle.wrappers.vector_discrete_actions import VectorDiscreteActions
+from gymnasium_env_doodle.wrappers.vector_normalize import RunningMeanStd, VectorNormalize
+from gymnasium_env_doodle.wrappers.vector_relative_position import VectorRelativePosition
@@ -0,0 +1,12 @@
+import gymnasium as gym
+import numpy as np
+
+
+class VectorClipReward(gym.vector.VectorRewardWrapper):
+    def __init__(self, env, min_reward, max_reward):
+        super().__init__(env)
+        self.min_reward = min_reward
+        self.max_reward = max_reward
+
+    def rewards(self, reward):
+        return np.clip(reward, self.min_reward, self.max_reward)
@@ -0,0 +1,16 @@
+import gymnasium as gym
+import numpy as np
+from gymnasium.spaces import Discrete
+from gymnasium.vector.utils import batch_space
+
+
+class VectorDiscreteActions(gym.vector.VectorActionWrapper):
+    # disc_to_cont: sequence of env actions, indexed by the discrete action
+    def __init__(self, env, disc_to_cont):
+        super().__init__(env)
+        self.disc_to_cont = np.asarray(disc_to_cont)
+        self.single_action_space = Discrete(len(disc_to_cont))
+        self.action_space = batch_space(self.single_action_space, env.num_envs)
+
+    def actions(self, act):
+        return self.disc_to_cont[np.asarray(act)]
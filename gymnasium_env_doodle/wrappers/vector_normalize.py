@@ -0,0 +1,86 @@
+import gymnasium as gym
+from gymnasium.spaces import Box, Dict
+from gymnasium.vector.utils import batch_space
+import numpy as np
+
+
+class RunningMeanStd:
+    # Mean and variance over every sample seen, updated a batch at a time
+    def __init__(self, shape=(), epsilon=1e-4):
+        self.mean = np.zeros(shape, dtype=np.float64)
+        self.var = np.ones(shape, dtype=np.float64)
+        self.count = epsilon
+
+    def update(self, batch):
+        batch_mean, batch_var, batch_count = batch.mean(axis=0), batch.var(axis=0), batch.shape[0]
+        delta = batch_mean - self.mean
+        total = self.count + batch_count
+        self.mean = self.mean + delta * batch_count / total
+        m2 = self.var * self.count + batch_var * batch_count + delta ** 2 * self.count * batch_count / total
+        self.var = m2 / total
+        self.count = total
+
+
+class VectorNormalize(gym.vector.VectorWrapper):
+    # Running normalization of observations (per feature; integer Dict keys
+    # such as pixels are left alone) and of rewards, scaled by the std of the
+    # discounted return. Set `training = False` to freeze the statistics.
+    # The float keys of a Dict observation are normalized as one (num_envs, D)
+    # block, so the cost doesn't grow with the number of keys.
+    def __init__(self, env, norm_obs=True, norm_reward=True, clip_obs=10.0, clip_reward=10.0,
+                 gamma=0.99, epsilon=1e-8):
+        super().__init__(env)
+        self.norm_obs = norm_obs
+        self.norm_reward = norm_reward
+        self.clip_obs = clip_obs
+        self.clip_reward = clip_reward
+        self.gamma = gamma
+        self.epsilon = epsilon
+        self.training = True
+
+        space = env.single_observation_space
+        subspaces = space.spaces if isinstance(space, Dict) else {None: space}
+        self.obs_keys = [key for key, sub in subspaces.items() if np.issubdtype(sub.dtype, np.floating)]
+        self.obs_shapes = {key: subspaces[key].shape for key in self.obs_keys}
+        self.obs_split = np.cumsum([int(np.prod(shape)) for shape in self.obs_shapes.values()])[:-1]
+        self.obs_rms = RunningMeanStd((sum(int(np.prod(shape)) for shape in self.obs_shapes.values()),))
+        self.ret_rms = RunningMeanStd()
+        self.returns = np.zeros(env.num_envs)
+
+        if norm_obs:
+            normalized = {key: Box(-clip_obs, clip_obs, subspaces[key].shape, np.float32) for key in self.obs_keys}
+            if isinstance(space, Dict):
+                self.single_observation_space = Dict({**space.spaces, **normalized})
+            else:
+                self.single_observation_space = normalized[None]
+            self.observation_space = batch_space(self.single_observation_space, env.num_envs)
+
+    def _normalize(self, obs):
+        if not self.norm_obs:
+            return obs
+        out = dict(obs) if isinstance(obs, dict) else {None: obs}
+        n = self.num_envs
+        flat = np.concatenate([out[key].reshape(n, -1) for key in self.obs_keys], axis=1)
+        rms = self.obs_rms
+        if self.training: rms.update(flat)
+        flat = ((flat - rms.mean) / np.sqrt(rms.var + self.epsilon)).astype(np.float32)
+        np.clip(flat, -self.clip_obs, self.clip_obs, out=flat)
+        for key, part in zip(self.obs_keys, np.split(flat, self.obs_split, axis=1)):
+            out[key] = part.reshape((n,) + self.obs_shapes[key])
+        return out if isinstance(obs, dict) else out[None]
+
+    def reset(self, *, seed=None, options=None):
+        obs, info = self.env.reset(seed=seed, options=options)
+        # Only the envs that were reset start a new return (options["reset_mask"])
+        mask = options.get("reset_mask") if options else None
+        self.returns[slice(None) if mask is None else np.asarray(mask)] = 0.0
+        return self._normalize(obs), info
+
+    def step(self, actions):
+        obs, rewards, terminated, truncated, info = self.env.step(actions)
+        if self.norm_reward:
+            self.returns = self.returns * self.gamma + rewards
+            if self.training: self.ret_rms.update(self.returns)
+            rewards = np.clip(rewards / np.sqrt(self.ret_rms.var + self.epsilon), -self.clip_reward, self.clip_reward)
+            self.returns[terminated | truncated] = 0.0
+        return self._normalize(obs), rewards, terminated, truncated, info
@@ -0,0 +1,14 @@
+import gymnasium as gym
+from gymnasium.spaces import Box
+from gymnasium.vector.utils import batch_space
+import numpy as np
+
+
+class VectorRelativePosition(gym.vector.VectorObservationWrapper):
+    def __init__(self, env):
+        super().__init__(env)
+        self.single_observation_space = Box(shape=(2,), low=-np.inf, high=np.inf)
+        self.observation_space = batch_space(self.single_observation_space, env.num_envs)
+
+    def observations(self, obs):
+        return obs["target"] - obs["agent"]
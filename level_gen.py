@@ -0,0 +1,163 @@
+import random
+from collections import namedtuple
+from functools import lru_cache
+
+# Seeded level streaming. A level is an endless upward sequence of platform
+# specs (with the monster/black hole/item that comes with each), generated in
+# chunks of `chunk_size`. Each chunk draws from its own RNG derived from
+# (seed, chunk index), and the stream keeps the last spec generated as its
+# running top, so producing a platform never looks at the platforms already
+# in play. Chunks are immutable tuples kept in a ChunkStore. Explicitly
+# seeded levels share one store per seed and parameters, so replaying a seed
+# (evaluation, demos) reuses the generated level; a level drawn at random is
+# never replayed and gets a private store that goes away with it.
+#
+# Heights are altitudes: pixels above the top of the starting floor, growing
+# upwards. A simulation scrolled by `score` px draws a spec at screen
+# y = floor_y - altitude + score, and calls take() with the highest altitude
+# it wants materialized (see spawn_altitude); spawning is then one cursor
+# step per platform.
+#
+# A store only keeps its newest KEEP_CHUNKS chunks, so a level's memory
+# doesn't grow with the altitude reached. A generator that falls behind that
+# window (replaying a seed whose store has moved on) switches to a private
+# store that regenerates the level from the start.
+
+# monster: (x, vel_x) or None; black_hole: centre x or None
+PlatformSpec = namedtuple("PlatformSpec", "altitude x width type vel_x item monster black_hole")
+
+PLATFORM_W, PLATFORM_H = 60, 12
+START_PLATFORMS, START_SPACING = 15, 70
+GAP_MIN, GAP_MAX = 80, 110
+# Only green platforms below this altitude (the old rule was score < 1000,
+# with new platforms spawning roughly a screen and a half above the camera)
+EASY_ALTITUDE = 2000
+MONSTER_W = 45
+MONSTER_RISE, BLACK_HOLE_RISE = 50, 90
+MONSTER_PROB, BLACK_HOLE_PROB = 0.07, 0.03
+KEEP_CHUNKS = 4
+
+
+def spawn_altitude(score, floor_y, lookahead):
+    # Highest altitude on screen, plus `lookahead` px above the top edge
+    return score + floor_y + lookahead
+
+
+class ChunkStore:
+    def __init__(self, seed, width=448, chunk_size=32, ensure_reachable=False, monsters=False,
+                 black_holes=False, powerups=False):
+        self.seed = seed
+        self.width = width
+        self.chunk_size = chunk_size
+        self.monsters = monsters
+        self.black_holes = black_holes
+        self.powerups = powerups
+        self.reachability = None
+        if ensure_reachable:
+            from gymnasium_env_doodle.envs.reachability import get_reachability_table
+            self.reachability = get_reachability_table(PLATFORM_W, PLATFORM_H)
+        self.chunks = {}
+        self.next_index = 0
+        self.top = None
+
+    def chunk(self, index):
+        # KeyError if the chunk has already been dropped from the window
+        while self.next_index <= index:
+            self.chunks[self.next_index] = self._generate(self.next_index)
+            self.chunks.pop(self.next_index - KEEP_CHUNKS, None)
+            self.next_index += 1
+        return self.chunks[index]
+
+    def fresh(self):
+        # An empty store for the same level
+        return ChunkStore(self.seed, self.width, self.chunk_size, self.reachability is not None, self.monsters,
+                          self.black_holes, self.powerups)
+
+    def _generate(self, index):
+        rng = random.Random(f"{self.seed}:{index}")
+        specs = []
+        if index == 0:
+            # Full-width floor, then evenly spaced green platforms
+            specs.append(PlatformSpec(0, 0, self.width, 'green', 0, None, None, None))
+            for i in range(1, START_PLATFORMS):
+                x = rng.randint(0, self.width - PLATFORM_W)
+                specs.append(PlatformSpec(i * START_SPACING - 50, x, PLATFORM_W, 'green', 0, None, None, None))
+            self.top = specs[-1]
+
+        while len(specs) < self.chunk_size:
+            altitude = self.top.altitude + rng.randint(GAP_MIN, GAP_MAX)
+            x = rng.randint(0, self.width - PLATFORM_W)
+            kind = 'green' if altitude < EASY_ALTITUDE else rng.choice(['green', 'green', 'blue', 'white'])
+            vel_x = rng.choice([-2, 2]) if kind == 'blue' else 0
+
+            item = None
+            if self.powerups:
+                item_roll = rng.random()
+                if item_roll < 0.01: item = 'rocket'
+                elif item_roll < 0.025: item = 'propeller'
+                elif item_roll < 0.05: item = 'spring'
+            if self.reachability is not None:
+                altitude, x = self._make_reachable(altitude, x)
+
+            monster = black_hole = None
+            if self.monsters and rng.random() < MONSTER_PROB:
+                monster = (rng.randint(0, self.width - MONSTER_W), rng.choice([-3, 3]))
+            if self.black_holes and rng.random() < BLACK_HOLE_PROB:
+                black_hole = rng.randint(50, self.width - 50)
+
+            self.top = PlatformSpec(altitude, x, PLATFORM_W, kind, vel_x, item, monster, black_hole)
+            specs.append(self.top)
+        return tuple(specs)
+
+    def _make_reachable(self, altitude, x):
+        # Pulls a new platform back inside the jump envelope of the one below
+        # it (the stream's top) so every gap stays solvable
+        below = self.top
+        table = self.reachability
+        if table.horizontal_limit(below.altitude - altitude) < 0:
+            altitude = below.altitude + table.max_rise - 1
+        limit = table.horizontal_limit(below.altitude - altitude)
+        dx = (x + PLATFORM_W // 2) - (below.x + below.width // 2)
+        if abs(dx) > limit:
+            x = below.x + below.width // 2 + (limit if dx > 0 else -limit) - PLATFORM_W // 2
+            x = max(0, min(self.width - PLATFORM_W, x))
+        return altitude, x
+
+
+@lru_cache(maxsize=32)
+def get_chunk_store(seed, width=448, chunk_size=32, ensure_reachable=False, monsters=False,
+                    black_holes=False, powerups=False):
+    return ChunkStore(seed, width, chunk_size, ensure_reachable, monsters, black_holes, powerups)
+
+
+class LevelGenerator:
+    # A read cursor over the seed's chunk store. `shared` (default: whether a
+    # seed was given) puts the store in the process-wide cache
+    def __init__(self, seed=None, width=448, chunk_size=32, ensure_reachable=False, monsters=False,
+                 black_holes=False, powerups=False, shared=None):
+        if shared is None:
+            shared = seed is not None
+        self.seed = random.getrandbits(32) if seed is None else seed
+        args = (self.seed, width, chunk_size, ensure_reachable, monsters, black_holes, powerups)
+        self.store = get_chunk_store(*args) if shared else ChunkStore(*args)
+        self.chunk_size = chunk_size
+        self.cursor = 0
+
+    def peek(self):
+        index = self.cursor // self.chunk_size
+        try:
+            chunk = self.store.chunk(index)
+        except KeyError:
+            self.store = self.store.fresh()
+            chunk = self.store.chunk(index)
+        return chunk[self.cursor % self.chunk_size]
+
+    def take(self, max_altitude):
+        # Every spec not handed out yet with altitude <= max_altitude
+        out = []
+        spec = self.peek()
+        while spec.altitude <= max_altitude:
+            out.append(spec)
+            self.cursor += 1
+            spec = self.peek()
+        return out
@@ -1,18 +1,45 @@
 from GameView import GameView
+from detector_pool import DetectorPool
+from tracking import SceneTracker
+from scheduler import DetectorScheduler
+from frame_sources import FrameRecorder, open_source
+import argparse
 import time
 import cv2
 
 
-def main():
-    window_name = "Doodle Detection"
-    cv2.namedWindow(window_name, cv2.WINDOW_NORMAL)
-    cv2.setWindowProperty(window_name, cv2.WND_PROP_TOPMOST, 1)
+# 1 = full resolution; 2 or 4 segments a subsampled frame and refines the
+# player/platform boxes at full resolution (see bench_detectors.py --scales)
+DETECT_SCALE = 1
+# > 0 runs the detectors in that many worker processes (see detector_pool.py)
+DETECTOR_WORKERS = 0
+# Detection time per frame the scheduler aims for (ms, a soft target); only players, platforms
+# and springs are guaranteed to run on every frame
+DETECT_BUDGET_MS = 12.0
 
-    game = GameView()
-    frame_count = 0
-    last_player_pos = None
 
-    # Cache for low priority items
+def main(source=None, record=None, show=True, realtime=False, budget_ms=DETECT_BUDGET_MS):
+    window_name = "Doodle Detection"
+    if show:
+        cv2.namedWindow(window_name, cv2.WINDOW_NORMAL)
+        cv2.setWindowProperty(window_name, cv2.WND_PROP_TOPMOST, 1)
+
+    # Live screen grab, or a recording replayed as fast as it can be processed
+    source = open_source(source, realtime)
+    # A live capture's fps is measured while recording; a re-recorded file keeps its own
+    recorder = FrameRecorder(record, None if source.live else source.fps) if record else None
+    game = GameView(detect_scale=DETECT_SCALE, source=source)
+    pool = DetectorPool(DETECTOR_WORKERS, detect_scale=DETECT_SCALE) if DETECTOR_WORKERS > 0 else None
+    last_time = None
+
+    # Measured cost/hit rate per detector decides what runs on each frame
+    scheduler = make_scheduler(budget_ms)
+
+    # Filtered position/velocity with stable ids; low-priority objects are
+    # extrapolated on the frames their detectors skip
+    tracker = SceneTracker()
+
+    # Latest low priority detections
     lp_data = {
         "brown_platforms": [],
         "black_holes": [],
@@ -23,45 +50,87 @@ def main():
     while True:
         start_time = time.time()
         frame = game.getScreen()
-        if frame is None: continue
-        coloredFrame = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-        frame_count += 1
-
-        # 1. Low Priority Detection:
-        if frame_count % 4 == 0:
-            lp_data["black_holes"] = game.detectBlackHoles(coloredFrame)
-            lp_data["rocket"], _ = game.detectRockets(coloredFrame)
-            lp_data["propellor"], _ = game.detectPropellors(coloredFrame)
-
-        # 2. High Priority Detection:
-        player_bbox, player_center = game.detectPlayer(coloredFrame)
-        if last_player_pos and player_center:
-            # Calculate velocity manually for the AI
-            vel_x = player_center[0] - last_player_pos[0]
-            vel_y = player_center[1] - last_player_pos[1]
+        if frame is None:
+            if source.done: break
+            continue
+        if recorder is not None: recorder.write(frame)
+        # Replays advance one recorded frame per loop, whatever the loop takes
+        if source.live:
+            dt = start_time - last_time if last_time is not None else 1 / 60
         else:
-            vel_x, vel_y = 0, 0
-
-        last_player_pos = player_center
-        moving_platforms_boxes = game.detectMovingPlatforms(coloredFrame)
-        blank_platforms_boxes = game.detectWhitePlatforms(coloredFrame)
-        static_platforms_boxes = game.detectPlatforms(coloredFrame)
-        springs = game.detectSprings(coloredFrame, static_platforms_boxes + moving_platforms_boxes)
-
-        to_exclude = [player_bbox, lp_data["propellor"], lp_data["rocket"]]
-        if to_exclude:
-            to_exclude.extend(static_platforms_boxes)
-            to_exclude.extend(moving_platforms_boxes)
-            to_exclude.extend(springs)
-        monsters_bboxes = game.detectMonsters(coloredFrame, to_exclude, player_center)
+            dt = 1 / source.fps
+        last_time = start_time
+        tracker.predict(dt)
+
+        if pool is not None:
+            # All detectors in parallel on every frame
+            results = pool.detect(frame)
+            lp_data["black_holes"] = results["black_holes"]
+            lp_data["rocket"], _ = results["rocket"]
+            lp_data["propellor"], _ = results["propellor"]
+            low_priority_ran = True
+            tracker.correct("black_holes", [cv2.boundingRect(c) for c in lp_data["black_holes"]])
+            tracker.correct("rockets", [lp_data["rocket"]])
+            tracker.correct("propellors", [lp_data["propellor"]])
+            player_bbox, player_center = results["player"]
+            moving_platforms_boxes = results["moving_platforms"]
+            blank_platforms_boxes = results["white_platforms"]
+            static_platforms_boxes = results["platforms"]
+            springs = results["springs"]
+            monsters_bboxes = results["monsters"]
+        else:
+            due = scheduler.plan()
+            # Only tiles that changed since the last capture are reprocessed
+            coloredFrame = scheduler.run("hsv", game.getHSV, frame)
+
+            # 1. Low Priority Detection (each when its schedule says so):
+            if "black_holes" in due:
+                lp_data["black_holes"] = scheduler.run("black_holes", game.detectBlackHoles, coloredFrame)
+                tracker.correct("black_holes", [cv2.boundingRect(c) for c in lp_data["black_holes"]])
+            if "rockets" in due:
+                lp_data["rocket"], _ = scheduler.run("rockets", game.detectRockets, coloredFrame)
+                tracker.correct("rockets", [lp_data["rocket"]])
+            if "propellors" in due:
+                lp_data["propellor"], _ = scheduler.run("propellors", game.detectPropellors, coloredFrame)
+                tracker.correct("propellors", [lp_data["propellor"]])
+            low_priority_ran = "black_holes" in due
+
+            # 2. High Priority Detection:
+            player_bbox, player_center = scheduler.run("player", game.detectPlayer, coloredFrame)
+            moving_platforms_boxes = scheduler.run("moving", game.detectMovingPlatforms, coloredFrame)
+            blank_platforms_boxes = scheduler.run("white", game.detectWhitePlatforms, coloredFrame)
+            static_platforms_boxes = scheduler.run("platforms", game.detectPlatforms, coloredFrame)
+            springs = scheduler.run("springs", game.detectSprings, coloredFrame,
+                                    static_platforms_boxes + moving_platforms_boxes)
+
+            monsters_bboxes = None
+            if "monsters" in due:
+                # Items at their extrapolated positions rather than where they were last seen
+                to_exclude = [player_bbox] + tracker.boxes("propellors") + tracker.boxes("rockets")
+                to_exclude.extend(static_platforms_boxes)
+                to_exclude.extend(moving_platforms_boxes)
+                to_exclude.extend(springs)
+                monsters_bboxes = scheduler.run("monsters", game.detectMonsters, coloredFrame, to_exclude, player_center)
+
+        tracker.correct("player", [player_bbox])
+        tracker.correct("moving_platforms", moving_platforms_boxes)
+        if monsters_bboxes is not None:
+            tracker.correct("monsters", monsters_bboxes)
+
+        # Filtered velocity for the AI (px/s); survives missed detections
+        player = tracker.player()
+        vel_x, vel_y = player.velocity if player else (0.0, 0.0)
 
         # --- VISUALIZATION ---
         # Draw High Priority first
         if player_bbox:
             draw_labeled_box(frame, player_bbox, "Player", (0, 255, 0))
+        elif player:
+            draw_labeled_box(frame, player.box, "Player?", (0, 255, 0), 1)
 
-        for bbox in monsters_bboxes:
-            draw_labeled_box(frame, bbox, "MONSTER", (0, 165, 255), thickness=3)
+        for track in tracker.tracks("monsters"):
+            if track.missed == 0:
+                draw_labeled_box(frame, track.box, f"MONSTER {track.id}", (0, 165, 255), thickness=3)
 
         for bbox in moving_platforms_boxes:
             draw_labeled_box(frame, bbox, "Moving", (255, 0, 255))
@@ -75,23 +144,45 @@ def main():
         for bbox in springs:
             draw_labeled_box(frame, bbox, "Spring", (0, 0, 255), 1)
 
-        if lp_data["rocket"]:
-            bbox = lp_data["rocket"]
+        for bbox in tracker.boxes("rockets"):
             draw_labeled_box(frame, bbox, "Rocket", (0, 0, 255), 1)
 
-        if lp_data["propellor"]:
-            bbox = lp_data["propellor"]
+        for bbox in tracker.boxes("propellors"):
             draw_labeled_box(frame, bbox, "Propellor", (0, 0, 255), 1)
 
-        draw_black_holes(frame, lp_data["black_holes"])
+        if low_priority_ran:
+            draw_black_holes(frame, lp_data["black_holes"])
+        else:
+            for bbox in tracker.boxes("black_holes"):
+                draw_labeled_box(frame, bbox, "Black Hole", (0, 0, 255))
 
-        cv2.imshow(window_name, frame)
         elapsed = (time.time() - start_time) * 1000
         print(f"Elapsed: {elapsed:.2f}ms")
-        if cv2.waitKey(1) & 0xFF == ord('q'):
-            break
-
-    cv2.destroyAllWindows()
+        if show:
+            cv2.imshow(window_name, frame)
+            if cv2.waitKey(1) & 0xFF == ord('q'):
+                break
+
+    # The pool runs every detector on every frame; only the in-process path is scheduled
+    if pool is None: print(scheduler.summary())
+    if pool is not None: pool.close()
+    if recorder is not None: recorder.close()
+    source.close()
+    if show: cv2.destroyAllWindows()
+
+def make_scheduler(budget_ms):
+    scheduler = DetectorScheduler(budget_ms)
+    # Every frame: the AI needs these to act at all
+    for name in ("hsv", "player", "moving", "white", "platforms", "springs"):
+        scheduler.add(name)
+    # Every frame while one was seen in the last ~half second, backing off to
+    # every few frames when the screen has been clear for a while
+    scheduler.add("monsters", min_interval=1, max_interval=6, recent=30, hit=bool)
+    scheduler.add("black_holes", min_interval=1, max_interval=8, recent=30, hit=bool)
+    has_box = lambda result: result[0] is not None
+    scheduler.add("rockets", min_interval=2, max_interval=8, recent=30, hit=has_box)
+    scheduler.add("propellors", min_interval=2, max_interval=8, recent=30, hit=has_box)
+    return scheduler
 
 def draw_labeled_box(frame, bbox, label, color, thickness=2):
     x, y, w, h = bbox
@@ -108,4 +199,13 @@ def draw_black_holes(frame, contours, label="Black Hole", color=(0, 0, 255), thi
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--source", default=None,
+                        help="live (default), a .raw dump, a video, an image directory or a glob")
+    parser.add_argument("--record", default=None, help="dump every captured frame to this .raw file")
+    parser.add_argument("--no-window", action="store_true", help="process frames without displaying them")
+    parser.add_argument("--realtime", action="store_true", help="replay recordings at their recorded fps")
+    parser.add_argument("--budget", type=float, default=DETECT_BUDGET_MS,
+                        help="detection budget per frame in ms (inf runs every due detector)")
+    args = parser.parse_args()
+    main(args.source, args.record, not args.no_window, args.realtime, args.budget)
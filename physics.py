@@ -0,0 +1,100 @@
+import numpy as np
+
+# Per-tick kinematics shared by game.py, DoodleJumpEnv and anything that wants
+# to simulate many entities (or many games) at once.
+#
+# Two forms of the same update, bit-identical to each other and to the
+# original per-class update() methods:
+#   - advance() / move_player() work on the game objects. Their state lives in
+#     pygame.Rects, so they are fused Python loops: one pass per entity kind,
+#     no method dispatch, and static platforms are skipped by their zero
+#     velocity instead of a type check. (Gathering Rect fields into arrays and
+#     scattering them back costs more than the arithmetic it would save.)
+#   - the step_* kernels work on structure-of-arrays state: a handful of
+#     NumPy operations per entity kind regardless of how many entities (or
+#     games, along a leading batch axis) there are.
+# bench_physics.py times both and checks they agree.
+
+# Player constants (game.Player reads these)
+PLAYER_W, PLAYER_H = 30, 30
+ACCEL_X = 0.8
+MAX_VEL_X = 7
+DAMPING = 0.85
+GRAVITY = 0.35
+JUMP_POWER = -11
+BOOST_VEL_Y = -18
+
+
+def rect_round(v):
+    # pygame.Rect rounds half away from zero when assigned a float
+    return int(v + 0.5) if v >= 0 else -int(-v + 0.5)
+
+
+def rect_round_array(v):
+    return np.where(v >= 0, np.floor(v + 0.5), -np.floor(-v + 0.5)).astype(np.int64)
+
+
+# --- GAME OBJECTS ---
+
+def move_player(pl, width):
+    # Player.move after the steering input has been applied to vel_x
+    vx = max(-pl.max_vel_x, min(pl.max_vel_x, pl.vel_x))
+    pl.vel_x = vx
+    r = pl.rect
+    x = rect_round(r.x + vx)
+    if x + r.width < 0: x = width
+    elif x > width: x = -r.width
+    r.x = x
+
+    if pl.powerup_timer > 0:
+        pl.vel_y = BOOST_VEL_Y
+        pl.powerup_timer -= 1
+    else:
+        pl.vel_y += pl.gravity
+    r.y = rect_round(r.y + pl.vel_y)
+    if pl.shoot_cooldown > 0: pl.shoot_cooldown -= 1
+
+
+def advance(platforms, monsters, bullets, width):
+    # Platform.update, Monster.update and Projectile.update for every entity
+    for group in (platforms, monsters):
+        for e in group:
+            vx = e.vel_x
+            if vx:
+                r = e.rect
+                x = r.x + vx
+                r.x = x
+                if x < 0 or x + r.width > width: e.vel_x = -vx
+    for b in bullets:
+        b.rect.y += b.speed
+
+
+# --- ARRAY KERNELS ---
+# All update their arguments in place. Positions are int64 (Rect pixels),
+# player velocities float64; any shape works as long as the arrays of one
+# call broadcast together.
+
+def step_players(x, y, vx, vy, timer, cooldown, damp, width):
+    # Player.move for a batch of players; `damp` marks the players with no
+    # steering key held this tick (vx *= DAMPING), vx already includes any push
+    np.multiply(vx, DAMPING, out=vx, where=damp)
+    np.clip(vx, -MAX_VEL_X, MAX_VEL_X, out=vx)
+    x[...] = rect_round_array(x + vx)
+    x[...] = np.where(x + PLAYER_W < 0, width, np.where(x > width, -PLAYER_W, x))
+
+    boosted = timer > 0
+    vy[...] = np.where(boosted, BOOST_VEL_Y, vy + GRAVITY)
+    timer -= boosted
+    y[...] = rect_round_array(y + vy)
+    cooldown -= cooldown > 0
+
+
+def step_movers(x, vx, w, width):
+    # Blue platforms and monsters: move, and reverse after leaving the screen
+    # (static platforms have vx == 0 and pass through unchanged)
+    x += vx
+    np.negative(vx, out=vx, where=(x < 0) | (x + w > width))
+
+
+def step_bullets(y, speed):
+    y += speed
@@ -0,0 +1,200 @@
+import bisect
+import sys
+import time
+from game import Player, WIDTH
+from physics import rect_round as _rect_round
+from gymnasium_env_doodle.envs.doodle_env import Action, DoodleJumpEnv
+
+# Search-based controller for DoodleJumpEnv. Every frame it takes a
+# clone_state() snapshot and beam-searches over macro actions (one Action held
+# for `repeat` ticks), forward-simulating Player.move and the platform-landing
+# rule exactly as DoodleJumpEnv.step does. Search stops when the per-frame time
+# budget runs out and the best plan found so far is used.
+
+_P = Player()
+ACCEL_X, MAX_VEL_X = _P.accel_x, _P.max_vel_x
+GRAVITY, JUMP_POWER = _P.gravity, _P.jump_power
+PLAYER_W, PLAYER_H = _P.width, _P.height
+del _P
+
+DEATH = -1e9
+
+
+class LookaheadPlanner:
+    def __init__(self, horizon=80, repeat=8, beam_width=8, budget_ms=4.0, apex_weight=0.1, landing_bonus=5.0,
+                 x_bucket=32, height=682):
+        self.repeat = repeat
+        self.depth = max(1, horizon // repeat)
+        self.beam_width = beam_width
+        self.budget = budget_ms / 1000.0
+        self.landing_bonus = landing_bonus
+        self.apex_weight = apex_weight
+        self.x_bucket = x_bucket
+        self.height = height
+        self.last_plan_ms = 0.0
+        self.last_depth = 0
+
+    def _prepare(self, state):
+        # Platforms sorted by y with their x position precomputed for every tick
+        # of the horizon (platform motion doesn't depend on the player).
+        plats = sorted(state["platforms"], key=lambda p: p[1])
+        self._py = [p[1] for p in plats]
+        self._pw = [p[2] for p in plats]
+        self._ph = [p[3] for p in plats]
+        self._white = [p[4] == 'white' for p in plats]
+        max_h = max(self._ph) if plats else 0
+        self._reach = max_h
+
+        ticks = self.depth * self.repeat
+        xs = [p[0] for p in plats]
+        vxs = [p[5] if p[4] == 'blue' else 0 for p in plats]
+        table = [list(xs)]
+        for _ in range(ticks):
+            for i, vx in enumerate(vxs):
+                if vx:
+                    xs[i] += vx
+                    if xs[i] < 0 or xs[i] + self._pw[i] > WIDTH: vxs[i] = -vx
+            table.append(list(xs))
+        self._px = table
+
+    def _simulate(self, node, action, t0):
+        x, y, vx, vy, cam, gone, landed, floor, _, first = node
+        half = self.height // 2
+        py, pw, ph, white = self._py, self._pw, self._ph, self._white
+        for t in range(t0 + 1, t0 + self.repeat + 1):
+            if action == 0: vx += ACCEL_X
+            elif action == 1: vx -= ACCEL_X
+            elif action == 3: vx *= 0.85
+            vx *= 0.85
+            vx = max(-MAX_VEL_X, min(MAX_VEL_X, vx))
+            x = _rect_round(x + vx)
+            if x + PLAYER_W < 0: x = WIDTH
+            elif x > WIDTH: x = -PLAYER_W
+
+            vy += GRAVITY
+            y = _rect_round(y + vy)
+            if y + cam < half: cam = half - y
+
+            if vy > 0:
+                # Only platforms whose top lies within a player height of the
+                # player can satisfy the landing rule.
+                px = self._px[t]
+                i = bisect.bisect_left(py, y - self._reach)
+                while i < len(py) and py[i] < y + PLAYER_H:
+                    if (not gone >> i & 1 and py[i] + cam < self.height
+                            and x < px[i] + pw[i] and px[i] < x + PLAYER_W
+                            and y < py[i] + ph[i]
+                            and y + PLAYER_H <= py[i] + ph[i] // 2 + 10):
+                        y = py[i] - PLAYER_H
+                        vy = JUMP_POWER
+                        if y < floor: floor = y
+                        if not landed >> i & 1: landed |= 1 << i
+                        if white[i]: gone |= 1 << i
+                        break
+                    i += 1
+
+            if y + cam > self.height:
+                return (x, y, vx, vy, cam, gone, landed, floor, DEATH, first)
+
+        # Value: height of the highest platform landed on, with the apex of the
+        # current arc and the number of distinct landings as tie-breakers.
+        apex = y - vy * vy / (2 * GRAVITY) if vy < 0 else y
+        value = -floor - self.apex_weight * apex + self.landing_bonus * bin(landed).count("1")
+        return (x, y, vx, vy, cam, gone, landed, floor, value, first)
+
+    def plan(self, state):
+        start = time.perf_counter()
+        deadline = start + self.budget
+        self._prepare(state)
+
+        x, y, vx, vy = state["player"]
+        root = (x, y, vx, vy, 0, 0, 0, y, 0.0, None)
+        beam = [root]
+        best, depth = None, 0
+        out_of_time = False
+        while depth < self.depth and not out_of_time:
+            # The deadline is checked after every simulation: the beam is
+            # expanded best node first, so a level cut short still holds the
+            # children of its most promising nodes
+            children = []
+            for node in beam:
+                for a in Action:
+                    child = self._simulate(node, a.value, depth * self.repeat)
+                    if node[9] is None:
+                        child = child[:9] + (a.value,)
+                    children.append(child)
+                    if time.perf_counter() > deadline:
+                        out_of_time = True
+                        break
+                if out_of_time: break
+            # Horizontal moves rarely change the value before the next landing,
+            # so keep one node per x bucket to stop ties collapsing the beam.
+            children.sort(key=lambda n: n[8], reverse=True)
+            beam, seen = [], set()
+            for n in children:
+                key = (n[0] // self.x_bucket, n[6])
+                if n[8] > DEATH and key not in seen:
+                    seen.add(key)
+                    beam.append(n)
+                    if len(beam) == self.beam_width: break
+            if out_of_time:
+                # Best node found so far: the cut-short level's, unless all of
+                # its children died and a complete level came before it
+                if beam or best is None:
+                    best = (beam or children)[0]
+                break
+            beam = beam or children[:1]
+            best = beam[0]
+            depth += 1
+
+        self.last_depth = depth
+        self.last_plan_ms = (time.perf_counter() - start) * 1000
+        return best[9] if best is not None else Action.stay.value
+
+    def act(self, env):
+        return self.plan(env.clone_state())
+
+
+def run(episodes=5, render=False, max_steps=20000, **planner_kwargs):
+    env = DoodleJumpEnv()
+    planner = LookaheadPlanner(height=env.height, **planner_kwargs)
+
+    if render:
+        import pygame
+        pygame.init()
+        screen = pygame.display.set_mode((env.width, env.height))
+        pygame.display.set_caption("Lookahead Planner")
+        clock = pygame.time.Clock()
+        font = pygame.font.SysFont("Arial", 18, bold=True)
+
+    for ep in range(episodes):
+        obs, info = env.reset()
+        plan_ms, worst_ms, steps = 0.0, 0.0, 0
+        for steps in range(1, max_steps + 1):
+            action = planner.act(env)
+            plan_ms += planner.last_plan_ms
+            worst_ms = max(worst_ms, planner.last_plan_ms)
+            obs, reward, terminated, truncated, info = env.step(action)
+
+            if render:
+                for event in pygame.event.get():
+                    if event.type == pygame.QUIT:
+                        pygame.quit()
+                        return
+                screen.fill((250, 248, 239))
+                for p in env.platforms: p.draw(screen)
+                env.player.draw(screen)
+                txt = font.render(f"PLANNER SCORE: {int(info['score'])}", True, (50, 50, 50))
+                screen.blit(txt, (10, 10))
+                pygame.display.flip()
+                clock.tick(60)
+
+            if terminated or truncated:
+                break
+
+        print(f"Episode {ep}: score {int(info['score'])}, steps {steps}, "
+              f"plan {plan_ms / steps:.2f}ms avg / {worst_ms:.2f}ms worst")
+
+
+if __name__ == "__main__":
+    run(render="--render" in sys.argv)
@@ -0,0 +1,180 @@
+import argparse
+import os
+import time
+import numpy as np
+
+# Standalone copy of a trained PPO policy for inference: the actor MLP's
+# weights in one .npz, and a NumPy-only forward pass. No torch and no
+# stable-baselines3 at load or run time, so it loads in milliseconds and a
+# single observation costs a few microseconds instead of SB3's predict()
+# round trip through torch.
+#
+#   python policy_export.py ppo_doodle_jump_stage1_v15.zip policy.npz [--int8]
+#   python test_ai.py --policy policy.npz
+#
+# The observation preprocessing of a MultiInputPolicy with the default
+# CombinedExtractor is built in: the Dict keys are flattened and concatenated
+# in the extractor's order. Only the actor is exported (the value head isn't
+# needed to act). With --int8 the weights are stored as int8 with one scale
+# per output unit (symmetric, per row) and dequantized once at load, which
+# makes the file about 4x smaller for a small change in the logits. Export
+# from the command line checks how often the copy picks SB3's action.
+
+ACTIVATIONS = {
+    "Tanh": np.tanh,
+    "ReLU": lambda x: np.maximum(x, 0.0),
+    "Identity": lambda x: x,
+}
+
+
+def _linear_layers(policy):
+    # (weight (out, in), bias) pairs from the actor MLP and the action head
+    from torch import nn
+    layers = [m for m in policy.mlp_extractor.policy_net if isinstance(m, nn.Linear)]
+    layers.append(policy.action_net)
+    return [(l.weight.detach().cpu().numpy(), l.bias.detach().cpu().numpy()) for l in layers]
+
+
+def quantize_int8(w):
+    # Symmetric per-row quantization: w ~= q * scale[:, None]
+    scale = np.abs(w).max(axis=1) / 127.0
+    scale[scale == 0] = 1.0
+    q = np.clip(np.round(w / scale[:, None]), -127, 127).astype(np.int8)
+    return q, scale.astype(np.float32)
+
+
+def export_policy(model, path, int8=False):
+    # `model` is a PPO instance or the path of a saved one
+    from torch import nn
+    if isinstance(model, (str, os.PathLike)):
+        from stable_baselines3 import PPO
+        model = PPO.load(model, device="cpu")
+    policy = model.policy
+
+    extractor = policy.pi_features_extractor
+    if not hasattr(extractor, "extractors") or \
+            not all(isinstance(e, nn.Flatten) for e in extractor.extractors.values()):
+        raise ValueError("only MultiInputPolicy with flattened (non-image) observations can be exported")
+    keys = list(extractor.extractors)
+    spaces = model.observation_space.spaces
+    activation = type(policy.mlp_extractor.policy_net[1]).__name__ if len(policy.mlp_extractor.policy_net) > 1 \
+        else "Identity"
+    if activation not in ACTIVATIONS:
+        raise ValueError(f"unsupported activation {activation}")
+
+    arrays = {
+        "keys": np.array(keys),
+        "sizes": np.array([int(np.prod(spaces[k].shape)) for k in keys]),
+        "ndims": np.array([len(spaces[k].shape) for k in keys]),
+        "activation": np.array(activation),
+        "n_layers": np.array(len(_linear_layers(policy))),
+    }
+    for i, (w, b) in enumerate(_linear_layers(policy)):
+        if int8:
+            arrays[f"w{i}"], arrays[f"scale{i}"] = quantize_int8(w)
+        else:
+            arrays[f"w{i}"] = w.astype(np.float32)
+        arrays[f"b{i}"] = b.astype(np.float32)
+    np.savez_compressed(path, **arrays)
+    return path if path.endswith(".npz") else path + ".npz"
+
+
+class NumpyPolicy:
+    def __init__(self, keys, sizes, ndims, weights, biases, activation="Tanh"):
+        self.keys = list(keys)
+        self.ndim = int(ndims[0])
+        self.offsets = np.concatenate([[0], np.cumsum(sizes)])
+        # Stored as (in, out) so the forward pass is x @ w
+        self.weights = [np.ascontiguousarray(w.T) for w in weights]
+        self.biases = list(biases)
+        self.activation = ACTIVATIONS[activation]
+        self._x = np.zeros(self.offsets[-1], dtype=np.float32)
+        self.rng = np.random.default_rng()
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as f:
+            n = int(f["n_layers"])
+            weights = []
+            for i in range(n):
+                w = f[f"w{i}"]
+                if w.dtype == np.int8:
+                    w = w.astype(np.float32) * f[f"scale{i}"][:, None]
+                weights.append(w)
+            return cls(f["keys"], f["sizes"], f["ndims"], weights, [f[f"b{i}"] for i in range(n)], str(f["activation"]))
+
+    def _features(self, obs):
+        first = np.asarray(obs[self.keys[0]])
+        if first.ndim > self.ndim:
+            # A batch, as from a vector env
+            return np.concatenate([np.asarray(obs[k], dtype=np.float32).reshape(len(first), -1) for k in self.keys], 1)
+        # One observation: fill the preallocated input row
+        x, off = self._x, self.offsets
+        for i, key in enumerate(self.keys):
+            x[off[i]:off[i + 1]] = np.ravel(obs[key])
+        return x
+
+    def logits(self, obs):
+        x = self._features(obs)
+        last = len(self.weights) - 1
+        for i, (w, b) in enumerate(zip(self.weights, self.biases)):
+            x = x @ w + b
+            if i < last: x = self.activation(x)
+        return x
+
+    def predict(self, obs, state=None, episode_start=None, deterministic=True):
+        # Same signature and return value as SB3's predict()
+        logits = self.logits(obs)
+        if deterministic:
+            return np.argmax(logits, axis=-1), state
+        p = np.exp(logits - logits.max(axis=-1, keepdims=True))
+        p /= p.sum(axis=-1, keepdims=True)
+        if p.ndim == 1:
+            return np.int64(self.rng.choice(len(p), p=p)), state
+        return np.array([self.rng.choice(p.shape[1], p=row) for row in p]), state
+
+
+# --- CHECKS ---
+
+def compare(model, policy, n_steps=2000, seed=0):
+    # Action agreement with the SB3 policy on the states it visits itself,
+    # and per-call latency of both
+    from train import make_env
+    env = make_env()
+    obs, _ = env.reset(seed=seed)
+    same, t_sb3, t_np = 0, 0.0, 0.0
+    for _ in range(n_steps):
+        t0 = time.perf_counter()
+        expected, _ = model.predict(obs, deterministic=True)
+        t1 = time.perf_counter()
+        action, _ = policy.predict(obs)
+        t2 = time.perf_counter()
+        t_sb3 += t1 - t0
+        t_np += t2 - t1
+        same += int(action) == int(expected)
+        obs, _, terminated, truncated, _ = env.step(int(expected))
+        if terminated or truncated:
+            obs, _ = env.reset()
+    return same / n_steps, t_sb3 / n_steps * 1e6, t_np / n_steps * 1e6
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("model", help="saved PPO model (.zip)")
+    parser.add_argument("out", help="exported policy (.npz)")
+    parser.add_argument("--int8", action="store_true", help="store int8 weights with per-row scales")
+    parser.add_argument("--check-steps", type=int, default=2000, help="compare against SB3 on this many steps (0: skip)")
+    args = parser.parse_args()
+
+    from stable_baselines3 import PPO
+    model = PPO.load(args.model, device="cpu")
+    path = export_policy(model, args.out, args.int8)
+    t0 = time.perf_counter()
+    policy = NumpyPolicy.load(path)
+    load_ms = (time.perf_counter() - t0) * 1000
+    print(f"{path}: {os.path.getsize(path) / 1024:.1f} KB (model {os.path.getsize(args.model) / 1024:.1f} KB), "
+          f"loads in {load_ms:.2f} ms")
+    if args.check_steps:
+        agree, us_sb3, us_np = compare(model, policy, args.check_steps)
+        print(f"agrees with SB3 on {agree:.1%} of {args.check_steps} steps; "
+              f"predict {us_sb3:.1f} us (SB3) vs {us_np:.1f} us (NumPy)")
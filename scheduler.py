@@ -0,0 +1,124 @@
+import time
+
+# Decides which detectors run on each frame. Every detector call goes through
+# run(), which keeps a running mean of its cost and whether it found anything.
+# plan() then picks the detectors that are due, best value first, for as long
+# as their measured cost fits in the frame budget:
+#   - "always" detectors (max_interval=1: player, platforms) run every frame
+#     and their cost comes off the budget first;
+#   - the others run every `interval` frames. The interval drops back to
+#     min_interval on a hit and stays there while the object has been seen
+#     in the last `recent` frames, then grows by one frame per empty run up
+#     to max_interval, so e.g. monster detection runs every frame while a
+#     monster is on screen and rarely otherwise;
+#   - when the budget is short, detectors whose object is currently on screen
+#     go first, then the ones with the most expected finds per ms (hit rate
+#     over cost), weighted by how many frames they are overdue;
+#   - a detector the budget kept skipping runs anyway once it is
+#     2 * max_interval frames stale, so nothing is starved; at most
+#     `max_forced` of those per frame.
+# budget_ms is a target, not a hard limit: the always-run detectors count
+# against it but are never dropped, and forced runs can go over it.
+# The frames a detector skips are covered by the SceneTracker predictions.
+
+
+class Detector:
+    def __init__(self, name, min_interval, max_interval, recent, hit):
+        self.name = name
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.recent = recent
+        self.hit = hit
+        self.interval = min_interval
+        self.cost = None  # ms, running mean; None until first measured
+        self.hit_rate = 0.0
+        self.last_run = None
+        self.last_hit = None
+
+
+class DetectorScheduler:
+    def __init__(self, budget_ms=12.0, alpha=0.2, max_forced=1):
+        self.budget_ms = budget_ms
+        self.max_forced = max_forced
+        self.alpha = alpha
+        self.detectors = {}
+        self.frame = -1
+        self.planned = set()
+
+    def add(self, name, min_interval=1, max_interval=1, recent=30, hit=None):
+        # hit(result) -> True if the detector found something (not needed
+        # for detectors that run every frame)
+        self.detectors[name] = Detector(name, min_interval, max_interval, recent, hit)
+        return self
+
+    def _overdue(self, d):
+        # Frames past due (>= 0 means it is due); never run -> due right away
+        if d.last_run is None:
+            return float("inf")
+        return self.frame - d.last_run - d.interval
+
+    def _seen(self, d):
+        return d.last_hit is not None and self.frame - d.last_hit <= d.recent
+
+    def _value(self, d):
+        # Expected finds per ms of detection, more the longer it has waited
+        # (the floor keeps a detector that never hits from sinking for good)
+        return (d.hit_rate + 0.05) * (self._overdue(d) + 1) / max(d.cost or 0.0, 0.1)
+
+    def plan(self):
+        # Call once per frame; returns the set of detector names to run
+        self.frame += 1
+        planned = set()
+        spent = 0.0
+        optional = []
+        for d in self.detectors.values():
+            if d.max_interval <= 1:
+                planned.add(d.name)
+                spent += d.cost or 0.0
+            elif self._overdue(d) >= 0:
+                optional.append(d)
+
+        # Objects on screen right now first, then the best value
+        optional.sort(key=lambda d: (not self._seen(d), -self._value(d)))
+        forced = 0
+        for d in optional:
+            cost = d.cost or 0.0
+            if spent + cost > self.budget_ms:
+                stale = d.last_run is None or self.frame - d.last_run >= 2 * d.max_interval
+                if not stale or forced >= self.max_forced: continue
+                forced += 1
+            planned.add(d.name)
+            spent += cost
+        self.planned = planned
+        return planned
+
+    def due(self, name):
+        return name in self.planned
+
+    def run(self, name, fn, *args):
+        # Calls fn(*args), records its cost and whether it hit
+        t0 = time.perf_counter()
+        result = fn(*args)
+        hit = self.detectors[name].hit
+        self.record(name, (time.perf_counter() - t0) * 1000, hit(result) if hit else True)
+        return result
+
+    def record(self, name, ms, hit):
+        d = self.detectors[name]
+        a = self.alpha
+        d.cost = ms if d.cost is None else d.cost + a * (ms - d.cost)
+        d.hit_rate += a * (float(hit) - d.hit_rate)
+        d.last_run = self.frame
+        if hit:
+            d.last_hit = self.frame
+            d.interval = d.min_interval
+        elif not self._seen(d):
+            d.interval = min(d.max_interval, d.interval + 1)
+
+    def expected_ms(self):
+        # Predicted detector time for the current plan
+        return sum(self.detectors[name].cost or 0.0 for name in self.planned)
+
+    def summary(self):
+        return " ".join(f"{d.name}:{d.cost or 0.0:.1f}ms/{d.interval}f/{d.hit_rate:.2f}"
+                        for d in self.detectors.values())
@@ -0,0 +1,157 @@
+import multiprocessing as mp
+import numpy as np
+from stable_baselines3.common.vec_env.base_vec_env import VecEnv
+from shared_vec_worker import Pickled, SharedArrays, buffer_layout, obs_layout, worker
+import worker_launcher
+
+# Stable-baselines3 VecEnv whose workers write observations, rewards and dones
+# straight into multiprocessing.shared_memory arrays. Only a short command and
+# the (small) info dicts cross the pipes, so nothing observation-sized is
+# pickled per step. Each worker process can host several envs to keep the
+# process count, and the per-step pipe round trips, low.
+#
+# Observations are double-buffered: the arrays returned by step()/reset() are
+# views into shared memory that stay valid until the *next* step completes,
+# which is exactly how long SB3 keeps `_last_obs` around. Copy them if you
+# need them longer.
+
+
+class SharedMemoryVecEnv(VecEnv):
+    def __init__(self, env_fns, n_workers=None, start_method=None):
+        self.waiting = False
+        self.closed = False
+        n_envs = len(env_fns)
+        n_workers = min(n_envs, n_workers or mp.cpu_count())
+
+        # Workers fork from a server that has already imported the simulation
+        ctx = worker_launcher.get_context(start_method)
+
+        # Contiguous slices of envs per worker
+        bounds = np.linspace(0, n_envs, n_workers + 1).astype(int)
+        self.env_slices = [range(bounds[w], bounds[w + 1]) for w in range(n_workers)]
+        self.worker_of = np.repeat(np.arange(n_workers), np.diff(bounds))
+
+        self.remotes, self.work_remotes = zip(*[ctx.Pipe() for _ in range(n_workers)])
+        self.processes = []
+        for work_remote, remote, env_slice in zip(self.work_remotes, self.remotes, self.env_slices):
+            fns = Pickled([env_fns[i] for i in env_slice])
+            args = (work_remote, remote, fns, env_slice.start)
+            # daemon=True: if the main process crashes, we should not cause things to hang
+            process = ctx.Process(target=worker, args=args, daemon=True)
+            process.start()
+            self.processes.append(process)
+            work_remote.close()
+
+        self.remotes[0].send(("get_spaces", None))
+        observation_space, action_space = self.remotes[0].recv()
+        super().__init__(n_envs, observation_space, action_space)
+
+        layout = buffer_layout(n_envs, observation_space, action_space)
+        self.shared = SharedArrays(layout)
+        for remote in self.remotes:
+            remote.send(("attach", (layout, self.shared.names)))
+        for remote in self.remotes:
+            remote.recv()
+        self._obs_keys = list(obs_layout(observation_space))
+        self._slot = 0
+
+    def _read_obs(self, kind, slot=None):
+        views = {}
+        for key in self._obs_keys:
+            arr = self.shared.arrays[(kind, key)]
+            views[key] = arr[slot] if slot is not None else arr
+        return views[None] if self._obs_keys == [None] else views
+
+    def step_async(self, actions):
+        # Alternate between the two observation slots so the previous batch
+        # stays intact while the workers write the next one
+        self._slot ^= 1
+        np.copyto(self.shared.arrays["actions"], np.asarray(actions).reshape(self.shared.arrays["actions"].shape))
+        for remote in self.remotes:
+            remote.send(("step", self._slot))
+        self.waiting = True
+
+    def step_wait(self):
+        infos, self.reset_infos = [], []
+        for remote in self.remotes:
+            worker_infos, worker_reset_infos = remote.recv()
+            infos.extend(worker_infos)
+            self.reset_infos.extend(worker_reset_infos)
+        self.waiting = False
+
+        dones = self.shared.arrays["dones"].copy()
+        if dones.any():
+            terminal = self._read_obs("terminal_obs")
+            for i in np.flatnonzero(dones):
+                if self._obs_keys == [None]:
+                    infos[i]["terminal_observation"] = terminal[i].copy()
+                else:
+                    infos[i]["terminal_observation"] = {key: terminal[key][i].copy() for key in self._obs_keys}
+        return self._read_obs("obs", self._slot), self.shared.arrays["rewards"].copy(), dones, infos
+
+    def reset(self):
+        self._slot ^= 1
+        for remote, env_slice in zip(self.remotes, self.env_slices):
+            seeds = [self._seeds[i] for i in env_slice]
+            options = [self._options[i] for i in env_slice]
+            remote.send(("reset", (self._slot, seeds, options)))
+        self.reset_infos = []
+        for remote in self.remotes:
+            self.reset_infos.extend(remote.recv())
+        # Seeds and options are only used once
+        self._reset_seeds()
+        self._reset_options()
+        return self._read_obs("obs", self._slot)
+
+    def close(self):
+        if self.closed:
+            return
+        if self.waiting:
+            for remote in self.remotes:
+                remote.recv()
+        for remote in self.remotes:
+            remote.send(("close", None))
+        for process in self.processes:
+            process.join()
+        self.shared.close(unlink=True)
+        self.closed = True
+
+    def get_images(self):
+        for remote in self.remotes:
+            remote.send(("render", None))
+        return [img for remote in self.remotes for img in remote.recv()]
+
+    def _call(self, indices, cmd, *payload):
+        # Route a per-env command to the workers owning `indices`, keeping the
+        # results in the requested order
+        indices = list(self._get_indices(indices))
+        by_worker = {}
+        for i in indices:
+            w = int(self.worker_of[i])
+            by_worker.setdefault(w, []).append(i)
+        for w, env_ids in by_worker.items():
+            local = [i - self.env_slices[w].start for i in env_ids]
+            self.remotes[w].send((cmd, (local,) + payload))
+        results = {}
+        for w, env_ids in by_worker.items():
+            out = self.remotes[w].recv()
+            if out is not None:
+                results.update(zip(env_ids, out))
+        return [results.get(i) for i in indices]
+
+    def has_attr(self, attr_name):
+        for remote in self.remotes:
+            remote.send(("has_attr", attr_name))
+        return all([remote.recv() for remote in self.remotes])
+
+    def get_attr(self, attr_name, indices=None):
+        return self._call(indices, "get_attr", attr_name)
+
+    def set_attr(self, attr_name, value, indices=None):
+        self._call(indices, "set_attr", attr_name, value)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        return self._call(indices, "env_method", method_name, method_args, method_kwargs)
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return self._call(indices, "is_wrapped", wrapper_class)
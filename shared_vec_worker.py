@@ -0,0 +1,153 @@
+import cloudpickle
+from multiprocessing import shared_memory
+import numpy as np
+from gymnasium import spaces
+
+# The worker side of SharedMemoryVecEnv (shared_vec_env.py). It is kept apart
+# from the VecEnv itself because it must not import stable-baselines3: that
+# pulls in torch, which costs a worker more to import than everything the
+# simulation needs. Only the rarely used is_wrapped command imports it.
+
+
+class Pickled:
+    # Ships the env factories (lambdas, closures) to the worker with cloudpickle
+    def __init__(self, var):
+        self.var = var
+
+    def __getstate__(self):
+        return cloudpickle.dumps(self.var)
+
+    def __setstate__(self, state):
+        self.var = cloudpickle.loads(state)
+
+
+def obs_layout(space):
+    if isinstance(space, spaces.Dict):
+        return {key: (sub.shape, sub.dtype) for key, sub in space.spaces.items()}
+    return {None: (space.shape, space.dtype)}
+
+
+def action_layout(space):
+    if isinstance(space, spaces.Discrete):
+        return (), np.int64
+    return space.shape, space.dtype
+
+
+class SharedArrays:
+    # Named shared-memory blocks viewed as NumPy arrays. The creating side owns
+    # (and unlinks) them; workers attach by name.
+    def __init__(self, layout, names=None):
+        self.blocks, self.arrays = {}, {}
+        for key, (shape, dtype) in layout.items():
+            size = max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize)
+            if names is None:
+                shm = shared_memory.SharedMemory(create=True, size=size)
+            else:
+                shm = shared_memory.SharedMemory(name=names[key])
+            self.blocks[key] = shm
+            self.arrays[key] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+    @property
+    def names(self):
+        return {key: shm.name for key, shm in self.blocks.items()}
+
+    def close(self, unlink=False):
+        self.arrays = {}
+        for shm in self.blocks.values():
+            shm.close()
+            if unlink: shm.unlink()
+
+
+def buffer_layout(n_envs, observation_space, action_space):
+    layout = {}
+    for key, (shape, dtype) in obs_layout(observation_space).items():
+        layout[("obs", key)] = ((2, n_envs) + shape, dtype)
+        layout[("terminal_obs", key)] = ((n_envs,) + shape, dtype)
+    act_shape, act_dtype = action_layout(action_space)
+    layout["actions"] = ((n_envs,) + act_shape, act_dtype)
+    layout["rewards"] = ((n_envs,), np.float32)
+    layout["dones"] = ((n_envs,), np.bool_)
+    return layout
+
+
+def worker(remote, parent_remote, env_fns_wrapper, first_index):
+    parent_remote.close()
+    envs = [fn() for fn in env_fns_wrapper.var]
+    shared, obs_keys = None, None
+
+    def write(kind, i, obs, slot=None):
+        for key in obs_keys:
+            dest = shared.arrays[(kind, key)]
+            dest = dest[slot] if slot is not None else dest
+            dest[first_index + i] = obs if key is None else obs[key]
+
+    while True:
+        try:
+            cmd, data = remote.recv()
+            if cmd == "step":
+                slot = data
+                actions = shared.arrays["actions"]
+                rewards, dones = shared.arrays["rewards"], shared.arrays["dones"]
+                infos, reset_infos = [], []
+                for i, env in enumerate(envs):
+                    obs, reward, terminated, truncated, info = env.step(actions[first_index + i])
+                    done = terminated or truncated
+                    info["TimeLimit.truncated"] = truncated and not terminated
+                    reset_info = {}
+                    if done:
+                        write("terminal_obs", i, obs)
+                        info["terminal_observation"] = True
+                        obs, reset_info = env.reset()
+                    write("obs", i, obs, slot)
+                    rewards[first_index + i] = reward
+                    dones[first_index + i] = done
+                    infos.append(info)
+                    reset_infos.append(reset_info)
+                remote.send((infos, reset_infos))
+            elif cmd == "reset":
+                slot, seeds, options = data
+                reset_infos = []
+                for i, env in enumerate(envs):
+                    maybe_options = {"options": options[i]} if options[i] else {}
+                    obs, reset_info = env.reset(seed=seeds[i], **maybe_options)
+                    write("obs", i, obs, slot)
+                    reset_infos.append(reset_info)
+                remote.send(reset_infos)
+            elif cmd == "attach":
+                layout, names = data
+                shared = SharedArrays(layout, names)
+                obs_keys = [k[1] for k in layout if isinstance(k, tuple) and k[0] == "obs"]
+                remote.send(None)
+            elif cmd == "get_spaces":
+                remote.send((envs[0].observation_space, envs[0].action_space))
+            elif cmd == "render":
+                remote.send([env.render() for env in envs])
+            elif cmd == "close":
+                for env in envs: env.close()
+                if shared is not None: shared.close()
+                remote.close()
+                break
+            elif cmd == "env_method":
+                indices, name, args, kwargs = data
+                remote.send([envs[i].get_wrapper_attr(name)(*args, **kwargs) for i in indices])
+            elif cmd == "get_attr":
+                indices, name = data
+                remote.send([envs[i].get_wrapper_attr(name) for i in indices])
+            elif cmd == "has_attr":
+                try:
+                    for env in envs: env.get_wrapper_attr(data)
+                    remote.send(True)
+                except AttributeError:
+                    remote.send(False)
+            elif cmd == "set_attr":
+                indices, name, value = data
+                for i in indices: setattr(envs[i], name, value)
+                remote.send(None)
+            elif cmd == "is_wrapped":
+                from stable_baselines3.common.env_util import is_wrapped
+                indices, wrapper_class = data
+                remote.send([is_wrapped(envs[i], wrapper_class) for i in indices])
+            else:
+                raise NotImplementedError(f"`{cmd}` is not implemented in the worker")
+        except (EOFError, KeyboardInterrupt):
+            break
@@ -0,0 +1,177 @@
+import argparse
+import gc
+import os
+import resource
+import sys
+import time
+import tracemalloc
+from collections import Counter
+import numpy as np
+from gymnasium_env_doodle.envs.doodle_env import DoodleJumpEnv
+from level_gen import KEEP_CHUNKS, ChunkStore, get_chunk_store
+
+# Long-run memory check for DoodleJumpEnv. Runs one env for millions of steps
+# (resetting as episodes end) and, every `interval` steps after a warm-up,
+# records resident memory, tracemalloc's traced total and the number of live
+# objects per type. In steady state an env's memory must not depend on how
+# long it has run, so the run fails (exit code 1) if any of them grew past
+# its threshold between the end of the warm-up and the end of the run, and
+# prints the allocation sites and types that grew most.
+#
+#   python soak.py --steps 5000000 --interval 250000 --no-trace
+#   python soak.py --steps 400000 --interval 50000      # with tracemalloc
+#   python soak.py --policy planner --steps 200000     # long episodes
+#
+# The default random policy dies after ~570 steps, so it mostly exercises
+# reset() and the start of a level; growth within an episode (a level
+# streamed for thousands of platforms) needs --policy planner, which is
+# about 10x slower per step.
+#
+# The warm-up (a quarter of the run by default) lets the reachability table
+# and other one-off allocations settle before the baseline is taken. The
+# level chunk stores are checked directly at the end of the run: no more of
+# them alive than the shared cache's maxsize plus one private store per env,
+# and none holding more than KEEP_CHUNKS chunks.
+#
+# tracemalloc makes every allocation expensive: expect steps ~15x slower
+# with it, and more per extra --frames of traceback.
+
+def rss_bytes():
+    # Current resident set size (peak on systems without /proc)
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        scale = 1 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+def live_objects():
+    gc.collect()
+    return Counter(type(o).__name__ for o in gc.get_objects())
+
+
+def chunk_stores():
+    # (stores, chunks) alive: the cached ones and any generator's private one
+    stores = [o for o in gc.get_objects() if isinstance(o, ChunkStore)]
+    return len(stores), max((len(s.chunks) for s in stores), default=0)
+
+
+def _snapshot():
+    return tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ])
+
+
+def soak(steps=1000000, interval=100000, warmup=None, policy="random", seed=0, trace=True, frames=1,
+         max_traced_kb=512, max_rss_mb=32, max_object_growth=2000):
+    warmup = steps // 4 if warmup is None else min(warmup, steps // 2)
+    env = DoodleJumpEnv()
+    rng = np.random.default_rng(seed)
+    if policy == "planner":
+        from planner import LookaheadPlanner
+        planner = LookaheadPlanner()
+        act = lambda: planner.act(env)
+    else:
+        # Random actions, drawn in blocks
+        actions = iter(())
+        def act():
+            nonlocal actions
+            try:
+                return next(actions)
+            except StopIteration:
+                actions = iter(rng.integers(0, 4, 4096).tolist())
+                return next(actions)
+
+    if trace:
+        tracemalloc.start(frames)
+    env.reset(seed=seed)
+    episodes, best = 0, 0
+    baseline = None
+    print(f"{'steps':>10} {'steps/s':>8} {'episodes':>8} {'rss MB':>8} {'traced KB':>10} {'objects':>9}", flush=True)
+    t0 = time.perf_counter()
+    last_t, last_step = t0, 0
+    for step in range(1, steps + 1):
+        _, _, terminated, truncated, info = env.step(act())
+        if terminated or truncated:
+            episodes += 1
+            best = max(best, info["score"])
+            env.reset()
+
+        if step == warmup or (step > warmup and (step - warmup) % interval == 0) or step == steps:
+            now = time.perf_counter()
+            # Only the baseline and the last sample take a snapshot, and
+            # objects are always counted with exactly one alive (the
+            # baseline's), or its traces would show up as growth
+            snapshot = _snapshot() if trace and baseline is None else None
+            objects = live_objects()
+            if trace and step == steps:
+                snapshot = _snapshot()
+            sample = {
+                "rss": rss_bytes(),
+                "traced": tracemalloc.get_traced_memory()[0] if trace else 0,
+                "objects": objects,
+                "snapshot": snapshot,
+            }
+            rate = (step - last_step) / (now - last_t)
+            last_t, last_step = time.perf_counter(), step
+            print(f"{step:>10} {rate:8.0f} {episodes:>8} {sample['rss'] / 2**20:8.1f} "
+                  f"{sample['traced'] / 1024:10.1f} {sum(sample['objects'].values()):>9}", flush=True)
+            if baseline is None:
+                baseline = sample
+    print(f"{episodes} episodes, best score {best}, {time.perf_counter() - t0:.0f}s")
+
+    # --- VERDICT ---
+    failures = []
+    rss_growth = (sample["rss"] - baseline["rss"]) / 2**20
+    if rss_growth > max_rss_mb:
+        failures.append(f"resident memory grew {rss_growth:.1f} MB (limit {max_rss_mb} MB)")
+    traced_growth = (sample["traced"] - baseline["traced"]) / 1024
+    if trace and traced_growth > max_traced_kb:
+        failures.append(f"traced memory grew {traced_growth:.0f} KB (limit {max_traced_kb} KB)")
+    object_growth = sample["objects"] - baseline["objects"]
+    for name, grown in object_growth.most_common():
+        if grown > max_object_growth:
+            failures.append(f"{grown} more live {name} objects (limit {max_object_growth})")
+    cache = get_chunk_store.cache_info()
+    stores, most_chunks = chunk_stores()
+    # One env, so at most one store of its own outside the cache
+    if stores > cache.maxsize + 1:
+        failures.append(f"{stores} chunk stores alive (cache maxsize {cache.maxsize} + 1 env)")
+    if most_chunks > KEEP_CHUNKS:
+        failures.append(f"a chunk store holds {most_chunks} chunks (KEEP_CHUNKS {KEEP_CHUNKS})")
+
+    print(f"\ngrowth after warm-up: rss {rss_growth:+.1f} MB, traced {traced_growth:+.0f} KB")
+    print(f"chunk stores: {cache.currsize}/{cache.maxsize} cached, {stores} alive, "
+          f"at most {most_chunks}/{KEEP_CHUNKS} chunks each")
+    if object_growth:
+        print("live objects:", ", ".join(f"{name} +{n}" for name, n in object_growth.most_common(5)))
+    if trace:
+        print("top allocation sites:")
+        for stat in sample["snapshot"].compare_to(baseline["snapshot"], "lineno")[:5]:
+            print(f"  {stat}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print("OK: memory is flat in steady state")
+    return not failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--steps", type=int, default=1000000)
+    parser.add_argument("--interval", type=int, default=100000)
+    parser.add_argument("--warmup", type=int, default=None, help="steps before the baseline (default: steps / 4)")
+    parser.add_argument("--policy", choices=["random", "planner"], default="random",
+                        help="random episodes end after ~570 steps; planner ones run long")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-trace", action="store_true", help="skip tracemalloc (faster; RSS and objects only)")
+    parser.add_argument("--frames", type=int, default=1, help="traceback depth kept per allocation")
+    parser.add_argument("--max-traced-kb", type=float, default=512)
+    parser.add_argument("--max-rss-mb", type=float, default=32)
+    parser.add_argument("--max-object-growth", type=int, default=2000)
+    args = parser.parse_args()
+    ok = soak(args.steps, args.interval, args.warmup, args.policy, args.seed, not args.no_trace,
+              args.frames, args.max_traced_kb, args.max_rss_mb, args.max_object_growth)
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,195 @@
+import argparse
+import csv
+import json
+import math
+import os
+import queue
+import random
+import statistics
+import time
+import worker_launcher
+from train import HYPERPARAMS, make_env
+
+# Random-search hyperparameter sweep over train.py's PPO setup. Trials run in
+# parallel worker processes, each pinned to its own `cpus_per_trial` cores
+# (torch threads and envs sized to match), and evaluate themselves every
+# `eval_freq` timesteps. A trial whose score at an evaluation is below the
+# median of the other trials' scores at the same evaluation is stopped early
+# (the median stopping rule), freeing its cores for the next configuration.
+#
+#   python sweep.py --name night1 --trials 40 --timesteps 1000000 --cpus-per-trial 2
+#
+# Everything goes to sweeps/<name>/: leaderboard.csv and leaderboard.json
+# (rewritten whenever a trial reports), trial_<n>.zip (the final policy of
+# every trial that wasn't stopped) and tensorboard runs under tb/.
+
+SWEEP_DIR = "./sweeps/"
+
+# name -> list of choices, or ("log", low, high) for a log-uniform draw
+SPACE = {
+    "learning_rate": ("log", 5e-5, 1e-3),
+    "ent_coef": ("log", 1e-3, 0.05),
+    "gamma": [0.98, 0.99, 0.995],
+    "n_steps": [512, 1024, 2048],
+    "batch_size": [64, 128, 256],
+    "n_epochs": [5, 10],
+    "clip_range": [0.1, 0.2, 0.3],
+}
+
+
+def sample_config(rng, space=SPACE):
+    config = {}
+    for name, choice in space.items():
+        if isinstance(choice, tuple) and choice[0] == "log":
+            config[name] = math.exp(rng.uniform(math.log(choice[1]), math.log(choice[2])))
+        else:
+            config[name] = rng.choice(choice)
+    return config
+
+
+class MedianStopper:
+    # Median stopping rule over evaluation rungs. Scores from stopped trials
+    # still count: they are what a weak trial looked like at that point
+    def __init__(self, min_trials=3, grace=1):
+        self.min_trials = min_trials
+        self.grace = grace
+        self.rungs = {}
+
+    def report(self, trial, rung, score):
+        # True if `trial` should stop
+        others = [s for t, s in self.rungs.get(rung, {}).items() if t != trial]
+        self.rungs.setdefault(rung, {})[trial] = score
+        return rung > self.grace and len(others) >= self.min_trials and score < statistics.median(others)
+
+
+# --- TRIALS ---
+
+def run_trial(trial, config, timesteps, eval_freq, n_episodes, n_envs, cpus, out_dir, seed, reports, stop):
+    # Runs in its own process
+    try:
+        if cpus and hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, cpus)
+        import torch as th
+        from stable_baselines3 import PPO
+        from stable_baselines3.common.env_util import make_vec_env
+        from callbacks import SweepReportCallback
+        th.set_num_threads(max(1, len(cpus or ())))
+
+        env = make_vec_env(make_env, n_envs=n_envs, seed=seed)
+        model = PPO("MultiInputPolicy", env, verbose=0, seed=seed, tensorboard_log=os.path.join(out_dir, "tb"),
+                    **{**HYPERPARAMS, **config})
+        callback = SweepReportCallback(trial, eval_freq, reports, stop, n_episodes)
+        model.learn(total_timesteps=timesteps, callback=callback, tb_log_name=f"trial_{trial}")
+        if not stop.is_set():
+            model.save(os.path.join(out_dir, f"trial_{trial}"))
+        reports.put(("done", trial, model.num_timesteps, None))
+    except Exception as e:
+        reports.put(("failed", trial, 0, repr(e)))
+
+
+# --- SWEEP ---
+
+def write_leaderboard(out_dir, trials):
+    ranked = sorted(trials.values(), key=lambda t: -math.inf if t["best_score"] is None else t["best_score"],
+                    reverse=True)
+    with open(os.path.join(out_dir, "leaderboard.json"), "w") as f:
+        json.dump(ranked, f, indent=1)
+    with open(os.path.join(out_dir, "leaderboard.csv"), "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["rank", "trial", "status", "best_score", "last_score", "timesteps", "minutes"] + list(SPACE))
+        for rank, t in enumerate(ranked, 1):
+            writer.writerow([rank, t["trial"], t["status"], t["best_score"], t["last_score"], t["timesteps"],
+                             round(t["minutes"], 1)] + [t["config"].get(name) for name in SPACE])
+    return ranked
+
+
+def sweep(name, n_trials=20, timesteps=500000, eval_freq=50000, n_episodes=5, cpus_per_trial=1, n_envs=None,
+          min_trials=3, grace=1, seed=0):
+    out_dir = os.path.join(SWEEP_DIR, name)
+    os.makedirs(out_dir, exist_ok=True)
+    rng = random.Random(seed)
+    ctx = worker_launcher.get_context(preload=worker_launcher.POLICY_PRELOAD)
+    reports = ctx.Queue()
+    stopper = MedianStopper(min_trials, grace)
+
+    # Core groups handed out to running trials
+    cores = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else list(range(os.cpu_count()))
+    groups = [cores[i:i + cpus_per_trial] for i in range(0, len(cores) - cpus_per_trial + 1, cpus_per_trial)] \
+        or [cores]
+    free = list(groups)
+    n_envs = n_envs or cpus_per_trial
+    print(f"Sweep {name}: {n_trials} trials, {len(groups)} at a time on {len(cores)} cores")
+
+    trials, running = {}, {}
+    next_trial = 0
+    while next_trial < n_trials or running:
+        while free and next_trial < n_trials:
+            trial, group = next_trial, free.pop()
+            next_trial += 1
+            config = sample_config(rng)
+            stop = ctx.Event()
+            process = worker_launcher.start_process(
+                run_trial, (trial, config, timesteps, eval_freq, n_episodes, n_envs, group, out_dir, seed + trial,
+                            reports, stop), ctx)
+            running[trial] = (process, stop, group)
+            trials[trial] = {"trial": trial, "status": "running", "best_score": None, "last_score": None,
+                             "timesteps": 0, "minutes": 0.0, "started": time.time(), "config": config}
+
+        try:
+            kind, trial, timesteps_done, value = reports.get(timeout=5.0)
+        except queue.Empty:
+            # A trial that died without reporting (killed, out of memory)
+            for trial, (process, stop, group) in list(running.items()):
+                if not process.is_alive():
+                    reports.put(("failed", trial, 0, f"exit code {process.exitcode}"))
+            continue
+
+        t = trials[trial]
+        t["minutes"] = (time.time() - t["started"]) / 60
+        if kind == "eval":
+            t["timesteps"] = timesteps_done
+            t["last_score"] = value
+            t["best_score"] = value if t["best_score"] is None else max(t["best_score"], value)
+            stop_now = stopper.report(trial, timesteps_done // eval_freq, value)
+            if stop_now and t["status"] == "running" and timesteps_done < timesteps:
+                t["status"] = "stopped"
+                running[trial][1].set()
+                print(f"trial {trial}: stopped at {timesteps_done} steps, score {value:.0f}")
+        elif trial in running:
+            process, stop, group = running.pop(trial)
+            process.join()
+            free.append(group)
+            if kind == "failed":
+                t["status"] = "failed"
+                t["error"] = value
+                print(f"trial {trial}: failed ({value})")
+            else:
+                t["timesteps"] = max(t["timesteps"], timesteps_done)
+                if t["status"] == "running": t["status"] = "done"
+                print(f"trial {trial}: {t['status']} after {t['timesteps']} steps, best score {t['best_score']}")
+        write_leaderboard(out_dir, trials)
+
+    ranked = write_leaderboard(out_dir, trials)
+    print(f"\n{'rank':>4} {'trial':>5} {'status':>8} {'best':>7}  config")
+    for rank, t in enumerate(ranked[:10], 1):
+        best = "-" if t["best_score"] is None else f"{t['best_score']:.0f}"
+        config = ", ".join(f"{k}={v:.3g}" if isinstance(v, float) else f"{k}={v}" for k, v in t["config"].items())
+        print(f"{rank:>4} {t['trial']:>5} {t['status']:>8} {best:>7}  {config}")
+    return ranked
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--name", default=time.strftime("sweep_%Y%m%d_%H%M"))
+    parser.add_argument("--trials", type=int, default=20)
+    parser.add_argument("--timesteps", type=int, default=500000, help="per trial, unless stopped early")
+    parser.add_argument("--eval-freq", type=int, default=50000)
+    parser.add_argument("--eval-episodes", type=int, default=5)
+    parser.add_argument("--cpus-per-trial", type=int, default=1)
+    parser.add_argument("--n-envs", type=int, default=None, help="envs per trial (default: one per core)")
+    parser.add_argument("--min-trials", type=int, default=3, help="trials needed at an evaluation before stopping any")
+    parser.add_argument("--grace", type=int, default=1, help="evaluations before a trial can be stopped")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    sweep(args.name, args.trials, args.timesteps, args.eval_freq, args.eval_episodes, args.cpus_per_trial,
+          args.n_envs, args.min_trials, args.grace, args.seed)
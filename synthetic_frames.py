@@ -0,0 +1,180 @@
+import os
+import random
+import cv2
+import numpy as np
+
+# Renders game-like BGRA frames (the format GameView.getScreen returns) from
+# DoodleJumpEnv state using the sprites in images/, together with exact
+# ground-truth boxes for every object drawn. The env itself has no brown
+# platforms, items or hazards switched on, so those are sprinkled in with
+# their own seeded RNG to give every detector something to find. The extras
+# are decided once per platform (from its uid) and ride along with it, so
+# consecutive frames stay as coherent as the real game's. No blue pad sprite
+# ships with the repo, so moving platforms are a recoloured JumpPad.
+
+IMAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "images")
+
+# GameView.detectPlayer's yellow range. The player is boxed by its yellow
+# body alone (not the green legs and snout), so that's what its truth covers
+PLAYER_HSV = (np.array([20, 100, 100]), np.array([35, 255, 255]))
+
+TRUTH_KEYS = ("player", "platforms", "moving_platforms", "white_platforms", "brown_platforms",
+              "springs", "propellors", "monsters", "black_holes")
+
+
+class Sprite:
+    def __init__(self, bgr, alpha, truth_hsv=None):
+        self.bgr = bgr.astype(np.float32)
+        self.alpha = (alpha.astype(np.float32) / 255.0)[:, :, None]
+        self.h, self.w = alpha.shape
+        # Tight box of the visible pixels (or of those within `truth_hsv`),
+        # used for the ground truth
+        visible = alpha > 127
+        if truth_hsv is not None:
+            visible &= cv2.inRange(cv2.cvtColor(bgr, cv2.COLOR_BGR2HSV), *truth_hsv) > 0
+        ys, xs = np.nonzero(visible)
+        self.box = (int(xs.min()), int(ys.min()), int(xs.max()) + 1, int(ys.max()) + 1)
+
+
+def load_sprite(name, width=None, white_key=False, truth_hsv=None):
+    img = cv2.imread(os.path.join(IMAGES_DIR, name), cv2.IMREAD_UNCHANGED)
+    if img.shape[2] == 4:
+        bgr, alpha = img[:, :, :3], img[:, :, 3]
+    else:
+        bgr, alpha = img, np.full(img.shape[:2], 255, np.uint8)
+    if white_key:
+        # JPEG sprites come on a white card: treat near-white as transparent
+        hsv = cv2.cvtColor(bgr, cv2.COLOR_BGR2HSV)
+        alpha = np.where((hsv[:, :, 1] < 30) & (hsv[:, :, 2] > 225), 0, 255).astype(np.uint8)
+    if width is not None and width != bgr.shape[1]:
+        height = max(1, round(bgr.shape[0] * width / bgr.shape[1]))
+        bgr = cv2.resize(bgr, (width, height), interpolation=cv2.INTER_AREA)
+        alpha = cv2.resize(alpha, (width, height), interpolation=cv2.INTER_AREA)
+    return Sprite(np.ascontiguousarray(bgr), alpha, truth_hsv)
+
+
+def recolor(sprite, hue, min_sat, min_val):
+    # Moves the saturated body of a sprite to another hue (no blue pad sprite ships)
+    hsv = cv2.cvtColor(sprite.bgr.astype(np.uint8), cv2.COLOR_BGR2HSV)
+    body = hsv[:, :, 1] > 100
+    hsv[body, 0] = hue
+    hsv[body, 1] = np.maximum(hsv[body, 1], min_sat)
+    hsv[body, 2] = np.maximum(hsv[body, 2], min_val)
+    return Sprite(cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR), (sprite.alpha[:, :, 0] * 255).astype(np.uint8))
+
+
+class SyntheticFrameRenderer:
+    # Probabilities are per platform
+    def __init__(self, width=448, height=682, seed=None, brown_prob=0.1, spring_prob=0.15,
+                 propellor_prob=0.02, monster_prob=0.03, black_hole_prob=0.02):
+        self.width, self.height = width, height
+        self.seed = random.Random(seed).getrandbits(32)
+        self.brown_prob = brown_prob
+        self.spring_prob = spring_prob
+        self.propellor_prob = propellor_prob
+        self.monster_prob = monster_prob
+        self.black_hole_prob = black_hole_prob
+
+        self.sprites = {
+            "platforms": load_sprite("JumpPad.png", 60),
+            "white_platforms": load_sprite("BlankPlatform.png", 60),
+            "brown_platforms": load_sprite("BreakablePad.png", 60),
+            "player": load_sprite("DoodleJumper.jpg", 30, white_key=True, truth_hsv=PLAYER_HSV),
+            "springs": load_sprite("Spring.png"),
+            "propellors": load_sprite("Propellor.png", 30),
+            "monsters": load_sprite("Monster1.png", 45),
+            "black_holes": load_sprite("Blackhole.png", 70),
+        }
+        self.sprites["moving_platforms"] = recolor(self.sprites["platforms"], 95, 215, 200)
+
+        tile = cv2.imread(os.path.join(IMAGES_DIR, "BackgroundTile.jpg"))
+        reps = (height // tile.shape[0] + 1, width // tile.shape[1] + 1, 1)
+        self.background = cv2.cvtColor(np.tile(tile, reps)[:height, :width], cv2.COLOR_BGR2BGRA)
+
+    def _blit(self, frame, sprite, x, y):
+        # Alpha-composites a sprite with its top-left at (x, y); returns the
+        # clipped (x, y, w, h) box of its visible pixels, or None if off screen
+        x0, y0 = max(0, x), max(0, y)
+        x1, y1 = min(self.width, x + sprite.w), min(self.height, y + sprite.h)
+        if x0 >= x1 or y0 >= y1:
+            return None
+        sx0, sy0 = x0 - x, y0 - y
+        sx1, sy1 = sx0 + (x1 - x0), sy0 + (y1 - y0)
+        roi = frame[y0:y1, x0:x1, :3]
+        a = sprite.alpha[sy0:sy1, sx0:sx1]
+        roi[:] = (roi * (1.0 - a) + sprite.bgr[sy0:sy1, sx0:sx1] * a + 0.5).astype(np.uint8)
+
+        bx0, by0, bx1, by1 = sprite.box
+        bx0, by0 = max(x0, x + bx0), max(y0, y + by0)
+        bx1, by1 = min(x1, x + bx1), min(y1, y + by1)
+        if bx0 >= bx1 or by0 >= by1:
+            return None
+        return (bx0, by0, bx1 - bx0, by1 - by0)
+
+    def _add(self, frame, truth, key, x, y):
+        box = self._blit(frame, self.sprites[key], x, y)
+        if box is not None:
+            truth[key].append(box)
+        return box
+
+    def _extras(self, uid):
+        # Fixed per platform: (pad key override, spring, hazard/item key, hazard x, hazard rise)
+        rng = random.Random(self.seed * 1000003 + uid)
+        brown = rng.random() < self.brown_prob
+        spring = rng.random() < self.spring_prob
+        roll, extra = rng.random(), None
+        for key, prob in (("monsters", self.monster_prob), ("black_holes", self.black_hole_prob),
+                          ("propellors", self.propellor_prob)):
+            if roll < prob:
+                extra = key
+                break
+            roll -= prob
+        return brown, spring, extra, rng.random(), rng.randint(12, 30)
+
+    def _is_free(self, x, y, sprite, taken):
+        return all(x + sprite.w + 10 < tx or tx + tw + 10 < x or y + sprite.h + 10 < ty or ty + th + 10 < y
+                   for tx, ty, tw, th in taken)
+
+    def render(self, env):
+        frame = self.background.copy()
+        truth = {key: [] for key in TRUTH_KEYS}
+        taken = []
+        extras = []
+
+        for p in env.platforms:
+            r = p.rect
+            brown, spring, extra, extra_x, extra_rise = self._extras(p.uid)
+            if p.type == 'blue': key = "moving_platforms"
+            elif p.type == 'white': key = "white_platforms"
+            elif brown and r.width <= 60: key = "brown_platforms"
+            else: key = "platforms"
+
+            # The env's full-width starting floor has no sprite; draw it as pads
+            for x in range(r.x, r.right, 60) if r.width > 60 else (r.x,):
+                box = self._add(frame, truth, key, x, r.y)
+                if box is not None: taken.append(box)
+
+            if key in ("platforms", "moving_platforms") and r.width <= 60:
+                if p.has_item == 'spring' or spring:
+                    sprite = self.sprites["springs"]
+                    box = self._add(frame, truth, "springs", r.centerx - sprite.w // 2, r.top - sprite.h + 2)
+                    if box is not None: taken.append(box)
+            if extra is not None and r.width <= 60:
+                sprite = self.sprites[extra]
+                extras.append((extra, int(extra_x * (self.width - sprite.w)), r.top - extra_rise - sprite.h))
+
+        pl = env.player
+        player = self.sprites["player"]
+        box = self._add(frame, truth, "player", pl.rect.centerx - player.w // 2, pl.rect.bottom - player.h)
+        if box is not None: taken.append(box)
+
+        extras += [("monsters", m.rect.x, m.rect.y) for m in env.monsters]
+        extras += [("black_holes", bh.center[0] - bh.radius, bh.center[1] - bh.radius) for bh in env.black_holes]
+        for key, x, y in extras:
+            # Skipped while it would overlap something already drawn
+            if not self._is_free(x, y, self.sprites[key], taken):
+                continue
+            box = self._add(frame, truth, key, x, y)
+            if box is not None: taken.append(box)
+
+        return frame, truth
@@ -1,10 +1,10 @@
+import argparse
 import gymnasium as gym
-from stable_baselines3 import PPO
 from gymnasium_env_doodle.envs.doodle_env import DoodleJumpEnv
 import pygame
 import sys
 
-def test():
+def test(policy_path=None):
     pygame.init()
     WIDTH, HEIGHT = 448, 682
     screen = pygame.display.set_mode((WIDTH, HEIGHT))
@@ -12,11 +12,19 @@ def test():
     clock = pygame.time.Clock()
 
     # Match the environment settings used in training
-    env = DoodleJumpEnv(width=WIDTH, height=HEIGHT, enable_hazards=False, enable_powerups=False)
+    env = DoodleJumpEnv(width=WIDTH, height=HEIGHT, enable_hazards=False, enable_powerups=False,
+                        render_mode="rgb_array")
 
     try:
-        # Load the updated v13 model
-        model = PPO.load("ppo_doodle_jump_stage1_v15")
+        if policy_path:
+            # Exported with policy_export.py: NumPy only, no torch
+            from policy_export import NumpyPolicy
+            model = NumpyPolicy.load(policy_path)
+        else:
+            # Imported here: torch takes longer to import than everything else combined
+            from stable_baselines3 import PPO
+            # Load the updated v13 model
+            model = PPO.load("ppo_doodle_jump_stage1_v15")
     except Exception as e:
         print(f"Error loading model: {e}")
         return
@@ -39,9 +47,8 @@ def test():
             obs, info = env.reset()
 
         # DRAWING
-        screen.fill((250, 248, 239))
-        for p in env.platforms: p.draw(screen)
-        env.player.draw(screen)
+        # render() returns (height, width, 3); pygame surfaces are (width, height)
+        pygame.surfarray.blit_array(screen, env.render().swapaxes(0, 1))
 
         # Show Score
         font = pygame.font.SysFont("Arial", 18, bold=True)
@@ -55,4 +62,6 @@ def test():
     sys.exit()
 
 if __name__ == "__main__":
-    test()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--policy", default=None, help="exported .npz policy to run instead of the SB3 model")
+    test(parser.parse_args().policy)
@@ -0,0 +1,168 @@
+import numpy as np
+
+# Temporal state estimation for the vision pipeline. Each tracked object is a
+# constant-velocity Kalman filter on its box centre (with the box size
+# smoothed separately), and a BoxTracker keeps a set of them with stable ids,
+# matching new detections to the predicted positions. When a detector did not
+# run on a frame, predict() moves every track forward instead, so consumers
+# get a position and velocity for every frame.
+#
+# Units follow whatever dt is passed in: seconds gives px/s velocities, 1 per
+# frame gives px/frame.
+
+
+class KalmanTrack:
+    def __init__(self, track_id, box, accel_std, meas_std):
+        x, y, w, h = box
+        self.id = track_id
+        self.state = np.array([x + w / 2, y + h / 2, 0.0, 0.0])
+        # Unknown velocity: start with a wide variance on it
+        self.cov = np.diag([meas_std ** 2, meas_std ** 2, 1e6, 1e6])
+        self.size = np.array([w, h], dtype=float)
+        self.accel_std = np.asarray(accel_std, dtype=float)
+        self.meas_var = meas_std ** 2
+        self.hits = 1
+        self.missed = 0
+        self.age = 0
+
+    def predict(self, dt):
+        F = np.eye(4)
+        F[0, 2] = F[1, 3] = dt
+        # White-noise acceleration model, separate strength per axis
+        qx, qy = np.broadcast_to(self.accel_std, 2) ** 2
+        dt2, dt3, dt4 = dt * dt, dt ** 3 / 2, dt ** 4 / 4
+        Q = np.array([[qx * dt4, 0, qx * dt3, 0],
+                      [0, qy * dt4, 0, qy * dt3],
+                      [qx * dt3, 0, qx * dt2, 0],
+                      [0, qy * dt3, 0, qy * dt2]])
+        self.state = F @ self.state
+        self.cov = F @ self.cov @ F.T + Q
+        self.age += 1
+
+    def correct(self, box):
+        x, y, w, h = box
+        z = np.array([x + w / 2, y + h / 2])
+        # H picks the position out of the state, so S and K are just slices
+        S = self.cov[:2, :2] + np.eye(2) * self.meas_var
+        K = self.cov[:, :2] @ np.linalg.inv(S)
+        self.state = self.state + K @ (z - self.state[:2])
+        self.cov = self.cov - K @ self.cov[:2, :]
+        self.size += 0.5 * (np.array([w, h]) - self.size)
+        self.hits += 1
+        self.missed = 0
+
+    @property
+    def center(self):
+        return (float(self.state[0]), float(self.state[1]))
+
+    @property
+    def velocity(self):
+        return (float(self.state[2]), float(self.state[3]))
+
+    @property
+    def box(self):
+        w, h = self.size
+        return (int(round(self.state[0] - w / 2)), int(round(self.state[1] - h / 2)), int(round(w)), int(round(h)))
+
+
+class BoxTracker:
+    # Multi-object tracker for one kind of box. Detections are matched to the
+    # predicted track centres greedily by distance (within `gate` px); a track
+    # is dropped after `max_missed` updates without a match. accel_std is a
+    # number or an (x, y) pair.
+    def __init__(self, accel_std=2000.0, meas_std=2.0, gate=60.0, max_missed=10):
+        self.accel_std = accel_std
+        self.meas_std = meas_std
+        self.gate = gate
+        self.max_missed = max_missed
+        self.tracks = []
+        self.next_id = 0
+
+    def predict(self, dt):
+        # Extrapolate only (the detector did not run this frame)
+        for track in self.tracks:
+            track.predict(dt)
+        return self.tracks
+
+    def update(self, boxes, dt):
+        self.predict(dt)
+        return self.correct(boxes)
+
+    def correct(self, boxes):
+        # Match this frame's detections to the (already predicted) tracks
+        boxes = [b for b in boxes if b is not None]
+
+        matched_tracks, matched_boxes = set(), set()
+        if self.tracks and boxes:
+            predicted = np.array([t.state[:2] for t in self.tracks])
+            centers = np.array([(x + w / 2, y + h / 2) for x, y, w, h in boxes])
+            dist = np.linalg.norm(predicted[:, None, :] - centers[None, :, :], axis=2)
+            for flat in np.argsort(dist, axis=None):
+                i, j = divmod(int(flat), len(boxes))
+                if dist[i, j] > self.gate:
+                    break
+                if i in matched_tracks or j in matched_boxes:
+                    continue
+                self.tracks[i].correct(boxes[j])
+                matched_tracks.add(i)
+                matched_boxes.add(j)
+
+        for i, track in enumerate(self.tracks):
+            if i not in matched_tracks:
+                track.missed += 1
+        self.tracks = [t for t in self.tracks if t.missed <= self.max_missed]
+
+        for j, box in enumerate(boxes):
+            if j not in matched_boxes:
+                self.tracks.append(KalmanTrack(self.next_id, box, self.accel_std, self.meas_std))
+                self.next_id += 1
+        return self.tracks
+
+    def best(self):
+        # Most established live track (for single objects such as the player)
+        if not self.tracks:
+            return None
+        return max(self.tracks, key=lambda t: (t.missed == 0, t.hits))
+
+
+class SceneTracker:
+    # The trackers main.py uses: the player, moving platforms, monsters and
+    # the low-priority objects (black holes, rockets, propellors). Call
+    # predict(dt) once per frame, then correct() each kind whose detector ran;
+    # kinds that were not corrected keep their extrapolated tracks.
+    KINDS = {
+        # Key presses, gravity and bounces (vy flips by ~15 px/frame on landing)
+        "player": dict(accel_std=(3000.0, 20000.0), gate=80.0, max_missed=15),
+        "moving_platforms": dict(accel_std=800.0, gate=50.0),
+        "monsters": dict(accel_std=1000.0, gate=60.0),
+        "black_holes": dict(accel_std=1000.0, gate=80.0),
+        "rockets": dict(accel_std=1000.0, gate=60.0),
+        "propellors": dict(accel_std=1000.0, gate=60.0),
+    }
+
+    def __init__(self):
+        self.trackers = {kind: BoxTracker(**params) for kind, params in self.KINDS.items()}
+
+    def predict(self, dt):
+        for tracker in self.trackers.values():
+            tracker.predict(dt)
+
+    def correct(self, kind, boxes):
+        return self.trackers[kind].correct(boxes)
+
+    def update(self, dt, **detections):
+        # predict + correct in one go; kinds missing (or None) are only predicted
+        self.predict(dt)
+        for kind, boxes in detections.items():
+            if boxes is not None:
+                self.correct(kind, boxes)
+        return self
+
+    def player(self):
+        return self.trackers["player"].best()
+
+    def tracks(self, kind):
+        return self.trackers[kind].tracks
+
+    def boxes(self, kind):
+        return [t.box for t in self.trackers[kind].tracks]
@@ -1,34 +1,154 @@
+import argparse
+import glob
+import os
+import re
 import gymnasium as gym
-from stable_baselines3 import PPO
-from gymnasium_env_doodle.envs.doodle_env import DoodleJumpEnv
+import gymnasium_env_doodle
+from demos import DemoDataset
+
+# stable-baselines3 (and with it torch) is imported inside the functions that
+# need it: env workers import this module to unpickle make_env, and torch
+# would cost each of them more than the simulation itself.
+
+TOTAL_TIMESTEPS = 4000000
+TENSORBOARD_LOG = "./ppo_doodle_tensorboard/"
+CHECKPOINT_DIR = "./checkpoints/"
+CHECKPOINT_PREFIX = "ppo_doodle"
+# Written next to the checkpoints: the tensorboard run they belong to
+RUN_FILE = "tensorboard_run.txt"
+# PPO settings that differ from SB3's defaults (sweep.py varies these and more)
+HYPERPARAMS = {"ent_coef": 0.025, "learning_rate": 0.0002}
+
+def make_env():
+    # We keep hazards and powerups off for Stage 1 (Basic Climbing), which is
+    # what DoodleJump-v0 is registered with
+    return gym.make("DoodleJump-v0")
+
+# --- CHECKPOINTING ---
+
+def list_checkpoints(checkpoint_dir=CHECKPOINT_DIR):
+    # (timesteps, path) pairs, oldest first
+    found = []
+    for path in glob.glob(os.path.join(checkpoint_dir, f"{CHECKPOINT_PREFIX}_*_steps.zip")):
+        match = re.search(r"_(\d+)_steps\.zip$", path)
+        if match: found.append((int(match.group(1)), path))
+    return sorted(found)
+
+def latest_checkpoint(checkpoint_dir=CHECKPOINT_DIR):
+    found = list_checkpoints(checkpoint_dir)
+    return found[-1][1] if found else None
+
+def save_run_dir(run_dir, checkpoint_dir=CHECKPOINT_DIR):
+    with open(os.path.join(checkpoint_dir, RUN_FILE), "w") as f:
+        f.write(run_dir)
+
+def load_run_dir(checkpoint_dir=CHECKPOINT_DIR):
+    # The tensorboard run of the checkpoints in `checkpoint_dir`, if known
+    path = os.path.join(checkpoint_dir, RUN_FILE)
+    if not os.path.exists(path): return None
+    with open(path) as f:
+        run_dir = f.read().strip()
+    return run_dir if os.path.isdir(run_dir) else None
+
+# --- BEHAVIOUR CLONING ---
+
+def pretrain_bc(model, demo_path, epochs=5, batch_size=256, learning_rate=1e-3):
+    # Fits the policy to recorded demonstrations (see demos.py) by maximizing
+    # the log-likelihood of the demonstrated actions. The dataset is streamed
+    # a memory-mapped chunk at a time, so it never has to fit in RAM.
+    import torch as th
+    dataset = DemoDataset(demo_path)
+    expected = set(model.observation_space.spaces)
+    if set(dataset.obs_keys) != expected:
+        raise ValueError(f"{demo_path} has observation keys {sorted(dataset.obs_keys)}, the model expects {sorted(expected)}")
+    policy = model.policy
+    policy.set_training_mode(True)
+    optimizer = th.optim.Adam(policy.parameters(), lr=learning_rate)
+    for epoch in range(epochs):
+        total, count = 0.0, 0
+        for obs, actions in dataset.batches(batch_size, seed=epoch):
+            obs_tensor, _ = policy.obs_to_tensor(obs)
+            log_prob = policy.get_distribution(obs_tensor).log_prob(th.as_tensor(actions, device=policy.device))
+            loss = -log_prob.mean()
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+            total += loss.item() * len(actions)
+            count += len(actions)
+        print(f"BC epoch {epoch + 1}/{epochs}: {count} samples, nll {total / max(count, 1):.4f}")
+    policy.set_training_mode(False)
+
+# --- TRAINING ---
+
+def train(n_envs=1, n_workers=None, resume=False, checkpoint_freq=100000, eval_freq=200000,
+          bc_demos=None, bc_epochs=5, telemetry_freq=10000):
+    from stable_baselines3 import PPO
+    from stable_baselines3.common.vec_env import VecMonitor
+    from callbacks import AsyncEvalCallback, RotatingCheckpointCallback, TelemetryCallback
+    from shared_vec_env import SharedMemoryVecEnv
+    import worker_launcher
+
+    # Env workers and eval jobs all fork from one server with torch preloaded
+    worker_launcher.get_context(preload=worker_launcher.POLICY_PRELOAD)
 
-def train():
     # 1. Create the Environment
-    # We keep hazards and powerups off for Stage 1 (Basic Climbing)
-    env = DoodleJumpEnv(
-        width=448,
-        height=682,
-        enable_hazards=False,
-        enable_powerups=False
-    )
+    # With n_envs > 1 the envs run in worker processes that share their
+    # observation/reward/done buffers with the learner (see shared_vec_env.py).
+    # Episode stats are recorded on this side (VecMonitor), so the workers
+    # never import stable-baselines3
+    if n_envs > 1:
+        env = VecMonitor(SharedMemoryVecEnv([make_env] * n_envs, n_workers=n_workers))
+    else:
+        env = make_env()
 
     # 2. Initialize the Model
     # MultiInputPolicy is required because our observation space is a Dict
-    model = PPO(
-        "MultiInputPolicy",
-        env,
-        verbose=1,
-        ent_coef=0.025,
-        learning_rate=0.0002,
-        tensorboard_log="./ppo_doodle_tensorboard/"
-    )
+    checkpoint = latest_checkpoint() if resume else None
+    if checkpoint:
+        print(f"Resuming from {checkpoint}")
+        model = PPO.load(checkpoint, env=env, tensorboard_log=TENSORBOARD_LOG)
+        # Log into the checkpoint's own run (SB3 would pick the newest one),
+        # which is also where AsyncEvalCallback keeps that run's best model
+        run_dir = load_run_dir()
+        if run_dir:
+            from stable_baselines3.common.logger import configure
+            model.set_logger(configure(run_dir, ["stdout", "tensorboard"]))
+        else:
+            print("Tensorboard run of the checkpoint unknown, logging to a new one")
+    else:
+        model = PPO(
+            "MultiInputPolicy",
+            env,
+            verbose=1,
+            tensorboard_log=TENSORBOARD_LOG,
+            **HYPERPARAMS
+        )
+        # Optional warm start from demonstrations (python demos.py ...)
+        if bc_demos:
+            pretrain_bc(model, bc_demos, epochs=bc_epochs)
 
     # 3. Train the AI
-    # We use 600,000 steps to give it time to learn the 'next_platform' logic
-    model.learn(total_timesteps=4000000)
+    # Checkpoints rotate in CHECKPOINT_DIR (with RUN_FILE naming their
+    # tensorboard run); a resumed run continues its step count and that
+    # run's curve instead of starting a new one
+    callbacks = [
+        RotatingCheckpointCallback(checkpoint_freq, verbose=1),
+        AsyncEvalCallback(eval_freq, verbose=1),
+        TelemetryCallback(telemetry_freq),
+    ]
+    model.learn(
+        total_timesteps=max(0, TOTAL_TIMESTEPS - model.num_timesteps),
+        callback=callbacks,
+        reset_num_timesteps=checkpoint is None
+    )
 
     # 4. Save the Model
     # Saved as v13 to distinguish it from the older, stalling versions
     model.save("ppo_doodle_jump_stage1_v15")
 if __name__ == "__main__":
-    train()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--resume", action="store_true")
+    parser.add_argument("--bc", metavar="DEMOS", default=None, help="pre-train on a demos.py dataset first")
+    parser.add_argument("--bc-epochs", type=int, default=5)
+    args = parser.parse_args()
+    train(resume=args.resume, bc_demos=args.bc, bc_epochs=args.bc_epochs)
@@ -0,0 +1,55 @@
+import multiprocessing as mp
+
+# Start method and preloading for every process we launch (env workers, eval
+# jobs). A spawned worker starts a fresh interpreter and imports numpy,
+# pygame, gymnasium and the simulation before it can build its first env;
+# with the forkserver method those imports happen once, in the fork server,
+# and each worker is a fork of it that only has to unpickle its target.
+#
+# The fork server is started by the first process launched through a
+# forkserver context and its preload list can't change afterwards, so every
+# caller should go through get_context(), and a process that wants a
+# different preload must ask for it before launching anything.
+# bench_startup.py measures the difference.
+
+# Everything an env worker imports, heavy first. Not torch: env workers never
+# need it.
+SIM_PRELOAD = [
+    "numpy",
+    "pygame",
+    "gymnasium",
+    "physics",
+    "level_gen",
+    "game",
+    "gymnasium_env_doodle",
+    "gymnasium_env_doodle.envs.doodle_env",
+    "gymnasium_env_doodle.envs.doodle_vector_env",
+    "shared_vec_worker",
+]
+# For processes that also launch policy jobs (train.py's evaluations): torch
+# is most of an eval worker's cold start. The fork server only imports it,
+# which starts no threads, so forking from it stays safe.
+POLICY_PRELOAD = SIM_PRELOAD + ["torch", "stable_baselines3", "callbacks"]
+
+_preload = list(SIM_PRELOAD)
+
+
+def get_context(start_method=None, preload=None):
+    # forkserver with the modules preloaded where available, else spawn
+    # (Windows); an explicit start_method is used as is. `preload` replaces
+    # the process-wide preload list (SIM_PRELOAD by default)
+    global _preload
+    if preload is not None:
+        _preload = list(preload)
+    if start_method is None:
+        start_method = "forkserver" if "forkserver" in mp.get_all_start_methods() else "spawn"
+    ctx = mp.get_context(start_method)
+    if start_method == "forkserver":
+        ctx.set_forkserver_preload(_preload)
+    return ctx
+
+
+def start_process(target, args=(), ctx=None, daemon=True):
+    process = (ctx or get_context()).Process(target=target, args=args, daemon=daemon)
+    process.start()
+    return process